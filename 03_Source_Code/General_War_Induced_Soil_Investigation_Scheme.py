@@ -4,18 +4,22 @@ Create a comprehensive methodological scheme for war-induced soil disturbance an
 This serves as a general pattern for scientific publications in soil contamination research
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.patches import FancyBboxPatch, Rectangle, Circle, FancyArrow, Polygon
+from scheme_bootstrap import apply_style, lazy_import
 import numpy as np
-import seaborn as sns
+from scheme_layout import tight_layout
+import scheme_render
+from scheme_render import save_scheme
+from scheme_shapes import circles
+import sampling_plan
+
+plt = lazy_import('matplotlib.pyplot')
 
 # Set style for professional appearance
-plt.style.use('default')
-sns.set_palette("husl")
+apply_style()
 
 def create_general_war_soil_methodology():
     """Create comprehensive general methodological scheme for war-induced soil investigation"""
+    from matplotlib.patches import FancyBboxPatch, FancyArrow
     fig, ax = plt.subplots(1, 1, figsize=(22, 18))
     
     # Professional color palette for different phases
@@ -268,14 +272,12 @@ def create_general_war_soil_methodology():
                         head_length=0.12, fc='darkblue', ec='darkblue', alpha=0.7)
     ax.add_patch(arrow7)
     
-    plt.tight_layout()
-    plt.savefig('/Users/adim/Documents/Igph/SoilDegradation/General_War_Induced_Soil_Investigation_Scheme.png', 
-                dpi=300, bbox_inches='tight', facecolor='white', edgecolor='none')
-    plt.close()
-    print("Created: General_War_Induced_Soil_Investigation_Scheme.png")
+    tight_layout(fig)
+    save_scheme(fig, 'General_War_Induced_Soil_Investigation_Scheme.png', edgecolor='none')
 
 def create_sampling_strategy_scheme():
     """Create detailed sampling strategy scheme"""
+    from matplotlib.patches import FancyBboxPatch, Circle
     fig, ax = plt.subplots(1, 1, figsize=(16, 12))
     
     colors = {
@@ -303,34 +305,29 @@ def create_sampling_strategy_scheme():
     ax.add_patch(crater)
     
     # Sample points around crater
-    crater_points = [(2.7, 7.3), (3.3, 7.3), (3.3, 6.7), (2.7, 6.7), (3, 7.5), (3, 6.5)]
+    crater_points = np.array([(2.7, 7.3), (3.3, 7.3), (3.3, 6.7), (2.7, 6.7), (3, 7.5), (3, 6.5)])
+    circles(ax, crater_points[:, 0], crater_points[:, 1], 0.08, facecolor='yellow', edgecolor='black')
     for i, (x, y) in enumerate(crater_points):
-        point = Circle((x, y), 0.08, facecolor='yellow', edgecolor='black')
-        ax.add_patch(point)
         ax.text(x+0.15, y+0.15, f'C{i+1}', fontsize=8, fontweight='bold')
     
-    # Transect sampling
-    for i, distance in enumerate([1.5, 2.0, 2.5]):
-        circle = Circle((3, 7), distance, fill=False, edgecolor=colors['transect'], 
-                       linestyle='--', linewidth=2, alpha=0.8)
-        ax.add_patch(circle)
-        
-        # Transect points
-        angles = [0, 45, 90, 135, 180, 225, 270, 315]
-        for j, angle in enumerate(angles):
-            rad = np.radians(angle)
-            x = 3 + distance * np.cos(rad)
-            y = 7 + distance * np.sin(rad)
-            if 1 <= x <= 11 and 1 <= y <= 9:  # Keep within bounds
-                point = Circle((x, y), 0.06, facecolor='orange', edgecolor='black')
-                ax.add_patch(point)
-                ax.text(x+0.1, y+0.1, f'T{i+1}', fontsize=7)
+    # Transect sampling: rings at each distance with points every 45 degrees
+    distances = np.array([1.5, 2.0, 2.5])
+    circles(ax, 3, 7, distances, facecolor='none', edgecolor=colors['transect'],
+            linestyle='--', linewidth=2, alpha=0.8)
+    
+    # Transect points from the plan generator, kept within the drawing bounds
+    plan = sampling_plan.generate([(3, 7)], crater_radii=0.3, transect_radii=distances, angles=8,
+                                  exclusion=distances.max(), bounds=(1, 1, 11, 9), min_spacing=0)
+    transect = plan['kind'] == sampling_plan.KINDS.index('transect')
+    x, y = plan['x'][transect], plan['y'][transect]
+    circles(ax, x, y, 0.06, facecolor='orange', edgecolor='black')
+    for ring, xt, yt in zip(plan['ring'][transect], x, y):
+        ax.text(xt+0.1, yt+0.1, f'T{ring+1}', fontsize=7)
     
     # Background sampling
-    bg_points = [(1, 8), (1, 6), (1, 4), (5, 8.5), (5, 5.5), (8, 8), (8, 6), (8, 4)]
+    bg_points = np.array([(1, 8), (1, 6), (1, 4), (5, 8.5), (5, 5.5), (8, 8), (8, 6), (8, 4)])
+    circles(ax, bg_points[:, 0], bg_points[:, 1], 0.08, facecolor=colors['background'], edgecolor='black')
     for i, (x, y) in enumerate(bg_points):
-        point = Circle((x, y), 0.08, facecolor=colors['background'], edgecolor='black')
-        ax.add_patch(point)
         ax.text(x+0.15, y+0.15, f'B{i+1}', fontsize=8, fontweight='bold')
     
     # Legend
@@ -340,10 +337,10 @@ def create_sampling_strategy_scheme():
         ('Background samples (>40m)', colors['background'], 'B')
     ]
     
+    circles(ax, 9.5, 3 - np.arange(len(legend_items)) * 0.4, 0.1,
+            facecolor=[color for _, color, _ in legend_items], edgecolor='black')
     for i, (label, color, symbol) in enumerate(legend_items):
         y_pos = 3 - i * 0.4
-        legend_circle = Circle((9.5, y_pos), 0.1, facecolor=color, edgecolor='black')
-        ax.add_patch(legend_circle)
         ax.text(9.8, y_pos, f'{symbol} - {label}', fontsize=10, va='center')
     
     # Sampling protocol
@@ -364,14 +361,12 @@ def create_sampling_strategy_scheme():
     ax.text(9, 4.6, '• Chain of custody', fontsize=9, ha='center', color='white')
     ax.text(9, 4.3, '• Preservation protocols', fontsize=9, ha='center', color='white')
     
-    plt.tight_layout()
-    plt.savefig('/Users/adim/Documents/Igph/SoilDegradation/Sampling_Strategy_Scheme.png', 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print("Created: Sampling_Strategy_Scheme.png")
+    tight_layout(fig)
+    save_scheme(fig, 'Sampling_Strategy_Scheme.png')
 
 def create_analytical_workflow_scheme():
     """Create comprehensive analytical workflow scheme"""
+    from matplotlib.patches import FancyBboxPatch, FancyArrow
     fig, ax = plt.subplots(1, 1, figsize=(18, 14))
     
     colors = {
@@ -505,11 +500,8 @@ def create_analytical_workflow_scheme():
                           head_length=0.08, fc='black', ec='black', alpha=0.7)
         ax.add_patch(arrow)
     
-    plt.tight_layout()
-    plt.savefig('/Users/adim/Documents/Igph/SoilDegradation/Analytical_Workflow_Scheme.png', 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print("Created: Analytical_Workflow_Scheme.png")
+    tight_layout(fig)
+    save_scheme(fig, 'Analytical_Workflow_Scheme.png')
 
 def main():
     """Generate all general methodological schemes"""
@@ -520,7 +512,7 @@ def main():
     create_analytical_workflow_scheme()
     
     print("\nAll general methodological schemes have been created successfully!")
-    print("Files saved in: /Users/adim/Documents/Igph/SoilDegradation/")
+    print(f"Files saved in: {scheme_render.OUTPUT_DIR}")
     print("\nGenerated files:")
     print("1. General_War_Induced_Soil_Investigation_Scheme.png - Comprehensive methodology framework")
     print("2. Sampling_Strategy_Scheme.png - Detailed sampling protocols")
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Per-figure benchmark for the scheme generators
+Runs every create_* function in a fresh interpreter and records the time spent building artists,
+in tight_layout, drawing and PNG encoding, together with peak RSS and artist counts. Results are
+written as JSON and compared against a stored baseline with a relative regression threshold.
+Every run starts with empty layout and static-layer caches, so cached layouts from earlier
+renders do not hide tight_layout and drawing time.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from render_all_schemes import SOURCE_DIR, discover_schemes, select_schemes
+
+# Baseline used for comparison (write it with --save-baseline)
+BASELINE_PATH = os.path.join(SOURCE_DIR, 'benchmark_baseline.json')
+
+# Bump when the result layout changes
+RESULTS_VERSION = 1
+
+# Relative increase over the baseline that counts as a regression
+THRESHOLD = 0.25
+
+# Absolute increases below these are treated as noise
+NOISE_FLOOR = {'seconds': 0.05, 'peak_rss_mb': 10.0, 'artists': 0}
+
+# Timed stages, in the order they run ("draw" includes the tight bounding-box pass)
+STAGES = ['construct', 'tight_layout', 'draw', 'encode', 'total']
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MiB"""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+def _count_artists(fig):
+    """Number of artists in a figure, in total and by kind"""
+    from matplotlib.collections import Collection
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import Patch
+    from matplotlib.text import Text
+
+    artists = fig.findobj()
+    counts = {'artists': len(artists)}
+    for name, kind in [('texts', Text), ('patches', Patch), ('collections', Collection), ('lines', Line2D)]:
+        counts[name] = sum(isinstance(artist, kind) for artist in artists)
+    return counts
+
+def measure_scheme(module_name, func_name):
+    """Build, lay out, draw and encode one scheme in this process and return its metrics"""
+    import importlib
+    import io
+    import scheme_render
+    from matplotlib.figure import Figure
+
+    module = importlib.import_module(module_name)
+    import matplotlib.pyplot as plt
+
+    marks, saved = {}, {}
+    tight_layout = module.tight_layout
+
+    def timed_tight_layout(*args, **kwargs):
+        marks['layout_start'] = time.perf_counter()
+        tight_layout(*args, **kwargs)
+        marks['layout_end'] = time.perf_counter()
+
+    def capture(fig, filename, **savefig_kwargs):
+        marks['saved'] = time.perf_counter()
+        saved['fig'] = fig
+        saved['params'] = dict(scheme_render.SAVEFIG_DEFAULTS, **savefig_kwargs)
+
+    # Time the builder's own (possibly cached) tight_layout call and take over saving
+    module.tight_layout = timed_tight_layout
+    module.save_scheme = capture
+
+    start = time.perf_counter()
+    result = getattr(module, func_name)()
+    if isinstance(result, Figure):
+        marks['saved'] = time.perf_counter()
+        saved['fig'], saved['params'] = result, dict(scheme_render.SAVEFIG_DEFAULTS)
+    if 'fig' not in saved:
+        raise RuntimeError(f"{module_name}.{func_name} neither saved nor returned a figure")
+    fig, params = saved['fig'], saved['params']
+    counts = _count_artists(fig)
+
+    # Same raster path and PNG encoder as scheme_render.export_scheme, split into draw and encode
+    draw_start = time.perf_counter()
+    dpi = params.pop('dpi')
+    rgba, params = scheme_render.render_raster(fig, dpi, params)
+    encode_start = time.perf_counter()
+    scheme_render.encode_png(rgba, io.BytesIO(), dpi)
+    end = time.perf_counter()
+    plt.close(fig)
+
+    seconds = {
+        'construct': marks.get('layout_start', marks['saved']) - start,
+        'tight_layout': marks['layout_end'] - marks['layout_start'] if 'layout_start' in marks else 0.0,
+        'draw': encode_start - draw_start,
+        'encode': end - encode_start
+    }
+    seconds['total'] = sum(seconds.values())
+    return {
+        'seconds': seconds,
+        'peak_rss_mb': _peak_rss_mb(),
+        'pixels': [rgba.shape[1], rgba.shape[0]],
+        **counts
+    }
+
+def run_benchmark(module, func, repeat=1):
+    """Measure a scheme in fresh interpreters with cold caches and keep the best time of each stage"""
+    runs = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory(prefix='scheme_benchmark_') as cache_dir:
+            env = dict(os.environ, MPLBACKEND='Agg', PYTHONPATH=SOURCE_DIR,
+                       SCHEME_LAYOUT_CACHE=os.path.join(cache_dir, 'layout'),
+                       SCHEME_LAYER_CACHE=os.path.join(cache_dir, 'layers'))
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', module, func],
+                                  cwd=SOURCE_DIR, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"benchmarking {module}.{func} failed:\n{proc.stderr}")
+        # The builders may print; the metrics are the last line
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    best = dict(runs[0])
+    best['seconds'] = {stage: min(run['seconds'][stage] for run in runs) for stage in STAGES}
+    best['peak_rss_mb'] = min(run['peak_rss_mb'] for run in runs)
+    return best
+
+def machine_info():
+    """Environment the numbers were measured in"""
+    import matplotlib
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.machine(),
+        'matplotlib': matplotlib.__version__
+    }
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """Return (scheme id, metric, baseline value, new value) for every regression"""
+    regressions = []
+    for scheme_id, current in results.items():
+        previous = baseline.get(scheme_id)
+        if previous is None:
+            continue
+        metrics = [(f'seconds.{stage}', previous['seconds'][stage], current['seconds'][stage],
+                    NOISE_FLOOR['seconds']) for stage in STAGES]
+        metrics.append(('peak_rss_mb', previous['peak_rss_mb'], current['peak_rss_mb'],
+                        NOISE_FLOOR['peak_rss_mb']))
+        metrics.append(('artists', previous['artists'], current['artists'], NOISE_FLOOR['artists']))
+        for metric, old, new, floor in metrics:
+            if new > old * (1 + threshold) and new - old > floor:
+                regressions.append((scheme_id, metric, old, new))
+    return regressions
+
+def load_results(path):
+    """Read a results/baseline file and return its schemes, or None when it is missing or stale"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    if data.get('version') != RESULTS_VERSION:
+        print(f"Ignoring {path}: result format version {data.get('version')}")
+        return None
+    if data.get('machine') != machine_info():
+        print(f"Note: {os.path.basename(path)} was recorded on a different machine or matplotlib")
+    return data['schemes']
+
+def save_results(path, results):
+    """Write results as JSON"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': RESULTS_VERSION, 'machine': machine_info(), 'schemes': results},
+                  f, indent=1, sort_keys=True)
+
+def main():
+    """Benchmark the selected schemes and compare them with the baseline"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('names', nargs='*', help='create_* functions or script modules (default: all)')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per scheme, best time per stage counts')
+    parser.add_argument('-o', '--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', default=BASELINE_PATH,
+                        help='baseline JSON to compare against (default: benchmark_baseline.json)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store these results as the new baseline instead of comparing')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help=f'relative increase reported as a regression (default: {THRESHOLD})')
+    parser.add_argument('--worker', nargs=2, metavar=('MODULE', 'FUNCTION'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure_scheme(*args.worker)))
+        return 0
+
+    schemes = select_schemes(discover_schemes(), args.names)
+    if not schemes:
+        print("No matching schemes found")
+        return 1
+
+    print(f"{'scheme':<44s} {'build':>7s} {'layout':>7s} {'draw':>7s} {'encode':>7s} "
+          f"{'total':>7s} {'RSS MB':>7s} {'artists':>8s}")
+    results = {}
+    for module, func, _ in schemes:
+        result = run_benchmark(module, func, args.repeat)
+        results[f'{module}.{func}'] = result
+        s = result['seconds']
+        print(f"{func:<44s} {s['construct']:7.2f} {s['tight_layout']:7.2f} {s['draw']:7.2f} "
+              f"{s['encode']:7.2f} {s['total']:7.2f} {result['peak_rss_mb']:7.0f} {result['artists']:8d}")
+
+    if args.output:
+        save_results(args.output, results)
+    if args.save_baseline:
+        # Keep baseline entries for schemes that were not benchmarked this time
+        baseline = load_results(args.baseline) or {}
+        baseline.update(results)
+        save_results(args.baseline, baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_results(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline} (create one with --save-baseline)")
+        return 0
+    regressions = compare(results, baseline, args.threshold)
+    for scheme_id, metric, old, new in regressions:
+        print(f"REGRESSION {scheme_id} {metric}: {old:.3g} -> {new:.3g} (+{(new / old - 1) * 100 if old else float('inf'):.0f}%)")
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%} against {os.path.basename(args.baseline)}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo budget simulation of sampling campaigns
+The indicator database gives equipment and analysis costs as ranges ('200-500'), not single
+values. simulate() draws campaign scenarios from those ranges: per scenario, one equipment and
+one per-sample analysis price per indicator and a sample count per indicator and monitoring
+phase. An indicator joins the campaign in the phase of its Analytical_Priority (1 = immediate),
+buys its equipment then and is re-sampled in every later phase. Indicators without a priority
+(-1, e.g. merged legacy rows) have no phase to join and are left out of the campaign.
+
+Scenarios are generated in chunks sized to CHUNK_ELEMENTS random values, and the cumulative
+phase costs go into fixed-bin histograms between the cheapest and the dearest possible campaign,
+so memory stays the same for a thousand or a hundred million draws. Percentiles are read off the
+histograms (to within (max - min) / HISTOGRAM_BINS).
+
+    from budget import simulate, fan_chart
+    result = simulate(draws=1_000_000)
+    result['all']['bands']          # percentiles x phases of the cumulative cost
+    fan_chart(ax, result['all'], color='lightcoral', label='Comprehensive analysis')
+"""
+
+import numpy as np
+
+PHASES = ['Immediate\n(0-1 month)', 'Short-term\n(1-6 months)',
+          'Medium-term\n(6-24 months)', 'Long-term\n(2+ years)']
+# Percentiles reported by simulate(); fan charts pair them from the outside in
+PERCENTILES = (5, 25, 50, 75, 95)
+# Samples analysed per indicator and phase, drawn uniformly from this inclusive range
+SAMPLES_PER_PHASE = (20, 60)
+
+BUDGET_SEED = 20240917
+# Random values generated per chunk (scenarios x indicators x phases)
+CHUNK_ELEMENTS = 1 << 22
+HISTOGRAM_BINS = 4096
+
+def _prices(u, low, high, distribution):
+    """Prices from uniform variates u: uniform, or triangular with its mode at the midpoint"""
+    if distribution == 'uniform':
+        return low + u * (high - low)
+    if distribution == 'triangular':
+        # Inverse CDF of the symmetric triangular distribution
+        below = u < 0.5
+        half = np.where(below, np.sqrt(u / 2), 1 - np.sqrt((1 - u) / 2))
+        return low + half * (high - low)
+    raise ValueError(f"Unknown cost distribution {distribution!r} (expected 'uniform' or 'triangular')")
+
+def campaign_inputs(db, rows=None):
+    """Cost ranges, start phase and essential flag per indicator of the database rows
+
+    Rows whose Analytical_Priority is missing or outside 1-len(PHASES) are excluded; 'rows' holds
+    the row numbers kept and 'excluded' how many were dropped.
+    """
+    selected = np.arange(len(db['Analytical_Priority']))[slice(None) if rows is None else rows]
+    priority = db['Analytical_Priority'][selected]
+    valid = (priority >= 1) & (priority <= len(PHASES))
+    rows = selected[valid]
+
+    def bounds(name):
+        # Indicators without a cost range cost nothing in that category
+        return (np.nan_to_num(db[f'{name}_min'][rows]), np.nan_to_num(db[f'{name}_max'][rows]))
+    return {
+        'equipment': bounds('Equipment_Cost_USD'),
+        'analysis': bounds('Analysis_Cost_USD'),
+        'start': priority[valid] - 1,
+        'essential': db['Conflict_Relevance'][rows] == 3,
+        'rows': rows,
+        'excluded': int((~valid).sum())
+    }
+
+def _histogram_percentiles(counts, low, high, percentiles):
+    """Percentiles (len(percentiles) x phases) from per-phase histograms over [low, high]"""
+    bins = counts.shape[1]
+    cdf = np.cumsum(counts, axis=1) / counts.sum(axis=1, keepdims=True)
+    result = np.empty((len(percentiles), len(counts)))
+    for phase, (c, lo, hi) in enumerate(zip(cdf, low, high)):
+        # Linear interpolation of the CDF inside each bin
+        edges = np.concatenate([[0.0], c])
+        positions = np.interp(np.asarray(percentiles) / 100, edges, np.arange(bins + 1))
+        result[:, phase] = lo + positions / bins * (hi - lo)
+    return result
+
+def simulate(db=None, rows=None, draws=1_000_000, samples=SAMPLES_PER_PHASE, distribution='uniform',
+             seed=BUDGET_SEED, percentiles=PERCENTILES, bins=HISTOGRAM_BINS):
+    """Cumulative campaign cost per phase over draws scenarios, for all and essential indicators
+
+    Returns a dict with phases, draws and, for 'all' and 'essential', the percentile bands
+    (percentiles x phases), mean and the lowest and highest possible cumulative cost; 'excluded'
+    counts the indicators left out for lack of a priority. The same seed and inputs give the same
+    result. draws must be a whole number of at least 1.
+    """
+    if isinstance(draws, bool) or not isinstance(draws, (int, np.integer)) or draws < 1:
+        raise ValueError(f"draws must be a whole number of at least 1, got {draws!r}")
+    if db is None:
+        from indicator_database import load
+        db = load()
+    inputs = campaign_inputs(db, rows)
+    n, phases = len(inputs['start']), len(PHASES)
+    lo_samples, hi_samples = samples
+    active = (np.arange(phases) >= inputs['start'][:, None]).astype(float)  # n x phases
+    joins = (np.arange(phases) == inputs['start'][:, None]).astype(float)   # n x phases
+    campaigns = ['all', 'essential']
+    masks = np.array([np.ones(n), inputs['essential']], float)             # campaigns x n
+
+    # Exact bounds of every phase's cumulative cost, used as histogram ranges
+    low, high = (np.cumsum((inputs['equipment'][pick] * masks) @ joins +
+                           (inputs['analysis'][pick] * masks * count) @ active, axis=1)
+                 for pick, count in ((0, lo_samples), (1, hi_samples)))  # campaigns x phases
+    span = np.where(high > low, high - low, 1)
+    offsets = np.arange(len(campaigns) * phases).reshape(len(campaigns), phases) * bins
+
+    histogram = np.zeros(len(campaigns) * phases * bins, np.int64)
+    total = np.zeros((len(campaigns), phases))
+    rng = np.random.default_rng(seed)
+    chunk = max(1, CHUNK_ELEMENTS // max(n * phases, 1))
+    for start in range(0, draws, chunk):
+        size = min(chunk, draws - start)
+        equipment = _prices(rng.random((size, n)), *inputs['equipment'], distribution)
+        unit = _prices(rng.random((size, n)), *inputs['analysis'], distribution)
+        counts = rng.integers(lo_samples, hi_samples + 1, size=(size, n, phases)).astype(float)
+        counts *= active
+        # size x campaigns x phases: equipment when an indicator joins, analysis while it is active
+        per_phase = (equipment[:, None, :] * masks) @ joins + (unit[:, None, :] * masks) @ counts
+        cumulative = np.cumsum(per_phase, axis=2)
+        total += cumulative.sum(axis=0)
+        index = np.clip(((cumulative - low) / span * bins).astype(np.int64), 0, bins - 1)
+        histogram += np.bincount((index + offsets).ravel(), minlength=histogram.size)
+
+    histogram = histogram.reshape(len(campaigns), phases, bins)
+    result = {'phases': PHASES, 'draws': draws, 'percentiles': tuple(percentiles),
+              'excluded': inputs['excluded']}
+    for k, name in enumerate(campaigns):
+        result[name] = {
+            'bands': _histogram_percentiles(histogram[k], low[k], high[k], percentiles),
+            'mean': total[k] / draws,
+            'low': low[k],
+            'high': high[k]
+        }
+    return result
+
+def fan_chart(ax, campaign, x=None, color='tab:blue', label=None, percentiles=PERCENTILES, alpha=0.25):
+    """Nested percentile bands (outermost palest) and the median line of one simulated campaign"""
+    bands = campaign['bands']
+    x = np.arange(bands.shape[1]) if x is None else x
+    pairs = len(percentiles) // 2
+    for k in range(pairs):
+        ax.fill_between(x, bands[k], bands[-1 - k], color=color, alpha=alpha * (k + 1), linewidth=0,
+                        label=f'{label} {percentiles[k]}-{percentiles[-1 - k]}%' if label else None)
+    if len(percentiles) % 2:
+        ax.plot(x, bands[pairs], color=color, linewidth=2, marker='o',
+                label=f'{label} median' if label else None)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Input check for the Monte Carlo budget simulation
+Calls budget.simulate() with draw counts it must reject (zero, negative, fractional) and fails
+unless each raises ValueError, then runs it with one draw, a few draws and a count spanning two
+chunks and fails when a mean or percentile band is not finite, leaves the cheapest-to-dearest
+range of its phase, or changes between two runs with the same seed
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+# Draw counts simulate() must reject with a ValueError
+INVALID_DRAWS = [0, -1, -1_000_000, 2.5, 1.0, True]
+
+# Draw counts it must accept; None stands for one more than a chunk, so two chunks are drawn
+VALID_DRAWS = [1, 2, 7, None]
+
+def check_invalid(db, draws):
+    """Return the problem when simulate() accepts an invalid draw count, or None"""
+    from budget import simulate
+    try:
+        simulate(db, draws=draws)
+    except ValueError:
+        return None
+    except Exception as exc:
+        return f"draws={draws!r} raised {type(exc).__name__} instead of ValueError: {exc}"
+    return f"draws={draws!r} was accepted"
+
+def check_valid(db, draws):
+    """Return the problems of one simulate() run with a valid draw count"""
+    from budget import simulate
+    result = simulate(db, draws=draws)
+    problems = []
+    if result['draws'] != draws:
+        problems.append(f"draws={draws}: result reports {result['draws']} draws")
+    for name in ('all', 'essential'):
+        campaign = result[name]
+        values = np.vstack([campaign['bands'], campaign['mean']])
+        if not np.isfinite(values).all():
+            problems.append(f"draws={draws}: {name} mean or bands not finite")
+        elif ((values < campaign['low'] - 1e-6 * campaign['high']) |
+              (values > campaign['high'] * (1 + 1e-6))).any():
+            problems.append(f"draws={draws}: {name} mean or bands outside the possible range")
+    again = simulate(db, draws=draws)
+    if any(not np.array_equal(result[name][key], again[name][key])
+           for name in ('all', 'essential') for key in ('bands', 'mean')):
+        problems.append(f"draws={draws}: two runs with the same seed differ")
+    return problems
+
+def main():
+    """Check that simulate() rejects invalid draw counts and handles small ones"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.parse_args()
+    from budget import CHUNK_ELEMENTS, PHASES, campaign_inputs
+    from indicator_database import load
+    db = load()
+    chunk = max(1, CHUNK_ELEMENTS // max(len(campaign_inputs(db)['start']) * len(PHASES), 1))
+
+    problems = [problem for problem in (check_invalid(db, draws) for draws in INVALID_DRAWS) if problem]
+    status = 'FAIL' if problems else 'ok'
+    print(f"  {'invalid draw counts':<48s} {len(INVALID_DRAWS):3d} values  {status}")
+    valid = [chunk + 1 if draws is None else draws for draws in VALID_DRAWS]
+    before = len(problems)
+    for draws in valid:
+        problems += check_valid(db, draws)
+    status = 'FAIL' if len(problems) > before else 'ok'
+    print(f"  {'small draw counts':<48s} {len(valid):3d} values  {status}")
+
+    for problem in problems:
+        print(f"simulate: {problem}")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
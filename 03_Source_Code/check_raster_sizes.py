@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Raster-size check for the scheme generators
+Builds each selected scheme and rasterizes it through scheme_render.rasterize() at several
+dpi values, including ones where Agg rounds the canvas size differently from width * dpi, and
+fails when the raster differs in size or pixels from the PNG matplotlib's own savefig writes.
+The same figures are then rendered in strips through scheme_tiles.render_tiled() at the poster
+dpi of the A4 and A3 paper sizes and with a small strip budget, and compared with rasterize().
+"""
+
+import argparse
+import io
+import os
+import sys
+
+from render_all_schemes import SOURCE_DIR, discover_schemes, select_schemes
+
+# Schemes checked by default: small figures whose tight boxes round differently at 100 and 200 dpi
+DEFAULT_SCHEMES = ['create_site_layout', 'create_parameter_analysis', 'create_equipment_network']
+
+# Resolutions checked: common screen and print dpi, and a non-integer poster dpi
+CHECK_DPI = [72, 100, 150, 200, 300, 163.37]
+
+# Paper sizes of the tiled check; larger posters take the same path but too long to compare whole
+CHECK_PAPERS = ['A4', 'A3']
+
+# Strip budget of the tiled check, small enough that every figure is drawn in several strips
+CHECK_TILE_MB = 1
+
+def build_figure(module_name, func_name):
+    """(figure, savefig parameters) of a scheme, taken over from save_scheme before it is saved"""
+    import importlib
+    import scheme_render
+    from matplotlib.figure import Figure
+    module = importlib.import_module(module_name)
+    saved = {}
+
+    def capture(fig, filename, **savefig_kwargs):
+        saved['fig'], saved['params'] = fig, dict(scheme_render.SAVEFIG_DEFAULTS, **savefig_kwargs)
+    module.save_scheme = capture
+    result = getattr(module, func_name)()
+    if isinstance(result, Figure):
+        saved['fig'], saved['params'] = result, dict(scheme_render.SAVEFIG_DEFAULTS)
+    params = dict(saved['params'])
+    params.pop('dpi')
+    return saved['fig'], params
+
+def check_tiled(fig, params, dpi, label):
+    """Return the mismatches between a strip-rendered PNG and rasterize() at one dpi"""
+    import numpy as np
+    from PIL import Image
+    from scheme_render import rasterize
+    from scheme_tiles import render_tiled
+    png = io.BytesIO()
+    try:
+        render_tiled(fig, png, dpi, params, CHECK_TILE_MB)
+    except ValueError as exc:
+        return [f"{label}: {exc}"]
+    tiled = np.asarray(Image.open(png).convert('RGBA'))
+    expected = rasterize(fig, dpi, **params)
+    if tiled.shape != expected.shape:
+        return [f"{label}: strips {tiled.shape[1]}x{tiled.shape[0]}, "
+                f"raster {expected.shape[1]}x{expected.shape[0]}"]
+    # Anti-aliased edges crossing a strip boundary may differ by one level
+    if np.abs(tiled.astype(np.int16) - expected).max() > 1:
+        return [f"{label}: strip pixels differ from the raster"]
+    return []
+
+def check_scheme(module_name, func_name, dpis):
+    """Return a list of size or pixel mismatches of one scheme"""
+    import numpy as np
+    from PIL import Image
+    from scheme_render import layout_bbox, rasterize, single_draw, tight_bbox
+    from scheme_tiles import poster_dpi
+    fig, params = build_figure(module_name, func_name)
+    problems = []
+    for dpi in dpis:
+        dpi_params = dict(params)
+        if dpi_params.get('bbox_inches') == 'tight':
+            dpi_params['bbox_inches'] = tight_bbox(fig, dpi, dpi_params.pop('pad_inches', None))
+        try:
+            rgba = rasterize(fig, dpi, **dpi_params)
+        except ValueError as exc:
+            problems.append(f"{dpi:g} dpi: {exc}")
+            continue
+        png = io.BytesIO()
+        with single_draw(fig):
+            fig.savefig(png, format='png', dpi=dpi, **dpi_params)
+        expected = np.asarray(Image.open(png).convert('RGBA'))
+        if rgba.shape != expected.shape:
+            problems.append(f"{dpi:g} dpi: raster {rgba.shape[1]}x{rgba.shape[0]}, "
+                            f"savefig {expected.shape[1]}x{expected.shape[0]}")
+        elif not np.array_equal(rgba, expected):
+            problems.append(f"{dpi:g} dpi: pixels differ from savefig")
+        problems += check_tiled(fig, dpi_params, dpi, f"{dpi:g} dpi tiled")
+
+    bbox = params.get('bbox_inches')
+    if bbox == 'tight':
+        bbox = layout_bbox(fig, 100, params.get('pad_inches'))
+    tiled_params = dict(params, bbox_inches=bbox)
+    tiled_params.pop('pad_inches', None)
+    for paper in CHECK_PAPERS:
+        problems += check_tiled(fig, tiled_params, poster_dpi(bbox or fig.bbox_inches, paper), f"poster {paper}")
+    status = 'FAIL' if problems else 'ok'
+    print(f"  {func_name:<48s} {len(dpis):3d} dpi values {len(CHECK_PAPERS):2d} posters  {status}")
+    return problems
+
+def main():
+    """Check rasterize() against savefig for the selected schemes"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('names', nargs='*', default=DEFAULT_SCHEMES,
+                        help='create_* functions or script modules (default: three small schemes)')
+    parser.add_argument('--dpi', type=float, action='append', help='dpi to check (repeatable)')
+    args = parser.parse_args()
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    if SOURCE_DIR not in sys.path:
+        sys.path.insert(0, SOURCE_DIR)
+
+    dpis = args.dpi or CHECK_DPI
+    failures = {}
+    for module, func, _ in select_schemes(discover_schemes(), args.names):
+        problems = check_scheme(module, func, dpis)
+        if problems:
+            failures[func] = problems
+
+    for func, problems in failures.items():
+        for problem in problems:
+            print(f"{func}: {problem}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Cache-key check for the scheme generators
+For every create_* builder, edits each same-module function or class the builder reaches (one at
+a time, in memory) and fails when the render cache key does not change, so a helper edit can
+never restore a stale figure from the render, watch, daemon or layout caches
+"""
+
+import argparse
+import ast
+import sys
+
+from render_all_schemes import SCHEME_MODULES, discover_schemes
+from render_cache import _parse_module, reachable_definitions, source_key
+
+def edit_definition(source, node):
+    """Source with a statement appended to the body of a top-level function or class"""
+    lines = source.splitlines(keepends=True)
+    last = node.body[-1]
+    lines.insert(last.end_lineno, ' ' * last.col_offset + '_cache_key_probe = None\n')
+    return ''.join(lines)
+
+def check_module(module, builders):
+    """Return a list of helper edits that left a builder's key unchanged"""
+    source, tree = _parse_module(module)
+    definitions = {node.name: node for node in tree.body
+                   if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))}
+    problems, edits = [], 0
+    for builder in builders:
+        key = source_key(source, builder, tree)
+        for name in sorted(reachable_definitions(tree, builder) - {builder}):
+            edits += 1
+            if source_key(edit_definition(source, definitions[name]), builder) == key:
+                problems.append(f"editing {name}() leaves the key of {builder}() unchanged")
+    status = 'FAIL' if problems else 'ok'
+    print(f"  {module:<48s} {len(builders):3d} builders {edits:4d} helper edits  {status}")
+    return problems
+
+def main():
+    """Check that helper edits change the cache key of every builder that uses them"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('modules', nargs='*', default=SCHEME_MODULES,
+                        help='scheme scripts to check (default: all)')
+    args = parser.parse_args()
+
+    builders = {}
+    for module, func_name, _ in discover_schemes(args.modules):
+        builders.setdefault(module, []).append(func_name)
+    failures = {}
+    for module, names in builders.items():
+        problems = check_module(module, names)
+        if problems:
+            failures[module] = problems
+
+    for module, problems in failures.items():
+        for problem in problems:
+            print(f"{module}: {problem}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
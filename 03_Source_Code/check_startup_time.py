@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Start-up time regression check for the scheme generators
+Imports each scheme script in a fresh interpreter under python -X importtime and fails when
+the import exceeds the import budget or loads modules that must stay deferred, then renders one
+small scheme from a cold interpreter (imports, build and savefig, with empty layout, layer and
+text-metrics caches) and fails when that exceeds the cold-render budget
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from render_all_schemes import SCHEME_MODULES, SOURCE_DIR
+
+# Cold import budget for a single scheme script (best of --repeat runs)
+BUDGET_MS = 750
+
+# Single-figure scheme rendered cold at the default dpi, and its budget (best of --repeat runs)
+RENDER_SCHEME = ('generate_schema_images', 'create_site_layout')
+RENDER_BUDGET_MS = 5000
+
+# Modules that must not be loaded just by importing a scheme script
+DEFERRED_MODULES = ['seaborn', 'pandas', 'scipy', 'matplotlib', 'importlib.abc']
+
+def measure_import(module):
+    """Import a module in a new interpreter and return (total_ms, {imported module: cumulative_ms})"""
+    env = dict(os.environ, PYTHONPATH=SOURCE_DIR)
+    env.pop('MPLBACKEND', None)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=SOURCE_DIR, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{proc.stderr}")
+
+    imported = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imported[name.strip()] = int(cumulative) / 1000.0
+    return imported[module], imported
+
+def check_module(module, budget_ms, repeat):
+    """Return a list of budget or deferral violations for one scheme script"""
+    runs = [measure_import(module) for _ in range(repeat)]
+    best_ms, imported = min(runs, key=lambda run: run[0])
+    problems = []
+    if best_ms > budget_ms:
+        problems.append(f"import took {best_ms:.0f} ms (budget {budget_ms} ms)")
+    for name in DEFERRED_MODULES:
+        if name in imported:
+            problems.append(f"{name} is imported at start-up ({imported[name]:.0f} ms)")
+    status = 'FAIL' if problems else 'ok'
+    print(f"  {module:<48s} {best_ms:7.0f} ms  {status}")
+    return problems
+
+def measure_render(module, func):
+    """Wall time in ms of a new interpreter that imports, builds and saves one scheme in memory"""
+    with tempfile.TemporaryDirectory(prefix='scheme_startup_') as cache_dir:
+        env = dict(os.environ, PYTHONPATH=SOURCE_DIR,
+                   SCHEME_LAYOUT_CACHE=os.path.join(cache_dir, 'layout'),
+                   SCHEME_LAYER_CACHE=os.path.join(cache_dir, 'layers'),
+                   SCHEME_TEXT_CACHE=os.path.join(cache_dir, 'text_metrics.pickle'))
+        env.pop('MPLBACKEND', None)
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', module, func],
+                              cwd=SOURCE_DIR, env=env, capture_output=True, text=True)
+        elapsed = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"rendering {module}.{func} failed:\n{proc.stderr}")
+    return elapsed
+
+def check_render(module, func, budget_ms, repeat):
+    """Return a list with the budget violation of a cold single-figure render, if any"""
+    best_ms = min(measure_render(module, func) for _ in range(repeat))
+    problems = []
+    if best_ms > budget_ms:
+        problems.append(f"cold render took {best_ms:.0f} ms (budget {budget_ms:.0f} ms)")
+    status = 'FAIL' if problems else 'ok'
+    print(f"  {f'{module}.{func}':<48s} {best_ms:7.0f} ms  {status}")
+    return problems
+
+def main():
+    """Check every scheme script against the import budget and one cold render against its budget"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('modules', nargs='*', default=SCHEME_MODULES,
+                        help='scheme scripts to check (default: all)')
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS,
+                        help=f'cold import budget per script (default: {BUDGET_MS} ms)')
+    parser.add_argument('--render-budget-ms', type=float, default=RENDER_BUDGET_MS,
+                        help=f'cold single-figure render budget (default: {RENDER_BUDGET_MS} ms)')
+    parser.add_argument('--no-render', action='store_true', help='only check the imports')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per script, best one counts')
+    parser.add_argument('--worker', nargs=2, metavar=('MODULE', 'FUNCTION'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        from render_all_schemes import render_scheme
+        render_scheme(*args.worker, in_memory=True)
+        return 0
+
+    print(f"Import-time budget: {args.budget_ms:.0f} ms per scheme script")
+    failures = {}
+    for module in args.modules:
+        problems = check_module(module, args.budget_ms, args.repeat)
+        if problems:
+            failures[module] = problems
+
+    if not args.no_render:
+        module, func = RENDER_SCHEME
+        print(f"Cold-render budget: {args.render_budget_ms:.0f} ms for one scheme, savefig included")
+        problems = check_render(module, func, args.render_budget_ms, args.repeat)
+        if problems:
+            failures[f'{module}.{func}'] = problems
+
+    for module, problems in failures.items():
+        for problem in problems:
+            print(f"{module}: {problem}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
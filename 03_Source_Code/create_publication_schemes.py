@@ -4,18 +4,25 @@ Create a Multi-Scale Integration Scheme for war-induced soil contamination resea
 This shows how to integrate findings across different spatial and temporal scales
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.patches import FancyBboxPatch, Rectangle, Circle, FancyArrow, Polygon, Ellipse
+from scheme_bootstrap import apply_style, lazy_import
 import numpy as np
-import seaborn as sns
+from scheme_layout import tight_layout
+from scheme_render import save_scheme
+from scheme_spec import build_scheme, load_spec
+
+plt = lazy_import('matplotlib.pyplot')
 
 # Set style for professional appearance
-plt.style.use('default')
-sns.set_palette("husl")
+apply_style()
+
+# Data files read by each scheme (paths relative to the repository root), tracked by the render cache
+SCHEME_INPUTS = {
+    'create_publication_framework_scheme': ['03_Source_Code/scheme_specs/publication_framework.json']
+}
 
 def create_multiscale_integration_scheme():
     """Create comprehensive multi-scale integration methodological scheme"""
+    from matplotlib.patches import FancyBboxPatch, FancyArrow
     fig, ax = plt.subplots(1, 1, figsize=(22, 16))
     
     # Professional color palette
@@ -233,226 +240,16 @@ def create_multiscale_integration_scheme():
     for i, item in enumerate(qa_items):
         ax.text(1, 1.1 - i*0.15, f"• {item}", fontsize=9, ha='left', va='center')
     
-    plt.tight_layout()
-    plt.savefig('/Users/adim/Documents/Igph/SoilDegradation/Multiscale_Integration_Scheme.png', 
-                dpi=300, bbox_inches='tight', facecolor='white', edgecolor='none')
-    plt.close()
-    print("Created: Multiscale_Integration_Scheme.png")
+    tight_layout(fig)
+    save_scheme(fig, 'Multiscale_Integration_Scheme.png', edgecolor='none')
 
 def create_publication_framework_scheme():
     """Create a scheme specifically for scientific publication methodological sections"""
-    fig, ax = plt.subplots(1, 1, figsize=(20, 14))
-    
-    colors = {
-        'section1': '#3498db',        # Blue
-        'section2': '#e74c3c',        # Red  
-        'section3': '#f39c12',        # Orange
-        'section4': '#27ae60',        # Green
-        'section5': '#9b59b6',        # Purple
-        'header': '#2c3e50',          # Dark blue-gray
-        'quality': '#95a5a6'          # Gray
-    }
-    
-    ax.set_xlim(0, 20)
-    ax.set_ylim(0, 14)
-    ax.axis('off')
-    
-    # Title
-    title_box = FancyBboxPatch((0.5, 12.5), 19, 1.2, boxstyle="round,pad=0.1", 
-                               facecolor=colors['header'], edgecolor='black', linewidth=2)
-    ax.add_patch(title_box)
-    ax.text(10, 13.1, 'Scientific Publication Framework for War-Induced Soil Contamination Studies', 
-            fontsize=16, fontweight='bold', ha='center', va='center', color='white')
-    
-    # Methodology sections for publications
-    sections = [
-        ('Study Area & Site Selection', 0.5, 8.5, 3.8, 3, colors['section1'], [
-            'Geographic Context:',
-            '• Coordinates and elevation',
-            '• Geological setting',
-            '• Climate and hydrology',
-            '• Land use history',
-            '',
-            'Conflict History:',
-            '• Timeline of activities',
-            '• Munition types used',
-            '• Impact assessment',
-            '• Safety considerations'
-        ]),
-        
-        ('Field Methods & Sampling', 4.5, 8.5, 3.8, 3, colors['section2'], [
-            'Geophysical Survey:',
-            '• Equipment specifications',
-            '• Survey parameters',
-            '• Grid design',
-            '• Data acquisition',
-            '',
-            'Soil Sampling:',
-            '• Sampling design',
-            '• Collection protocols',
-            '• Sample preservation',
-            '• Chain of custody'
-        ]),
-        
-        ('Laboratory Analysis', 8.5, 8.5, 3.8, 3, colors['section3'], [
-            'Sample Preparation:',
-            '• Drying and sieving',
-            '• Homogenization',
-            '• Subsampling',
-            '• Storage conditions',
-            '',
-            'Analytical Methods:',
-            '• Equipment details',
-            '• Operating conditions',
-            '• Calibration procedures',
-            '• QA/QC protocols'
-        ]),
-        
-        ('Data Analysis', 12.5, 8.5, 3.8, 3, colors['section4'], [
-            'Statistical Analysis:',
-            '• Descriptive statistics',
-            '• Correlation analysis',
-            '• Spatial analysis',
-            '• Significance testing',
-            '',
-            'Software & Tools:',
-            '• Statistical packages',
-            '• GIS software',
-            '• Specialized programs',
-            '• Version information'
-        ]),
-        
-        ('Quality Control', 16.5, 8.5, 3, 3, colors['section5'], [
-            'Analytical QC:',
-            '• Reference materials',
-            '• Duplicate analyses',
-            '• Blank samples',
-            '• Recovery tests',
-            '',
-            'Data QC:',
-            '• Outlier detection',
-            '• Validation checks',
-            '• Uncertainty analysis',
-            '• Error propagation'
-        ])
-    ]
-    
-    for title, x, y, width, height, color, content in sections:
-        # Section box
-        section_box = FancyBboxPatch((x, y), width, height, boxstyle="round,pad=0.1", 
-                                     facecolor=color, edgecolor='black', linewidth=1)
-        ax.add_patch(section_box)
-        
-        # Title
-        ax.text(x + width/2, y + height - 0.2, title, fontsize=11, fontweight='bold', 
-                ha='center', va='center', color='white')
-        
-        # Content
-        y_pos = y + height - 0.6
-        for item in content:
-            style = 'bold' if item.endswith(':') and item != '' else 'normal'
-            if item == '':
-                y_pos -= 0.1
-            else:
-                ax.text(x + 0.1, y_pos, item, fontsize=9, ha='left', va='center', 
-                        color='white', fontweight=style)
-                y_pos -= 0.2
-    
-    # Results presentation framework
-    results_box = FancyBboxPatch((0.5, 4.5), 19, 3.5, boxstyle="round,pad=0.1", 
-                                 facecolor='lightblue', edgecolor='black', linewidth=1)
-    ax.add_patch(results_box)
-    ax.text(10, 7.7, 'RESULTS PRESENTATION FRAMEWORK', fontsize=14, fontweight='bold', 
-            ha='center', va='center')
-    
-    # Results subsections
-    results_sections = [
-        ('Descriptive Statistics\n& Data Overview', 2, 6.8, [
-            '• Sample distribution maps',
-            '• Summary statistics tables', 
-            '• Data range and variability',
-            '• Detection frequency'
-        ]),
-        ('Spatial Distribution\nAnalysis', 6.5, 6.8, [
-            '• Contamination maps',
-            '• Spatial correlation plots',
-            '• Distance-decay relationships',
-            '• Hotspot identification'
-        ]),
-        ('Source Identification\n& Characterization', 11, 6.8, [
-            '• Principal component analysis',
-            '• Factor analysis results',
-            '• Source apportionment',
-            '• Particle characterization'
-        ]),
-        ('Risk Assessment\n& Implications', 15.5, 6.8, [
-            '• Contamination indices',
-            '• Risk level mapping',
-            '• Exposure assessment',
-            '• Management recommendations'
-        ])
-    ]
-    
-    for title, x, y, items in results_sections:
-        # Subsection title
-        ax.text(x, y, title, fontsize=10, fontweight='bold', ha='center', va='center')
-        
-        # Items
-        for i, item in enumerate(items):
-            ax.text(x-1.5, y-0.5-i*0.2, item, fontsize=9, ha='left', va='center')
-    
-    # Discussion framework
-    discussion_box = FancyBboxPatch((0.5, 1), 19, 3, boxstyle="round,pad=0.1", 
-                                    facecolor='lightgreen', edgecolor='black', linewidth=1)
-    ax.add_patch(discussion_box)
-    ax.text(10, 3.7, 'DISCUSSION FRAMEWORK', fontsize=14, fontweight='bold', 
-            ha='center', va='center')
-    
-    discussion_items = [
-        'Contamination Patterns: Interpretation of spatial and temporal patterns in relation to conflict activities',
-        'Source Attribution: Discussion of contamination sources and their relative contributions', 
-        'Environmental Implications: Assessment of environmental impact and ecosystem effects',
-        'Methodological Evaluation: Critical assessment of methods, limitations, and uncertainties',
-        'Comparison with Literature: Comparison with similar studies and international standards',
-        'Management Implications: Recommendations for remediation, monitoring, and risk management',
-        'Future Research: Identification of knowledge gaps and research priorities'
-    ]
-    
-    for i, item in enumerate(discussion_items):
-        ax.text(1, 3.5 - i*0.3, f"• {item}", fontsize=9, ha='left', va='center')
-    
-    # Add connecting arrows
-    for i in range(len(sections)-1):
-        x1 = sections[i][1] + sections[i][3]
-        x2 = sections[i+1][1]
-        y_arrow = sections[i][2] + sections[i][4]/2
-        arrow = FancyArrow(x1, y_arrow, x2-x1, 0, width=0.05, head_width=0.12, 
-                          head_length=0.08, fc='darkblue', ec='darkblue', alpha=0.6)
-        ax.add_patch(arrow)
-    
-    # Arrow from methods to results
-    arrow_to_results = FancyArrow(10, 8.5, 0, -0.5, width=0.08, head_width=0.15, 
-                                 head_length=0.1, fc='darkgreen', ec='darkgreen', alpha=0.7)
-    ax.add_patch(arrow_to_results)
-    
-    # Arrow from results to discussion
-    arrow_to_discussion = FancyArrow(10, 4.5, 0, -0.5, width=0.08, head_width=0.15, 
-                                    head_length=0.1, fc='darkgreen', ec='darkgreen', alpha=0.7)
-    ax.add_patch(arrow_to_discussion)
-    
-    # Publication standards note
-    standards_box = FancyBboxPatch((0.5, 0.1), 19, 0.7, boxstyle="round,pad=0.05", 
-                                   facecolor='lightyellow', edgecolor='black', linewidth=1)
-    ax.add_patch(standards_box)
-    ax.text(10, 0.45, 'Publication Standards: Follow journal-specific guidelines, ensure reproducibility through detailed methodology, '
-                     'provide supplementary data, and maintain ethical standards for conflict zone research', 
-            fontsize=9, ha='center', va='center', style='italic')
+    # Layout, colours and text live in scheme_specs/publication_framework.json
+    fig, ax = build_scheme(load_spec('publication_framework.json'))
     
-    plt.tight_layout()
-    plt.savefig('/Users/adim/Documents/Igph/SoilDegradation/Publication_Framework_Scheme.png', 
-                dpi=300, bbox_inches='tight', facecolor='white', edgecolor='none')
-    plt.close()
-    print("Created: Publication_Framework_Scheme.png")
+    tight_layout(fig)
+    save_scheme(fig, 'Publication_Framework_Scheme.png', edgecolor='none')
 
 def main():
     """Generate multi-scale integration and publication framework schemes"""
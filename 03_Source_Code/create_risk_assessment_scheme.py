@@ -4,18 +4,21 @@ Create a Risk Assessment and Decision Matrix Scheme for war-induced soil contami
 This complements the existing methodological schemes by providing decision-making frameworks
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.patches import FancyBboxPatch, Rectangle, Circle, FancyArrow, Polygon
+from scheme_bootstrap import apply_style, lazy_import
 import numpy as np
-import seaborn as sns
+from scheme_layout import tight_layout
+from scheme_render import save_scheme
+from scheme_shapes import rectangles, segments
+import risk_matrix
+
+plt = lazy_import('matplotlib.pyplot')
 
 # Set style for professional appearance
-plt.style.use('default')
-sns.set_palette("husl")
+apply_style()
 
 def create_risk_assessment_scheme():
     """Create comprehensive risk assessment and decision matrix scheme"""
+    from matplotlib.patches import FancyBboxPatch, FancyArrow
     fig, ax = plt.subplots(1, 1, figsize=(24, 16))
     
     # Professional color palette
@@ -70,24 +73,15 @@ def create_risk_assessment_scheme():
     ax.text(12.5, 13.5, 'CONTAMINATION RISK MATRIX', fontsize=14, fontweight='bold', 
             ha='center', va='center', color='black')
     
-    # Create risk matrix grid
-    contamination_levels = ['Low\n(<2x background)', 'Moderate\n(2-5x background)', 
-                           'High\n(5-10x background)', 'Very High\n(>10x background)']
-    exposure_levels = ['Low\nRisk', 'Medium\nRisk', 'High\nRisk', 'Critical\nRisk']
-    
-    # Matrix cells
-    risk_colors = [
-        [colors['low_risk'], colors['low_risk'], colors['medium_risk'], colors['medium_risk']],
-        [colors['low_risk'], colors['medium_risk'], colors['medium_risk'], colors['high_risk']],
-        [colors['medium_risk'], colors['medium_risk'], colors['high_risk'], colors['high_risk']],
-        [colors['medium_risk'], colors['high_risk'], colors['high_risk'], colors['high_risk']]
-    ]
+    # Create risk matrix grid from the classifier's definition (risk_matrix.RISK_MATRIX)
+    contamination_levels = risk_matrix.contamination_labels()
+    exposure_levels = [f'{level}\nRisk' for level in risk_matrix.EXPOSURE_LEVELS]
+    class_colors = np.array([colors['low_risk'], colors['medium_risk'], colors['high_risk']])
     
-    for i in range(4):
-        for j in range(4):
-            cell = Rectangle((9 + j*1.8, 9.5 + i*1.0), 1.7, 0.9, 
-                           facecolor=risk_colors[i][j], edgecolor='black', linewidth=1)
-            ax.add_patch(cell)
+    # All 16 cells as one collection (row i = exposure, column j = contamination)
+    rows, cols = np.divmod(np.arange(risk_matrix.RISK_MATRIX.size), risk_matrix.RISK_MATRIX.shape[1])
+    rectangles(ax, 9 + cols*1.8, 9.5 + rows*1.0, 1.7, 0.9,
+               facecolor=class_colors[risk_matrix.RISK_MATRIX.ravel()], edgecolor='black', linewidth=1)
     
     # Matrix labels
     ax.text(8.2, 11.5, 'Exposure\nPotential', fontsize=11, fontweight='bold', 
@@ -109,15 +103,13 @@ def create_risk_assessment_scheme():
     ax.text(20.5, 13.5, 'DECISION FRAMEWORK', fontsize=14, fontweight='bold', 
             ha='center', va='center', color='white')
     
-    decisions = [
-        'LOW RISK: Monitoring only',
-        'MEDIUM RISK: Enhanced monitoring',
-        '                + Risk communication',
-        'HIGH RISK: Active remediation',
-        '                + Access restrictions',
-        'CRITICAL: Immediate intervention',
-        '                + Emergency protocols'
-    ]
+    # One line per risk class decision, continued after each ' + ', then the Critical escalation
+    decisions = []
+    for label, decision in [(f'{name.upper()} RISK', decision) for name, decision in
+                            zip(risk_matrix.RISK_CLASSES, risk_matrix.DECISIONS)] + \
+                           [('CRITICAL', risk_matrix.CRITICAL_DECISION)]:
+        first, *more = decision.split(' + ')
+        decisions += [f'{label}: {first}'] + [f'                + {line}' for line in more]
     
     for i, decision in enumerate(decisions):
         ax.text(18, 13.2 - i*0.25, decision, fontsize=10, ha='left', va='center', color='white')
@@ -129,12 +121,12 @@ def create_risk_assessment_scheme():
     ax.text(4, 9.5, 'MONITORING PROTOCOLS', fontsize=14, fontweight='bold', 
             ha='center', va='center', color='white')
     
-    monitor_items = [
-        'Frequency Guidelines:',
-        '• Low Risk: Annual monitoring',
-        '• Medium Risk: Quarterly monitoring',
-        '• High Risk: Monthly monitoring',
-        '• Critical Risk: Continuous monitoring',
+    # Monitoring frequency per risk class (risk_matrix.MONITORING) and the Critical escalation
+    monitor_items = ['Frequency Guidelines:'] + [
+        f'• {name} Risk: {frequency} monitoring'
+        for name, frequency in zip(risk_matrix.RISK_CLASSES + ('Critical',),
+                                   risk_matrix.MONITORING + (risk_matrix.CRITICAL_MONITORING,))
+    ] + [
         '',
         'Key Indicators:',
         '• Metal bioavailability',
@@ -221,16 +213,11 @@ def create_risk_assessment_scheme():
     ax.text(12.5, 8.5, 'RISK LEVEL LEGEND', fontsize=12, fontweight='bold', 
             ha='center', va='center')
     
-    legend_items = [
-        ('Low Risk', colors['low_risk']),
-        ('Medium Risk', colors['medium_risk']),
-        ('High Risk', colors['high_risk'])
-    ]
+    legend_items = [(f'{name} Risk', color) for name, color in zip(risk_matrix.RISK_CLASSES, class_colors)]
     
+    rectangles(ax, 9.5 + np.arange(len(legend_items))*2, 7.5, 0.3, 0.3,
+               facecolor=[color for _, color in legend_items], edgecolor='black', linewidth=1)
     for i, (label, color) in enumerate(legend_items):
-        legend_rect = Rectangle((9.5 + i*2, 7.5), 0.3, 0.3, facecolor=color, 
-                               edgecolor='black', linewidth=1)
-        ax.add_patch(legend_rect)
         ax.text(10 + i*2, 7.65, label, fontsize=10, ha='left', va='center')
     
     # Add methodology note
@@ -251,14 +238,12 @@ def create_risk_assessment_scheme():
     for i, note in enumerate(notes):
         ax.text(1, 4.2 - i*0.25, note, fontsize=10, ha='left', va='center')
     
-    plt.tight_layout()
-    plt.savefig('/Users/adim/Documents/Igph/SoilDegradation/Risk_Assessment_Decision_Matrix_Scheme.png', 
-                dpi=300, bbox_inches='tight', facecolor='white', edgecolor='none')
-    plt.close()
-    print("Created: Risk_Assessment_Decision_Matrix_Scheme.png")
+    tight_layout(fig)
+    save_scheme(fig, 'Risk_Assessment_Decision_Matrix_Scheme.png', edgecolor='none')
 
 def create_temporal_monitoring_scheme():
     """Create temporal monitoring and trend analysis scheme"""
+    from matplotlib.patches import FancyBboxPatch, FancyArrow, Polygon
     fig, ax = plt.subplots(1, 1, figsize=(20, 14))
     
     colors = {
@@ -295,11 +280,12 @@ def create_temporal_monitoring_scheme():
         ('Long-term\n(2-10 years)', 15, colors['long_term'])
     ]
     
+    # Vertical phase markers on the timeline
+    phase_x = [x_pos for _, x_pos, _ in phases]
+    segments(ax, phase_x, 7.5, phase_x, 8.5, colors=[color for _, _, color in phases],
+             linewidth=3, capstyle='projecting')
+    
     for phase_name, x_pos, color in phases:
-        # Vertical line
-        phase_line = plt.Line2D([x_pos, x_pos], [7.5, 8.5], color=color, linewidth=3)
-        ax.add_line(phase_line)
-        
         # Phase label
         phase_box = FancyBboxPatch((x_pos-1, 9), 2, 1, boxstyle="round,pad=0.1", 
                                    facecolor=color, edgecolor='black', linewidth=1)
@@ -398,11 +384,8 @@ def create_temporal_monitoring_scheme():
         ax.add_patch(decision_diamond)
         ax.text(x_pos+3, decision_y, 'Decision\nPoint', fontsize=8, ha='center', va='center')
     
-    plt.tight_layout()
-    plt.savefig('/Users/adim/Documents/Igph/SoilDegradation/Temporal_Monitoring_Scheme.png', 
-                dpi=300, bbox_inches='tight', facecolor='white', edgecolor='none')
-    plt.close()
-    print("Created: Temporal_Monitoring_Scheme.png")
+    tight_layout(fig)
+    save_scheme(fig, 'Temporal_Monitoring_Scheme.png', edgecolor='none')
 
 def main():
     """Generate risk assessment and temporal monitoring schemes"""
@@ -4,24 +4,42 @@ Comprehensive Soil Contamination Indicators Visualization Generator
 Creates detailed visual schemes for war-induced soil investigation indicators
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.patches import FancyBboxPatch, Circle, Rectangle
+from scheme_bootstrap import apply_style, lazy_import
 import numpy as np
-import seaborn as sns
-from matplotlib.gridspec import GridSpec
-import pandas as pd
+import os
+from scheme_layout import tight_layout
+import scheme_render
+from scheme_render import save_scheme
+from scheme_layers import static_layer
+from scheme_labels import place_labels
+from indicator_database import load as load_indicator_database
+import mcda
+import budget
+
+plt = lazy_import('matplotlib.pyplot')
 
 # Set style
-plt.style.use('default')
-sns.set_palette("husl")
+apply_style()
 
-def create_soil_indicators_matrix():
-    """Create comprehensive soil indicators classification matrix"""
-    
-    # Create figure with custom layout
-    fig = plt.figure(figsize=(20, 16))
-    gs = GridSpec(4, 4, figure=fig, hspace=0.3, wspace=0.2)
+# Data files read by each scheme (paths relative to the repository root), tracked by the render cache
+SCHEME_INPUTS = {
+    'create_soil_indicators_matrix': ['03_Source_Code/scheme_specs/indicator_priority_panels.json'],
+    'create_cost_benefit_analysis': ['04_Research_Articles/Improved_Soil_Indicators_Database.csv'],
+    'create_mcda_sensitivity_analysis': ['04_Research_Articles/Improved_Soil_Indicators_Database.csv']
+}
+
+# These builders return their figure; the caller saves it to the matching file
+OUTPUT_SUBDIR = '02_Methodological_Schemes/Data_Synthesis_Schemes'
+OUTPUT_FILES = {
+    'create_soil_indicators_matrix': f'{OUTPUT_SUBDIR}/Soil_Indicators_Classification_Matrix.png',
+    'create_analytical_methods_flowchart': f'{OUTPUT_SUBDIR}/Soil_Analysis_Methods_Flowchart.png',
+    'create_cost_benefit_analysis': f'{OUTPUT_SUBDIR}/Soil_Indicators_Cost_Benefit_Analysis.png',
+    'create_mcda_sensitivity_analysis': f'{OUTPUT_SUBDIR}/Soil_Indicators_MCDA_Sensitivity.png'
+}
+
+def _draw_indicators_framework(fig, gs):
+    """Static part of the indicators matrix: title, category overview, workflow, matrix and footer"""
+    from matplotlib.patches import FancyBboxPatch, Circle, Rectangle
     
     # Main title
     fig.suptitle('Comprehensive Soil Contamination Indicators Framework\nfor War-Induced Environmental Assessment', 
@@ -153,27 +171,25 @@ def create_soil_indicators_matrix():
             # Indicator name
             ax_matrix.text(1.3, y_pos, indicator, fontsize=10, va='center')
     
-    # Priority matrix and timing chart (bottom row)
-    ax_priority = fig.add_subplot(gs[3, :2])
-    ax_timing = fig.add_subplot(gs[3, 2:])
+    # Add footer information
+    fig.text(0.02, 0.02, 'Source: Enhanced War-Induced Soil Investigation Framework | Data: Improved Soil Indicators Database', 
+             fontsize=10, style='italic')
+    fig.text(0.98, 0.02, 'Created for Scientific Publication Standards', 
+             fontsize=10, style='italic', ha='right')
+
+def _draw_priority_panels(ax_priority, ax_timing, panels):
+    """Data-driven part of the indicators matrix: priority matrix and persistence/timing scatter"""
     
     # Priority matrix
-    ax_priority.set_title('Analysis Priority Matrix', fontsize=14, fontweight='bold')
-    
-    # Create priority data
-    priority_data = np.array([
-        [3, 2, 1, 2],  # Immediate
-        [2, 3, 2, 1],  # Short-term
-        [1, 2, 3, 2],  # Medium-term
-        [1, 1, 2, 3]   # Long-term
-    ])
+    priority = panels['priority']
+    ax_priority.set_title(priority['title'], fontsize=14, fontweight='bold')
+    priority_data = np.array(priority['matrix'])
     
     im = ax_priority.imshow(priority_data, cmap='RdYlBu_r', aspect='auto')
     
     # Labels
-    time_periods = ['Immediate\n(0-1 month)', 'Short-term\n(1-6 months)', 
-                   'Medium-term\n(6-24 months)', 'Long-term\n(2+ years)']
-    category_short = ['Chemical', 'Physical', 'Biological', 'Nutritional']
+    time_periods = priority['periods']
+    category_short = priority['categories']
     
     ax_priority.set_xticks(range(len(category_short)))
     ax_priority.set_xticklabels(category_short, rotation=45)
@@ -183,25 +199,20 @@ def create_soil_indicators_matrix():
     # Add values to cells
     for i in range(len(time_periods)):
         for j in range(len(category_short)):
-            priority_text = ['Low', 'Medium', 'High'][priority_data[i, j] - 1]
+            priority_text = priority['levels'][priority_data[i, j] - 1]
             ax_priority.text(j, i, priority_text, ha='center', va='center', 
                            fontweight='bold', color='white' if priority_data[i, j] == 3 else 'black')
     
     # Timing and persistence chart
-    ax_timing.set_title('Indicator Persistence and Optimal Timing', fontsize=14, fontweight='bold')
-    
-    # Sample data for timing
-    indicators_sample = ['Heavy metals', 'Explosive residues', 'pH variations', 'Bulk density', 
-                        'Organic matter', 'Soil moisture', 'Biological activity']
-    persistence = [10, 3, 2, 8, 6, 0.5, 1]  # years
-    optimal_timing = [1, 0.1, 0.5, 2, 4, 0.2, 1]  # months
+    timing = panels['timing']
+    category_colors = panels['category_colors']
+    ax_timing.set_title(timing['title'], fontsize=14, fontweight='bold')
     
     # Create scatter plot
-    colors = ['#FF6B6B', '#FF6B6B', '#FF6B6B', '#4ECDC4', '#45B7D1', '#4ECDC4', '#45B7D1']
-    
-    for i, (ind, pers, timing, color) in enumerate(zip(indicators_sample, persistence, optimal_timing, colors)):
-        ax_timing.scatter(timing, pers, s=200, alpha=0.7, color=color, edgecolors='black')
-        ax_timing.annotate(ind, (timing, pers), xytext=(5, 5), textcoords='offset points', 
+    for ind, pers, months, category in zip(timing['indicators'], timing['persistence_years'],
+                                           timing['optimal_timing_months'], timing['category']):
+        ax_timing.scatter(months, pers, s=200, alpha=0.7, color=category_colors[category], edgecolors='black')
+        ax_timing.annotate(ind, (months, pers), xytext=(5, 5), textcoords='offset points', 
                           fontsize=8, rotation=15)
     
     ax_timing.set_xlabel('Optimal Analysis Timing (months post-conflict)')
@@ -212,24 +223,33 @@ def create_soil_indicators_matrix():
     
     # Add legend and annotations
     legend_elements = [
-        plt.Line2D([0], [0], marker='o', color='w', markerfacecolor='#FF6B6B', markersize=10, label='Chemical'),
-        plt.Line2D([0], [0], marker='o', color='w', markerfacecolor='#4ECDC4', markersize=10, label='Physical'),
-        plt.Line2D([0], [0], marker='o', color='w', markerfacecolor='#45B7D1', markersize=10, label='Biological'),
-        plt.Line2D([0], [0], marker='o', color='w', markerfacecolor='#96CEB4', markersize=10, label='Nutritional')
+        plt.Line2D([0], [0], marker='o', color='w', markerfacecolor=color, markersize=10, label=category)
+        for category, color in category_colors.items()
     ]
     ax_timing.legend(handles=legend_elements, loc='upper right')
+
+def create_soil_indicators_matrix():
+    """Create comprehensive soil indicators classification matrix"""
+    from matplotlib.gridspec import GridSpec
     
-    # Add footer information
-    fig.text(0.02, 0.02, 'Source: Enhanced War-Induced Soil Investigation Framework | Data: Improved Soil Indicators Database', 
-             fontsize=10, style='italic')
-    fig.text(0.98, 0.02, 'Created for Scientific Publication Standards', 
-             fontsize=10, style='italic', ha='right')
+    # Create figure with custom layout
+    fig = plt.figure(figsize=(20, 16))
+    gs = GridSpec(4, 4, figure=fig, hspace=0.3, wspace=0.2)
+    _draw_indicators_framework(fig, gs)
+    
+    # Priority matrix and timing chart (bottom row) are redrawn over the cached static layer
+    ax_priority = fig.add_subplot(gs[3, :2])
+    ax_timing = fig.add_subplot(gs[3, 2:])
+    # Panel contents live in scheme_specs/indicator_priority_panels.json
+    from scheme_spec import load_spec
+    _draw_priority_panels(ax_priority, ax_timing, load_spec('indicator_priority_panels.json'))
     
-    plt.tight_layout()
+    static_layer(fig, [ax_priority, ax_timing], _draw_indicators_framework).tight_layout()
     return fig
 
 def create_analytical_methods_flowchart():
     """Create analytical methods and equipment flowchart"""
+    from matplotlib.patches import FancyBboxPatch, Rectangle
     
     fig, ax = plt.subplots(figsize=(18, 14))
     ax.set_xlim(0, 12)
@@ -370,98 +390,265 @@ def create_analytical_methods_flowchart():
     ax.text(11.5, 0.2, 'Adapted from international soil analysis standards', 
             fontsize=10, style='italic', ha='right')
     
-    plt.tight_layout()
+    tight_layout(fig)
     return fig
 
-def create_cost_benefit_analysis():
-    """Create cost-benefit analysis visualization"""
+# Criteria of the decision matrix: label -> database column (Analysis_Complexity is inverted)
+DECISION_CRITERIA = {
+    'Immediate need': 'Conflict_Relevance',
+    'Cost effectiveness': 'Cost_Effectiveness',
+    'Technical feasibility': 'Analysis_Complexity',
+    'Data availability': 'Data_Availability'
+}
+# Ratings averaged into the benefit score (all Low/Medium/High columns but cost)
+BENEFIT_COLUMNS = ['Conflict_Relevance', 'Data_Availability', 'Indicator_Capacity', 'Reliability',
+                   'Sensitivity', 'Predictive_Power', 'Policy_Relevance', 'Impact_Scope', 'Health_Impact']
+# Analytical_Priority 1-4 -> sampling phase and marker colour; rows without a priority are grey
+PRIORITY_PHASES = budget.PHASES
+PRIORITY_COLORS = np.array(['red', 'orange', 'gold', 'green'])
+UNKNOWN_PRIORITY_COLOR = 'lightgray'
+# Decision matrix cells whose rating is missing
+UNKNOWN_RATING_COLOR = 'lightgray'
+# Monte Carlo scenarios behind the cumulative cost fan chart
+BUDGET_DRAWS = 200_000
+
+def _rating_share(values):
+    """Low/Medium/High scores (1-3) as a 0-1 share"""
+    return (np.asarray(values, float) - 1) / 2
+
+def cost_benefit_scores(db, rows=None):
+    """Per-indicator cost-benefit arrays of the database rows selected by rows (default: all)
+
+    cost            midpoints of the equipment and analysis cost ranges added (USD)
+    reliability     mean of Reliability, Sensitivity and Predictive_Power (0-100 %)
+    priority        Analytical_Priority (1-4, -1 when missing); essential: Conflict_Relevance is High
+    criteria        DECISION_CRITERIA ratings (1-3), one row per criterion
+    benefit         mean of the BENEFIT_COLUMNS ratings (0-10)
+    roi             benefit scaled by Cost_Effectiveness / 3 (0-10)
+    difficulty      Analysis_Complexity plus one per cost step above 500 and 3000 USD (1-5)
+
+    Missing ratings (-1) follow mcda's policy: they are NaN in criteria, means are taken over the
+    available ratings (mcda.rating_mean), and values resting on one missing rating are NaN.
+    """
+    rows = slice(None) if rows is None else rows
+
+    def column(name):
+        return db[name][rows]
+
+    def ratings(*names):
+        values = np.array([column(name) for name in names], float)
+        return np.where(values < 0, np.nan, values)
+    cost = np.nansum([(column(f'{name}_min') + column(f'{name}_max')) / 2
+                      for name in ('Equipment_Cost_USD', 'Analysis_Cost_USD')], axis=0)
+    benefit = 10 * _rating_share(mcda.rating_mean(ratings(*BENEFIT_COLUMNS)))
+    criteria = np.array([4 - ratings(name)[0] if name == 'Analysis_Complexity' else ratings(name)[0]
+                         for name in DECISION_CRITERIA.values()])
+    priority = column('Analytical_Priority')
+    return {
+        'names': column('Indicator'),
+        'cost': cost,
+        'reliability': 100 * _rating_share(mcda.rating_mean(ratings('Reliability', 'Sensitivity',
+                                                                    'Predictive_Power'))),
+        'priority': np.where((priority >= 1) & (priority <= len(PRIORITY_PHASES)), priority, -1),
+        'essential': column('Conflict_Relevance') == 3,
+        'benefit': benefit,
+        'roi': benefit * ratings('Cost_Effectiveness')[0] / 3,
+        'difficulty': ratings('Analysis_Complexity')[0] + np.digitize(cost, [500, 3000]),
+        'criteria': criteria
+    }
+
+def select_indicators(db, indicators=None):
+    """Row numbers of the named indicators in the database (all rows when indicators is None)"""
+    if indicators is None:
+        return np.arange(len(db))
+    indicators = np.asarray(list(indicators), str)
+    found = np.isin(indicators, db['Indicator'])
+    if not found.all():
+        raise KeyError(f"Unknown indicators: {', '.join(indicators[~found])}")
+    order = np.argsort(db['Indicator'])
+    return order[np.searchsorted(db['Indicator'], indicators, sorter=order)]
+
+def create_cost_benefit_analysis(indicators=None, db=None):
+    """Create cost-benefit analysis visualization
+
+    All values come from the indicator database (db, default indicator_database.load()); indicators
+    restricts the figure to those indicator names, in that order.
+    """
+    # The layout cache knows the builder and its CSV input, not a custom selection
+    custom = indicators is not None or db is not None
+    db = load_indicator_database() if db is None else db
+    rows = select_indicators(db, indicators)
+    scores = cost_benefit_scores(db, rows)
+    names, cost = scores['names'], scores['cost']
+    count = len(names)
+    label_size = 8 if count <= 30 else 6 if count <= 100 else 4
     
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
     fig.suptitle('Cost-Benefit Analysis for Soil Contamination Indicators', fontsize=18, fontweight='bold')
     
-    # Cost vs Reliability scatter plot
-    indicators = ['pH', 'EC', 'Moisture', 'Heavy metals', 'Explosives', 'PFAS', 'Organic matter', 
-                 'Bulk density', 'NPK', 'Biological activity']
-    costs = [50, 100, 150, 2000, 3000, 5000, 200, 200, 300, 1000]
-    reliability = [95, 90, 85, 85, 70, 75, 80, 90, 85, 70]
-    urgency = [3, 3, 2, 1, 1, 2, 2, 2, 2, 2]  # 1=immediate, 2=short-term, 3=routine
-    
-    colors = ['red' if u==1 else 'orange' if u==2 else 'green' for u in urgency]
-    
-    ax1.scatter(costs, reliability, c=colors, s=100, alpha=0.7, edgecolors='black')
-    
-    for i, txt in enumerate(indicators):
-        ax1.annotate(txt, (costs[i], reliability[i]), xytext=(5, 5), 
-                    textcoords='offset points', fontsize=8, rotation=15)
-    
-    ax1.set_xlabel('Analysis Cost (USD)')
+    # Cost vs Reliability scatter plot, coloured by analytical priority; indicators with none of
+    # the reliability ratings cannot be placed and are counted in the title
+    rated = np.isfinite(scores['reliability'])
+    known = rated & (scores['priority'] > 0)
+    unknown = rated & (scores['priority'] <= 0)
+    ax1.scatter(cost[known], scores['reliability'][known], c=PRIORITY_COLORS[scores['priority'][known] - 1],
+                s=100, alpha=0.7, edgecolors='black')
+    if unknown.any():
+        ax1.scatter(cost[unknown], scores['reliability'][unknown], c=UNKNOWN_PRIORITY_COLOR, s=100, alpha=0.7,
+                    edgecolors='black', label='Unknown priority')
+        ax1.legend(loc='lower right', fontsize=8)
+    ax1.set_xlabel('Equipment + Analysis Cost (USD)')
     ax1.set_ylabel('Reliability (%)')
-    ax1.set_title('Cost vs Reliability Analysis')
+    ax1.set_title('Cost vs Reliability Analysis' +
+                  (f' ({(~rated).sum()} without ratings not shown)' if not rated.all() else ''))
     ax1.set_xscale('log')
+    ax1.xaxis.set_minor_formatter(plt.NullFormatter())
+    ax1.set_ylim(-10, 115)
     ax1.grid(True, alpha=0.3)
     
     # Priority matrix heatmap
-    priority_matrix = np.array([
-        [3, 2, 1, 2, 1, 1, 2, 2, 2, 2],  # Immediate need
-        [2, 3, 2, 3, 2, 2, 3, 3, 3, 3],  # Cost effectiveness
-        [3, 3, 2, 3, 3, 3, 3, 2, 2, 2],  # Technical feasibility
-        [2, 2, 3, 2, 1, 1, 2, 3, 3, 2]   # Data availability
-    ])
-    
-    im = ax2.imshow(priority_matrix, cmap='RdYlGn', aspect='auto')
-    
-    criteria = ['Immediate need', 'Cost effectiveness', 'Technical feasibility', 'Data availability']
-    ax2.set_xticks(range(len(indicators)))
-    ax2.set_xticklabels(indicators, rotation=45, ha='right')
-    ax2.set_yticks(range(len(criteria)))
-    ax2.set_yticklabels(criteria)
+    # Missing ratings are NaN and drawn in the colormap's 'bad' colour
+    im = ax2.imshow(scores['criteria'], cmap=plt.colormaps['RdYlGn'].with_extremes(bad=UNKNOWN_RATING_COLOR),
+                    aspect='auto', vmin=1, vmax=3)
+    
+    # Label at most ~40 indicators along the matrix so the names stay readable
+    step = max(1, int(np.ceil(count / 40)))
+    ax2.set_xticks(np.arange(0, count, step))
+    ax2.set_xticklabels(names[::step], rotation=45, ha='right', fontsize=label_size + 1)
+    ax2.set_yticks(range(len(DECISION_CRITERIA)))
+    ax2.set_yticklabels(list(DECISION_CRITERIA))
     ax2.set_title('Multi-criteria Decision Matrix')
     
     # Add colorbar
     cbar = plt.colorbar(im, ax=ax2, shrink=0.8)
     cbar.set_label('Priority Score')
     
-    # Time vs Cost analysis
-    time_periods = ['Immediate\n(0-1 month)', 'Short-term\n(1-6 months)', 
-                   'Medium-term\n(6-24 months)', 'Long-term\n(2+ years)']
-    cumulative_costs = [3000, 8000, 15000, 25000]
-    essential_costs = [2000, 4000, 6000, 8000]
-    
-    x_pos = range(len(time_periods))
+    # Cumulative cost of each sampling phase (Analytical_Priority 1-4) as percentile bands over
+    # simulated campaigns, since the database only gives cost ranges
+    campaign = budget.simulate(db, rows, draws=BUDGET_DRAWS)
+    x_pos = np.arange(len(PRIORITY_PHASES))
     
-    ax3.bar(x_pos, cumulative_costs, alpha=0.7, label='Comprehensive analysis', color='lightcoral')
-    ax3.bar(x_pos, essential_costs, alpha=0.7, label='Essential indicators only', color='lightblue')
+    budget.fan_chart(ax3, campaign['all'], x_pos, color='lightcoral', label='Comprehensive analysis')
+    budget.fan_chart(ax3, campaign['essential'], x_pos, color='steelblue', label='Essential indicators only')
     
     ax3.set_xlabel('Time Period')
     ax3.set_ylabel('Cumulative Cost (USD)')
-    ax3.set_title('Cumulative Analysis Costs Over Time')
+    ax3.set_title('Cumulative Analysis Costs Over Time' +
+                  (f" ({campaign['excluded']} without priority excluded)" if campaign['excluded'] else ''))
     ax3.set_xticks(x_pos)
-    ax3.set_xticklabels(time_periods)
-    ax3.legend()
+    ax3.set_xticklabels(PRIORITY_PHASES)
+    ax3.legend(fontsize=8, loc='upper left')
     ax3.grid(True, alpha=0.3)
     
-    # ROI analysis
-    indicators_roi = ['pH', 'Heavy metals', 'Explosives', 'Biological activity', 'PFAS']
-    roi_scores = [8.5, 7.2, 9.1, 6.8, 5.4]  # Return on investment score
-    implementation_difficulty = [1, 4, 5, 3, 5]  # 1=easy, 5=very difficult
-    
-    bubble_sizes = [score * 50 for score in roi_scores]
-    
-    ax4.scatter(implementation_difficulty, roi_scores, s=bubble_sizes, alpha=0.6, 
-               c=range(len(indicators_roi)), cmap='viridis', edgecolors='black')
-    
-    for i, txt in enumerate(indicators_roi):
-        ax4.annotate(txt, (implementation_difficulty[i], roi_scores[i]), 
-                    ha='center', va='center', fontweight='bold', color='white')
+    # ROI analysis; ROI and difficulty are unknown when a rating they rest on is missing
+    placed = np.isfinite(scores['roi']) & np.isfinite(scores['difficulty'])
+    roi, difficulty = scores['roi'][placed], scores['difficulty'][placed]
+    ax4.scatter(difficulty, roi, s=roi * 50, alpha=0.6,
+                c=roi, cmap='viridis', vmin=0, vmax=10, edgecolors='black')
     
     ax4.set_xlabel('Implementation Difficulty (1=Easy, 5=Very Difficult)')
     ax4.set_ylabel('Return on Investment Score')
-    ax4.set_title('ROI vs Implementation Difficulty')
+    ax4.set_title('ROI vs Implementation Difficulty' +
+                  (f' ({(~placed).sum()} without ratings not shown)' if not placed.all() else ''))
     ax4.grid(True, alpha=0.3)
     ax4.set_xlim(0.5, 5.5)
-    ax4.set_ylim(4, 10)
+    ax4.set_ylim(0, 11)
+    
+    if custom:
+        fig.tight_layout()
+    else:
+        tight_layout(fig)
+    # Labels are placed on the final axes so the overlap checks see the real layout
+    # With many indicators, names that would overlap are left out instead of stacked
+    dense = count > 30
+    place_labels(ax1, cost[rated], scores['reliability'][rated], names[rated], fontsize=label_size,
+                 marker_size=11, drop_unplaced=dense)
+    place_labels(ax4, difficulty, roi, names[placed], fontsize=label_size,
+                 marker_size=np.sqrt(roi * 50), drop_unplaced=dense, fontweight='bold')
+    return fig
+
+def create_mcda_sensitivity_analysis(indicators=None, db=None, samples=mcda.SWEEP_SAMPLES):
+    """Create MCDA ranking and weight-sensitivity visualization
+
+    Ranks the indicators with the weighted sum, TOPSIS and PROMETHEE II (mcda.METHODS) under
+    equal weights, then re-ranks them under samples random weight vectors; every panel is drawn
+    with one call per method, not per indicator.
+    """
+    custom = indicators is not None or db is not None or samples != mcda.SWEEP_SAMPLES
+    db = load_indicator_database() if db is None else db
+    rows = select_indicators(db, indicators)
+    results = {method: mcda.analyze(db, method, samples, rows=rows) for method in mcda.METHODS}
+    topsis = results['topsis']
+    names, count = topsis['names'], len(rows)
+    order = np.argsort(topsis['base_ranks'], kind='stable')
+    y = np.arange(count)
+    label_size = 9 if count <= 30 else 6 if count <= 100 else 4
+    method_labels = {'weighted_sum': 'Weighted sum', 'topsis': 'TOPSIS', 'outranking': 'PROMETHEE II'}
+    method_colors = {'weighted_sum': '#3498db', 'topsis': '#e67e22', 'outranking': '#27ae60'}
+    
+    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(18, 14))
+    fig.suptitle(f'Multi-Criteria Ranking of Soil Indicators and Sensitivity to '
+                 f'{samples:,} Random Weightings', fontsize=18, fontweight='bold')
+    
+    # Base scores (equal weights), each method rescaled to 0-1, indicators in TOPSIS order
+    height = 0.8 / len(mcda.METHODS)
+    for k, (method, result) in enumerate(results.items()):
+        score = result['base_scores'][order]
+        score = (score - score.min()) / max(np.ptp(score), 1e-12)
+        ax1.barh(y + (k - 1) * height, score, height=height, color=method_colors[method],
+                 label=method_labels[method])
+    ax1.set_yticks(y)
+    ax1.set_yticklabels(names[order], fontsize=label_size)
+    ax1.invert_yaxis()
+    ax1.set_xlabel('Relative score under equal weights (best = 1)')
+    ax1.set_title('Base Ranking by Method')
+    ax1.legend(loc='lower right')
+    ax1.grid(True, axis='x', alpha=0.3)
+    
+    # TOPSIS rank distribution over the sweep, base rank marked
+    im = ax2.imshow(topsis['stability']['histogram'][order], cmap='magma_r', aspect='auto',
+                    extent=(0.5, count + 0.5, count - 0.5, -0.5), vmin=0, vmax=1)
+    ax2.scatter(topsis['base_ranks'][order], y, marker='|', s=60, color='#2980b9', label='Equal-weight rank')
+    ax2.set_yticks(y)
+    ax2.set_yticklabels(names[order], fontsize=label_size)
+    ax2.set_xlabel('Rank')
+    ax2.set_title('TOPSIS Rank Distribution across Weightings')
+    ax2.legend(loc='lower right', fontsize=9)
+    cbar = plt.colorbar(im, ax=ax2, shrink=0.8)
+    cbar.set_label('Share of weightings')
+    
+    # Rank ranges (5th-95th percentile) around the median rank, per method
+    for k, (method, result) in enumerate(results.items()):
+        stability = result['stability']
+        median = stability['median'][order]
+        ax3.errorbar(median, y + (k - 1) * height,
+                     xerr=[median - stability['p05'][order], stability['p95'][order] - median],
+                     fmt='o', markersize=4, capsize=2, color=method_colors[method], label=method_labels[method])
+    ax3.set_yticks(y)
+    ax3.set_yticklabels(names[order], fontsize=label_size)
+    ax3.invert_yaxis()
+    ax3.set_xlabel('Rank (median and 5th-95th percentile)')
+    ax3.set_title('Rank Stability under Weight Uncertainty')
+    ax3.legend(loc='upper right')
+    ax3.grid(True, alpha=0.3)
     
-    plt.tight_layout()
+    # Share of weightings that keep each indicator's base rank or place it in the top 5
+    shares = np.column_stack([result['stability'][key][order] for key in ('base_share', 'top_share')
+                              for result in results.values()])
+    im = ax4.imshow(shares, cmap='RdYlGn', aspect='auto', vmin=0, vmax=1)
+    ax4.set_xticks(range(shares.shape[1]))
+    ax4.set_xticklabels([f'{method_labels[method]}\n{key}' for key in ('same rank', 'top 5')
+                         for method in results], fontsize=8, rotation=20, ha='right')
+    ax4.set_yticks(y)
+    ax4.set_yticklabels(names[order], fontsize=label_size)
+    ax4.set_title('Rank Agreement across Weightings')
+    cbar = plt.colorbar(im, ax=ax4, shrink=0.8)
+    cbar.set_label('Share of weightings')
+    
+    if custom:
+        fig.tight_layout()
+    else:
+        tight_layout(fig)
     return fig
 
 def main():
@@ -469,37 +656,33 @@ def main():
     
     print("Generating comprehensive soil indicators visualization schemes...")
     
-    # Create output directory
-    import os
-    output_dir = "/Users/adim/Documents/Igph/SoilDegradation/02_Methodological_Schemes/Data_Synthesis_Schemes"
-    
     # Generate main indicators framework
     print("Creating main indicators classification matrix...")
     fig1 = create_soil_indicators_matrix()
-    fig1.savefig(f"{output_dir}/Soil_Indicators_Classification_Matrix.png", 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close(fig1)
+    save_scheme(fig1, OUTPUT_FILES['create_soil_indicators_matrix'])
     
     # Generate analytical methods flowchart
     print("Creating analytical methods flowchart...")
     fig2 = create_analytical_methods_flowchart()
-    fig2.savefig(f"{output_dir}/Soil_Analysis_Methods_Flowchart.png", 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close(fig2)
+    save_scheme(fig2, OUTPUT_FILES['create_analytical_methods_flowchart'])
     
     # Generate cost-benefit analysis
     print("Creating cost-benefit analysis...")
     fig3 = create_cost_benefit_analysis()
-    fig3.savefig(f"{output_dir}/Soil_Indicators_Cost_Benefit_Analysis.png", 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close(fig3)
+    save_scheme(fig3, OUTPUT_FILES['create_cost_benefit_analysis'])
+    
+    # Generate MCDA ranking and weight sensitivity
+    print("Creating MCDA sensitivity analysis...")
+    fig4 = create_mcda_sensitivity_analysis()
+    save_scheme(fig4, OUTPUT_FILES['create_mcda_sensitivity_analysis'])
     
-    print("✅ Successfully generated 3 comprehensive soil indicators visualization schemes!")
-    print(f"📁 Files saved to: {output_dir}")
+    print("✅ Successfully generated 4 comprehensive soil indicators visualization schemes!")
+    print(f"📁 Files saved to: {os.path.join(scheme_render.OUTPUT_DIR, OUTPUT_SUBDIR)}")
     print("\nGenerated schemes:")
     print("1. Soil_Indicators_Classification_Matrix.png - Comprehensive indicators framework")
     print("2. Soil_Analysis_Methods_Flowchart.png - Analytical methods and equipment")
     print("3. Soil_Indicators_Cost_Benefit_Analysis.png - Economic analysis framework")
+    print("4. Soil_Indicators_MCDA_Sensitivity.png - Multi-criteria ranking and weight sensitivity")
 
 if __name__ == "__main__":
     main()
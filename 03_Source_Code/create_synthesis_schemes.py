@@ -4,313 +4,34 @@ Create data synthesis schemes for war-induced soil contamination investigations
 These schemes show how to integrate data from all phases of the General_War_Induced_Soil_Investigation_Scheme
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.patches import FancyBboxPatch, Rectangle, Circle, FancyArrow, Polygon, Ellipse
+from scheme_bootstrap import apply_style, lazy_import
 import numpy as np
-import seaborn as sns
+from scheme_layout import tight_layout
+from scheme_render import save_scheme
+from scheme_shapes import arrows, circles
+from scheme_spec import build_scheme, load_spec
+
+plt = lazy_import('matplotlib.pyplot')
 
 # Set style for professional appearance
-plt.style.use('default')
-sns.set_palette("husl")
+apply_style()
+
+# Data files read by each scheme (paths relative to the repository root), tracked by the render cache
+SCHEME_INPUTS = {
+    'create_data_synthesis_framework': ['03_Source_Code/scheme_specs/data_synthesis_framework.json']
+}
 
 def create_data_synthesis_framework():
     """Create comprehensive data synthesis framework for war-induced soil investigations"""
-    fig, ax = plt.subplots(1, 1, figsize=(24, 18))
-    
-    # Professional color palette
-    colors = {
-        'input_data': '#3498db',         # Blue - input data
-        'processing': '#e74c3c',         # Red - processing
-        'integration': '#f39c12',        # Orange - integration
-        'analysis': '#27ae60',           # Green - analysis
-        'synthesis': '#9b59b6',          # Purple - synthesis
-        'outputs': '#1abc9c',            # Teal - outputs
-        'validation': '#e67e22',         # Dark orange - validation
-        'header': '#2c3e50'              # Dark blue-gray
-    }
-    
-    # Clear axes and set limits
-    ax.set_xlim(0, 24)
-    ax.set_ylim(0, 18)
-    ax.axis('off')
-    
-    # Title
-    title_box = FancyBboxPatch((0.5, 16.5), 23, 1.2, boxstyle="round,pad=0.1", 
-                               facecolor=colors['header'], edgecolor='black', linewidth=2)
-    ax.add_patch(title_box)
-    ax.text(12, 17.1, 'Data Synthesis Framework for War-Induced Soil Contamination Investigations', 
-            fontsize=18, fontweight='bold', ha='center', va='center', color='white')
-    
-    # Phase 1: Data Collection and Input (Top row)
-    data_sources = [
-        ('Geophysical Data', 1, 14, 3.5, 1.8, colors['input_data'], [
-            '• Magnetic susceptibility maps',
-            '• GPR subsurface profiles', 
-            '• ERT resistivity models',
-            '• Spatial coordinates (GPS)',
-            '• Anomaly identification'
-        ]),
-        ('Geochemical Data', 5, 14, 3.5, 1.8, colors['input_data'], [
-            '• Heavy metal concentrations',
-            '• Major element composition',
-            '• Trace element profiles',
-            '• pH and conductivity',
-            '• Quality control metrics'
-        ]),
-        ('Physical Data', 9, 14, 3.5, 1.8, colors['input_data'], [
-            '• Particle size distribution',
-            '• Bulk density measurements',
-            '• Moisture content',
-            '• Soil texture analysis',
-            '• Structural parameters'
-        ]),
-        ('Microscopic Data', 13, 14, 3.5, 1.8, colors['input_data'], [
-            '• SEM-EDS element maps',
-            '• Particle morphology',
-            '• Mineral identification',
-            '• Surface textures',
-            '• Compositional analysis'
-        ]),
-        ('Contextual Data', 17, 14, 3.5, 1.8, colors['input_data'], [
-            '• Conflict history timeline',
-            '• Munition type records',
-            '• Weather conditions',
-            '• Land use information',
-            '• Sampling metadata'
-        ])
-    ]
-    
-    for title, x, y, width, height, color, content in data_sources:
-        # Data source box
-        source_box = FancyBboxPatch((x, y), width, height, boxstyle="round,pad=0.1", 
-                                    facecolor=color, edgecolor='black', linewidth=1)
-        ax.add_patch(source_box)
-        
-        # Title
-        ax.text(x + width/2, y + height - 0.2, title, fontsize=11, fontweight='bold', 
-                ha='center', va='center', color='white')
-        
-        # Content
-        y_pos = y + height - 0.5
-        for item in content:
-            ax.text(x + 0.1, y_pos, item, fontsize=9, ha='left', va='center', color='white')
-            y_pos -= 0.25
-    
-    # Phase 2: Data Processing and Standardization (Second row)
-    processing_box = FancyBboxPatch((1, 11.5), 20, 2, boxstyle="round,pad=0.1", 
-                                    facecolor=colors['processing'], edgecolor='black', linewidth=1)
-    ax.add_patch(processing_box)
-    ax.text(11, 13, 'DATA PROCESSING AND STANDARDIZATION', fontsize=14, fontweight='bold', 
-            ha='center', va='center', color='white')
-    
-    processing_steps = [
-        'Quality Control:\n• Outlier detection\n• Missing data handling\n• Instrument drift correction',
-        'Normalization:\n• Unit standardization\n• Background subtraction\n• Reference scaling',
-        'Spatial Registration:\n• Coordinate alignment\n• Grid interpolation\n• Projection correction',
-        'Temporal Alignment:\n• Time series organization\n• Sampling date correction\n• Sequence validation',
-        'Data Validation:\n• Cross-method verification\n• Replicate analysis\n• Standard reference checks'
-    ]
-    
-    for i, step in enumerate(processing_steps):
-        x_pos = 2 + i * 4
-        ax.text(x_pos, 12.2, step, fontsize=9, ha='left', va='center', color='white')
-    
-    # Phase 3: Multi-Parameter Integration (Third row)
-    integration_box = FancyBboxPatch((1, 8.5), 20, 2.5, boxstyle="round,pad=0.1", 
-                                     facecolor=colors['integration'], edgecolor='black', linewidth=1)
-    ax.add_patch(integration_box)
-    ax.text(11, 10.5, 'MULTI-PARAMETER INTEGRATION', fontsize=14, fontweight='bold', 
-            ha='center', va='center', color='white')
-    
-    # Integration methods
-    integration_methods = [
-        ('Statistical Integration', 2, 9.8, [
-            '• Correlation analysis',
-            '• Principal Component Analysis',
-            '• Factor analysis',
-            '• Cluster analysis',
-            '• Multivariate statistics'
-        ]),
-        ('Spatial Integration', 6.5, 9.8, [
-            '• GIS overlay analysis',
-            '• Spatial correlation',
-            '• Kriging interpolation',
-            '• Buffer zone analysis',
-            '• Distance modeling'
-        ]),
-        ('Geochemical Integration', 11, 9.8, [
-            '• Element association analysis',
-            '• Enrichment factor calculation',
-            '• Source apportionment',
-            '• Contamination indices',
-            '• Pollution load assessment'
-        ]),
-        ('Physical Integration', 15.5, 9.8, [
-            '• Texture-chemistry relationships',
-            '• Particle size effects',
-            '• Density correlations',
-            '• Porosity influences',
-            '• Transport mechanisms'
-        ])
-    ]
-    
-    for method_name, x, y, items in integration_methods:
-        ax.text(x, y, method_name, fontsize=10, fontweight='bold', ha='left', va='center', color='white')
-        for i, item in enumerate(items):
-            ax.text(x, y - 0.3 - i*0.2, item, fontsize=8, ha='left', va='center', color='white')
-    
-    # Phase 4: Advanced Analysis and Modeling (Fourth row)
-    analysis_box = FancyBboxPatch((1, 5.5), 20, 2.5, boxstyle="round,pad=0.1", 
-                                  facecolor=colors['analysis'], edgecolor='black', linewidth=1)
-    ax.add_patch(analysis_box)
-    ax.text(11, 7.5, 'ADVANCED ANALYSIS AND MODELING', fontsize=14, fontweight='bold', 
-            ha='center', va='center', color='white')
-    
-    # Analysis categories
-    analysis_categories = [
-        ('Source Identification', 2, 6.8, [
-            '• Fingerprinting analysis',
-            '• Isotopic signatures',
-            '• Mineral assemblages',
-            '• Chemical ratios',
-            '• Particle morphology'
-        ]),
-        ('Transport Modeling', 6.5, 6.8, [
-            '• Dispersion patterns',
-            '• Migration pathways',
-            '• Deposition models',
-            '• Weathering processes',
-            '• Temporal evolution'
-        ]),
-        ('Risk Assessment', 11, 6.8, [
-            '• Exposure modeling',
-            '• Toxicity evaluation',
-            '• Bioavailability assessment',
-            '• Pathway analysis',
-            '• Uncertainty quantification'
-        ]),
-        ('Predictive Modeling', 15.5, 6.8, [
-            '• Machine learning models',
-            '• Regression analysis',
-            '• Time series forecasting',
-            '• Scenario modeling',
-            '• Validation protocols'
-        ])
-    ]
-    
-    for category_name, x, y, items in analysis_categories:
-        ax.text(x, y, category_name, fontsize=10, fontweight='bold', ha='left', va='center', color='white')
-        for i, item in enumerate(items):
-            ax.text(x, y - 0.3 - i*0.2, item, fontsize=8, ha='left', va='center', color='white')
+    # Layout, colours and text live in scheme_specs/data_synthesis_framework.json
+    fig, ax = build_scheme(load_spec('data_synthesis_framework.json'))
     
-    # Phase 5: Synthesis and Interpretation (Fifth row)
-    synthesis_box = FancyBboxPatch((1, 2.5), 20, 2.5, boxstyle="round,pad=0.1", 
-                                   facecolor=colors['synthesis'], edgecolor='black', linewidth=1)
-    ax.add_patch(synthesis_box)
-    ax.text(11, 4.5, 'DATA SYNTHESIS AND INTERPRETATION', fontsize=14, fontweight='bold', 
-            ha='center', va='center', color='white')
-    
-    # Synthesis components
-    synthesis_components = [
-        ('Conceptual Model', 2, 3.8, [
-            '• Process understanding',
-            '• Contamination mechanisms',
-            '• Environmental controls',
-            '• Spatial relationships',
-            '• Temporal dynamics'
-        ]),
-        ('Pattern Recognition', 6.5, 3.8, [
-            '• Contamination zones',
-            '• Impact gradients',
-            '• Anomaly clusters',
-            '• Background variations',
-            '• Systematic trends'
-        ]),
-        ('Causal Relationships', 11, 3.8, [
-            '• Source-impact linkages',
-            '• Dose-response relationships',
-            '• Environmental controls',
-            '• Temporal correlations',
-            '• Mechanistic insights'
-        ]),
-        ('Uncertainty Assessment', 15.5, 3.8, [
-            '• Data quality evaluation',
-            '• Model uncertainties',
-            '• Spatial variability',
-            '• Measurement precision',
-            '• Confidence intervals'
-        ])
-    ]
-    
-    for component_name, x, y, items in synthesis_components:
-        ax.text(x, y, component_name, fontsize=10, fontweight='bold', ha='left', va='center', color='white')
-        for i, item in enumerate(items):
-            ax.text(x, y - 0.3 - i*0.2, item, fontsize=8, ha='left', va='center', color='white')
-    
-    # Phase 6: Output Products and Validation (Bottom row)
-    output_validation_box = FancyBboxPatch((1, 0.2), 20, 2, boxstyle="round,pad=0.1", 
-                                           facecolor=colors['outputs'], edgecolor='black', linewidth=1)
-    ax.add_patch(output_validation_box)
-    ax.text(11, 1.7, 'OUTPUT PRODUCTS AND VALIDATION', fontsize=14, fontweight='bold', 
-            ha='center', va='center', color='white')
-    
-    outputs = [
-        'Scientific Products:\n• Contamination maps\n• Risk assessment reports\n• Peer-reviewed publications',
-        'Management Tools:\n• Decision support systems\n• Remediation plans\n• Monitoring protocols',
-        'Policy Products:\n• Regulatory guidelines\n• Best practice manuals\n• Standard protocols',
-        'Database Products:\n• Integrated datasets\n• Metadata catalogs\n• Reference materials',
-        'Validation Results:\n• Cross-validation metrics\n• Uncertainty bounds\n• Quality indicators'
-    ]
-    
-    for i, output in enumerate(outputs):
-        x_pos = 2 + i * 4
-        ax.text(x_pos, 1, output, fontsize=9, ha='left', va='center', color='white')
-    
-    # Add connecting arrows between phases
-    # Data sources to processing
-    for i in range(5):
-        x_source = 2.75 + i * 4
-        arrow1 = FancyArrow(x_source, 14, 0, -0.5, width=0.05, head_width=0.1, 
-                           head_length=0.08, fc='darkblue', ec='darkblue', alpha=0.7)
-        ax.add_patch(arrow1)
-    
-    # Processing to integration
-    arrow2 = FancyArrow(11, 11.5, 0, -0.5, width=0.08, head_width=0.15, 
-                        head_length=0.1, fc='darkred', ec='darkred', alpha=0.7)
-    ax.add_patch(arrow2)
-    
-    # Integration to analysis
-    arrow3 = FancyArrow(11, 8.5, 0, -0.5, width=0.08, head_width=0.15, 
-                        head_length=0.1, fc='darkorange', ec='darkorange', alpha=0.7)
-    ax.add_patch(arrow3)
-    
-    # Analysis to synthesis
-    arrow4 = FancyArrow(11, 5.5, 0, -0.5, width=0.08, head_width=0.15, 
-                        head_length=0.1, fc='darkgreen', ec='darkgreen', alpha=0.7)
-    ax.add_patch(arrow4)
-    
-    # Synthesis to outputs
-    arrow5 = FancyArrow(11, 2.5, 0, -0.3, width=0.08, head_width=0.15, 
-                        head_length=0.1, fc='purple', ec='purple', alpha=0.7)
-    ax.add_patch(arrow5)
-    
-    # Add feedback loops
-    feedback_arrow1 = FancyArrow(21.5, 1.2, 2, 12, width=0.04, head_width=0.1, 
-                                head_length=0.1, fc='gray', ec='gray', alpha=0.5, 
-                                linestyle='--')
-    ax.add_patch(feedback_arrow1)
-    ax.text(22.5, 8, 'Feedback\nLoop', fontsize=10, ha='center', va='center', 
-            rotation=80, style='italic', color='gray')
-    
-    plt.tight_layout()
-    plt.savefig('/Users/adim/Documents/Igph/SoilDegradation/Data_Synthesis_Framework_Scheme.png', 
-                dpi=300, bbox_inches='tight', facecolor='white', edgecolor='none')
-    plt.close()
-    print("Created: Data_Synthesis_Framework_Scheme.png")
+    tight_layout(fig)
+    save_scheme(fig, 'Data_Synthesis_Framework_Scheme.png', edgecolor='none')
 
 def create_integration_workflow_scheme():
     """Create detailed integration workflow for multi-source data"""
+    from matplotlib.patches import FancyBboxPatch, Circle, FancyArrow
     fig, ax = plt.subplots(1, 1, figsize=(22, 16))
     
     colors = {
@@ -420,27 +141,21 @@ def create_integration_workflow_scheme():
         ('Factor\nAnalysis', 8, 8, 0.8)
     ]
     
+    _, method_x, method_y, method_radius = zip(*integration_methods)
+    circles(ax, method_x, method_y, method_radius, facecolor='lightblue',
+            edgecolor='darkblue', linewidth=1)
     for method, x, y, radius in integration_methods:
-        method_circle = Circle((x, y), radius, facecolor='lightblue', 
-                              edgecolor='darkblue', linewidth=1)
-        ax.add_patch(method_circle)
         ax.text(x, y, method, fontsize=9, fontweight='bold', 
                 ha='center', va='center', color='darkblue')
     
     # Arrows from data streams to integration hub
-    stream_positions = [(3, 12.25), (3, 9.25), (3, 6.25), (3, 3.25)]
-    for x_stream, y_stream in stream_positions:
-        # Calculate arrow direction to hub center
-        dx = 11 - x_stream - 2
-        dy = 8 - y_stream
-        length = np.sqrt(dx**2 + dy**2)
-        dx_norm = dx / length * 3
-        dy_norm = dy / length * 3
-        
-        arrow = FancyArrow(x_stream + 2, y_stream, dx_norm, dy_norm, 
-                          width=0.06, head_width=0.12, head_length=0.1, 
-                          fc='darkblue', ec='darkblue', alpha=0.7)
-        ax.add_patch(arrow)
+    x_stream, y_stream = np.array([(3, 12.25), (3, 9.25), (3, 6.25), (3, 3.25)]).T
+    # Arrow directions to hub center, 3 units long
+    dx = 11 - x_stream - 2
+    dy = 8 - y_stream
+    length = np.hypot(dx, dy)
+    arrows(ax, x_stream + 2, y_stream, dx / length * 3, dy / length * 3,
+           width=0.06, head_width=0.12, head_length=0.1, color='darkblue', alpha=0.7)
     
     # Output products (right side)
     output_box = FancyBboxPatch((16, 3), 5.5, 10, boxstyle="round,pad=0.1", 
@@ -524,22 +239,18 @@ def create_integration_workflow_scheme():
         ax.text(x, y, step, fontsize=8, fontweight='bold', ha='center', va='center')
     
     # Arrows between workflow steps
-    for i in range(len(workflow_steps)-1):
-        x1 = workflow_steps[i][0] + 0.7
-        x2 = workflow_steps[i+1][0] - 0.7
-        y_arrow = workflow_steps[i][1]
-        arrow = FancyArrow(x1, y_arrow, x2-x1, 0, width=0.03, head_width=0.08, 
-                          head_length=0.05, fc='orange', ec='orange', alpha=0.7)
-        ax.add_patch(arrow)
-    
-    plt.tight_layout()
-    plt.savefig('/Users/adim/Documents/Igph/SoilDegradation/Integration_Workflow_Scheme.png', 
-                dpi=300, bbox_inches='tight', facecolor='white', edgecolor='none')
-    plt.close()
-    print("Created: Integration_Workflow_Scheme.png")
+    step_x, step_y, _ = zip(*workflow_steps)
+    x1 = np.array(step_x[:-1]) + 0.7
+    x2 = np.array(step_x[1:]) - 0.7
+    arrows(ax, x1, step_y[:-1], x2-x1, 0, width=0.03, head_width=0.08,
+           head_length=0.05, color='orange', alpha=0.7)
+    
+    tight_layout(fig)
+    save_scheme(fig, 'Integration_Workflow_Scheme.png', edgecolor='none')
 
 def create_knowledge_synthesis_scheme():
     """Create knowledge synthesis and interpretation framework"""
+    from matplotlib.patches import FancyBboxPatch, FancyArrow
     fig, ax = plt.subplots(1, 1, figsize=(20, 16))
     
     colors = {
@@ -750,11 +461,8 @@ def create_knowledge_synthesis_scheme():
     for i, element in enumerate(qa_elements):
         ax.text(1, 1 - i*0.15, f"• {element}", fontsize=9, ha='left', va='center')
     
-    plt.tight_layout()
-    plt.savefig('/Users/adim/Documents/Igph/SoilDegradation/Knowledge_Synthesis_Scheme.png', 
-                dpi=300, bbox_inches='tight', facecolor='white', edgecolor='none')
-    plt.close()
-    print("Created: Knowledge_Synthesis_Scheme.png")
+    tight_layout(fig)
+    save_scheme(fig, 'Knowledge_Synthesis_Scheme.png', edgecolor='none')
 
 def main():
     """Generate comprehensive data synthesis schemes"""
@@ -3,18 +3,21 @@
 Create visual schemas for methodological approach to post-blast residue analysis
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.patches import FancyBboxPatch, Rectangle, Circle, FancyArrow
+from scheme_bootstrap import apply_style, lazy_import
 import numpy as np
-import seaborn as sns
+from scheme_layout import tight_layout
+import scheme_render
+from scheme_render import save_scheme
+from scheme_shapes import arrows
+
+plt = lazy_import('matplotlib.pyplot')
 
 # Set style for professional appearance
-plt.style.use('default')
-sns.set_palette("husl")
+apply_style()
 
 def create_main_flowchart():
     """Create the enhanced main methodological flowchart with comprehensive details"""
+    from matplotlib.patches import FancyBboxPatch, FancyArrow
     fig, ax = plt.subplots(1, 1, figsize=(20, 16))
     
     # Colors for different phases
@@ -214,14 +217,12 @@ def create_main_flowchart():
     ax.text(5, 0.5, site_text, fontsize=11, ha='center', style='italic', 
             bbox=dict(boxstyle="round,pad=0.3", facecolor='lightyellow', alpha=0.8))
     
-    plt.tight_layout()
-    plt.savefig('/Users/adim/Documents/Igph/SoilDegradation/Schema_Main_Flowchart.png', 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print("Created: Schema_Main_Flowchart.png")
+    tight_layout(fig)
+    save_scheme(fig, 'Schema_Main_Flowchart.png')
 
 def create_equipment_network():
     """Create equipment network diagram"""
+    from matplotlib.patches import FancyBboxPatch, Rectangle
     fig, ax = plt.subplots(1, 1, figsize=(14, 10))
     
     # Colors for equipment categories
@@ -274,24 +275,18 @@ def create_equipment_network():
         ('XRF', 'EDS')
     ]
     
-    for start, end in connections:
-        x1, y1 = equipment[start][:2]
-        x2, y2 = equipment[end][:2]
-        
-        # Calculate arrow direction
-        dx = x2 - x1
-        dy = y2 - y1
-        length = np.sqrt(dx**2 + dy**2)
-        
-        # Normalize and adjust for box size
-        dx_norm = dx / length * 0.7
-        dy_norm = dy / length * 0.4
-        
-        arrow = FancyArrow(x1 + dx_norm/2, y1 + dy_norm/2, 
-                          dx - dx_norm, dy - dy_norm,
-                          width=0.02, head_width=0.1, 
-                          head_length=0.1, fc='gray', ec='gray', alpha=0.7)
-        ax.add_patch(arrow)
+    start = np.array([equipment[name][:2] for name, _ in connections], dtype=float)
+    end = np.array([equipment[name][:2] for _, name in connections], dtype=float)
+    
+    # Calculate arrow directions
+    delta = end - start
+    length = np.hypot(delta[:, 0], delta[:, 1])[:, None]
+    
+    # Normalize and adjust for box size
+    offset = delta / length * [0.7, 0.4]
+    
+    arrows(ax, *(start + offset/2).T, *(delta - offset).T,
+           width=0.02, head_width=0.1, head_length=0.1, color='gray', alpha=0.7)
     
     # Legend
     legend_items = [
@@ -308,14 +303,12 @@ def create_equipment_network():
         ax.add_patch(legend_box)
         ax.text(1, y_pos, label, fontsize=10, va='center')
     
-    plt.tight_layout()
-    plt.savefig('/Users/adim/Documents/Igph/SoilDegradation/Schema_Equipment_Network.png', 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print("Created: Schema_Equipment_Network.png")
+    tight_layout(fig)
+    save_scheme(fig, 'Schema_Equipment_Network.png')
 
 def create_parameter_analysis():
     """Create parameter analysis flowchart"""
+    from matplotlib.patches import FancyBboxPatch, FancyArrow
     fig, ax = plt.subplots(1, 1, figsize=(12, 10))
     
     ax.set_xlim(0, 10)
@@ -402,14 +395,12 @@ def create_parameter_analysis():
                              head_length=0.1, fc='black', ec='black')
     ax.add_patch(arrow_result)
     
-    plt.tight_layout()
-    plt.savefig('/Users/adim/Documents/Igph/SoilDegradation/Schema_Parameter_Analysis.png', 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print("Created: Schema_Parameter_Analysis.png")
+    tight_layout(fig)
+    save_scheme(fig, 'Schema_Parameter_Analysis.png')
 
 def create_site_layout():
     """Create study sites layout diagram"""
+    from matplotlib.patches import FancyBboxPatch
     fig, ax = plt.subplots(1, 1, figsize=(14, 8))
     
     ax.set_xlim(0, 12)
@@ -473,11 +464,8 @@ def create_site_layout():
     ax.text(6, 0.8, soil_text, fontsize=11, ha='center', style='italic',
             bbox=dict(boxstyle="round,pad=0.3", facecolor='lightyellow', alpha=0.8))
     
-    plt.tight_layout()
-    plt.savefig('/Users/adim/Documents/Igph/SoilDegradation/Schema_Site_Layout.png', 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print("Created: Schema_Site_Layout.png")
+    tight_layout(fig)
+    save_scheme(fig, 'Schema_Site_Layout.png')
 
 def main():
     """Generate all schema images"""
@@ -489,7 +477,7 @@ def main():
     create_site_layout()
     
     print("\nAll schema images have been created successfully!")
-    print("Files saved in: /Users/adim/Documents/Igph/SoilDegradation/")
+    print(f"Files saved in: {scheme_render.OUTPUT_DIR}")
     print("\nGenerated files:")
     print("1. Schema_Main_Flowchart.png - Complete methodological overview")
     print("2. Schema_Equipment_Network.png - Equipment connections and workflow")
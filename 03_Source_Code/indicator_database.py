@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Typed, cached loader for the soil indicator database
+04_Research_Articles/Improved_Soil_Indicators_Database.csv keeps every field as text. load()
+parses it once into NumPy columns and stores them in an .npz cache, so figures and analyses read
+typed arrays in milliseconds instead of re-parsing the CSV or copying values by hand:
+
+    ordinal fields      Reliability, Sensitivity, ... (Low/Medium/High -> 1/2/3),
+                        Analysis_Complexity (Simple/Medium/Complex -> 1/2/3) and
+                        Remote_Sensing (No/Partial/Yes -> 0/1/2); int8 scores
+    cost ranges         Equipment_Cost_USD, Analysis_Cost_USD ('1000-3000') ->
+                        <column>_min and <column>_max float arrays (NaN when not given)
+    persistence         Time_Persistence ('Weeks to months') -> categorical codes plus
+                        Time_Persistence_min_days / _max_days (inf for permanent)
+    categorical         Units, Remote_Sensing_Method -> int16 codes into sorted categories
+    integer             Analytical_Priority
+    text                everything else, as unicode arrays
+
+    from indicator_database import load
+    db = load()
+    db['Reliability']                  # array([3, 3, 2, ...], dtype=int8)
+    db['Analysis_Cost_USD_max']        # array([50., 100., ...])
+    db.labels('Units')                 # decoded categorical column
+
+The cache (SCHEME_DATA_CACHE, default .scheme_data next to the scripts) is used while the CSV's
+mtime and size match; when only the mtime changed, the CSV's SHA-256 decides.
+"""
+
+import csv
+import hashlib
+import json
+import math
+import os
+import re
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SOURCE_DIR)
+DATABASE_CSV = os.path.join(REPO_DIR, '04_Research_Articles', 'Improved_Soil_Indicators_Database.csv')
+CACHE_DIR = os.environ.get('SCHEME_DATA_CACHE') or os.path.join(SOURCE_DIR, '.scheme_data')
+
+# Bump when the parsed layout changes so old caches are rebuilt
+SCHEMA_VERSION = 1
+
+# Ordinal scales; missing values score -1
+LEVELS = {'Low': 1, 'Medium': 2, 'High': 3}
+ORDINAL_COLUMNS = {
+    'Analysis_Complexity': {'Simple': 1, 'Medium': 2, 'Complex': 3},
+    'Remote_Sensing': {'No': 0, 'Partial': 1, 'Yes': 2},
+    'Conflict_Relevance': LEVELS,
+    'Data_Availability': LEVELS,
+    'Indicator_Capacity': LEVELS,
+    'Reliability': LEVELS,
+    'Sensitivity': LEVELS,
+    'Predictive_Power': LEVELS,
+    'Cost_Effectiveness': LEVELS,
+    'Policy_Relevance': LEVELS,
+    'Impact_Scope': LEVELS,
+    'Health_Impact': LEVELS
+}
+RANGE_COLUMNS = ['Equipment_Cost_USD', 'Analysis_Cost_USD']
+CATEGORICAL_COLUMNS = ['Units', 'Remote_Sensing_Method', 'Time_Persistence']
+INTEGER_COLUMNS = ['Analytical_Priority']
+
+# Days per unit of a Time_Persistence phrase
+PERSISTENCE_DAYS = {'hour': 1 / 24, 'day': 1.0, 'week': 7.0, 'month': 30.44, 'year': 365.25,
+                    'decade': 3652.5, 'permanent': math.inf}
+
+_MISSING = {'', 'n/a', 'na', '-', 'none'}
+_NUMBER = re.compile(r'\d+(?:\.\d+)?')
+_loaded = {}
+
+def parse_range(text):
+    """(min, max) of a value or range such as '1000-3000', '$50 - $150' or '2,500'; NaN if empty"""
+    text = text.strip()
+    if text.lower() in _MISSING:
+        return math.nan, math.nan
+    numbers = [float(n) for n in _NUMBER.findall(text.replace(',', ''))]
+    if not numbers or len(numbers) > 2:
+        raise ValueError(f"Not a value or range: {text!r}")
+    return numbers[0], numbers[-1]
+
+def parse_persistence(text):
+    """(min_days, max_days) of a phrase such as 'Weeks to months', 'Years' or 'Permanent'"""
+    units = [unit for word in re.findall(r'[a-z]+', text.lower())
+             for unit in PERSISTENCE_DAYS if word.rstrip('s') == unit]
+    if not units:
+        if text.strip().lower() in _MISSING:
+            return math.nan, math.nan
+        raise ValueError(f"Unknown persistence {text!r}")
+    return PERSISTENCE_DAYS[units[0]], PERSISTENCE_DAYS[units[-1]]
+
+class IndicatorTable:
+    """Columnar indicator database: column name -> NumPy array of one value per indicator"""
+
+    def __init__(self, columns, categories, source=None):
+        self.columns = columns
+        self.categories = categories
+        self.source = source
+        # SHA-256 of the source file, set by load()
+        self.digest = None
+
+    def __len__(self):
+        return len(self.columns['Indicator'])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def labels(self, name):
+        """A categorical column decoded back to its text values"""
+        return self.categories[name][self.columns[name]]
+
+    def index(self, indicator):
+        """Row number of an indicator by name"""
+        import numpy as np
+        rows = np.flatnonzero(self.columns['Indicator'] == indicator)
+        if not len(rows):
+            raise KeyError(f"Unknown indicator {indicator!r}")
+        return int(rows[0])
+
+def parse_rows(rows):
+    """IndicatorTable from CSV rows given as dicts (column name -> text)"""
+    import numpy as np
+    if not rows:
+        raise ValueError("The indicator database has no rows")
+    columns, categories = {}, {}
+    for name in rows[0]:
+        values = [(row.get(name) or '').strip() for row in rows]
+        try:
+            if name in ORDINAL_COLUMNS:
+                scale = ORDINAL_COLUMNS[name]
+                for value in values:
+                    if value and value not in scale:
+                        raise ValueError(f"Unknown level {value!r} (expected one of {', '.join(scale)})")
+                columns[name] = np.array([scale.get(value, -1) for value in values], np.int8)
+            elif name in RANGE_COLUMNS:
+                bounds = np.array([parse_range(value) for value in values], float).reshape(-1, 2)
+                columns[f'{name}_min'], columns[f'{name}_max'] = bounds[:, 0], bounds[:, 1]
+            elif name in INTEGER_COLUMNS:
+                columns[name] = np.array([int(value) if value else -1 for value in values], np.int16)
+            elif name in CATEGORICAL_COLUMNS:
+                categories[name], codes = np.unique(np.array(values, str), return_inverse=True)
+                columns[name] = codes.astype(np.int16)
+                if name == 'Time_Persistence':
+                    days = np.array([parse_persistence(value) for value in categories[name]], float)
+                    columns[f'{name}_min_days'] = days[codes, 0]
+                    columns[f'{name}_max_days'] = days[codes, 1]
+            else:
+                columns[name] = np.array(values, str)
+        except ValueError as exc:
+            raise ValueError(f"Column {name}: {exc}") from None
+    return IndicatorTable(columns, categories)
+
+def concat(tables):
+    """One IndicatorTable of the rows of several, with categorical codes re-encoded over all of them"""
+    import numpy as np
+    columns, categories = {}, {}
+    for name in tables[0].columns:
+        if name in tables[0].categories:
+            categories[name], codes = np.unique(np.concatenate([table.labels(name) for table in tables]),
+                                                return_inverse=True)
+            columns[name] = codes.astype(np.int16)
+        else:
+            columns[name] = np.concatenate([table.columns[name] for table in tables])
+    return IndicatorTable(columns, categories)
+
+def parse_csv(path=DATABASE_CSV):
+    """Parse the CSV without the cache"""
+    with open(path, encoding='utf-8', newline='') as f:
+        table = parse_rows(list(csv.DictReader(f)))
+    table.source = path
+    return table
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def cache_path(path=DATABASE_CSV, cache_dir=None):
+    """Location of the .npz cache of a CSV file"""
+    return os.path.join(cache_dir or CACHE_DIR, f'{os.path.splitext(os.path.basename(path))[0]}.npz')
+
+def read_table(npz_path):
+    """(meta, IndicatorTable) from an .npz cache, or None when it is missing or unreadable"""
+    import numpy as np
+    try:
+        with np.load(npz_path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('schema') != SCHEMA_VERSION:
+                return None
+            columns = {key[4:]: data[key] for key in data.files if key.startswith('col:')}
+            categories = {key[4:]: data[key] for key in data.files if key.startswith('cat:')}
+    except (FileNotFoundError, ValueError, KeyError, OSError):
+        return None
+    return meta, IndicatorTable(columns, categories)
+
+def write_table(npz_path, table, meta):
+    import numpy as np
+    from scheme_layout import atomic_write
+    arrays = {f'col:{name}': values for name, values in table.columns.items()}
+    arrays.update((f'cat:{name}', values) for name, values in table.categories.items())
+    arrays['meta'] = np.array(json.dumps(meta))
+
+    def write(path):
+        # np.savez appends .npz to bare names; a file object keeps the temporary name
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
+    atomic_write(npz_path, write)
+
+def load(path=DATABASE_CSV, cache_dir=None):
+    """The database as an IndicatorTable, from memory, the .npz cache or the CSV (in that order)"""
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    memo = _loaded.get(path)
+    if memo is not None and memo[0] == stamp:
+        return memo[1]
+
+    npz_path = cache_path(path, cache_dir)
+    cached = read_table(npz_path)
+    table = digest = None
+    if cached is not None:
+        meta, table = cached
+        if [meta['mtime_ns'], meta['size']] != list(stamp):
+            # Touched or copied: the contents decide
+            digest = file_digest(path)
+            if meta['sha256'] != digest:
+                table = None
+            else:
+                write_table(npz_path, table, dict(meta, mtime_ns=stamp[0], size=stamp[1]))
+    if table is None:
+        table = parse_csv(path)
+        meta = {'schema': SCHEMA_VERSION, 'mtime_ns': stamp[0], 'size': stamp[1],
+                'sha256': digest or file_digest(path)}
+        write_table(npz_path, table, meta)
+    table.source, table.digest = path, meta['sha256']
+    _loaded[path] = (stamp, table)
+    return table
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Merge legacy indicator tables into the indicator database
+Older tables such as 04_Research_Articles/Soil-Table 1.csv use semicolons, trailing empty
+columns, their own column names ('Measurability_and_reliability', 'Time Persistence ') and
+dollar ranges ('$50 - $150'). ingest() reads such a table row by row, rewrites each row in the
+improved database's columns and formats, and reconciles it by indicator name:
+
+    matched     the improved database keeps its row; every typed field that disagrees
+                (ratings, cost ranges, units, persistence) is reported as a conflict
+    new         appended to the merged store in chunks of CHUNK_ROWS rows
+    rejected    rows whose ratings or ranges cannot be read, reported with their line number
+
+The merged store lives next to the database cache (SCHEME_DATA_CACHE/merged): one .npz part per
+appended chunk plus a manifest, so a table is never held in memory as a whole and a table whose
+contents were merged before is skipped. merged() returns the database plus every appended row.
+
+    python indicator_ingest.py "../04_Research_Articles/Soil-Table 1.csv"
+
+    from indicator_ingest import ingest, merged
+    report = ingest(LEGACY_CSV)
+    print(report.summary())
+    db = merged()                      # IndicatorTable with a Source column
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import unicodedata
+
+import indicator_database
+from indicator_database import DATABASE_CSV, ORDINAL_COLUMNS, RANGE_COLUMNS, parse_persistence, parse_range
+
+LEGACY_CSV = os.path.join(indicator_database.REPO_DIR, '04_Research_Articles', 'Soil-Table 1.csv')
+
+# Rows parsed and written per part of the merged store
+CHUNK_ROWS = 5000
+
+# Legacy column name (stripped) -> improved database column
+LEGACY_COLUMNS = {
+    'Indicators': 'Indicator',
+    'Measurable components of the indicator': 'Measurable_Components',
+    'Indicator Definition': 'Definition',
+    'Rationale of the indicator': 'Rationale',
+    'Description of Damage': 'Damage_Description',
+    'War Zone Activity': 'War_Zone_Activity',
+    'Simplicity of Analysis Method': 'Analysis_Complexity',
+    'Measurement_method': 'Measurement_Method',
+    'Units': 'Units',
+    'Estimated Cost of Sampling Gear (USD)': 'Equipment_Cost_USD',
+    'Estimated Cost of Sample Analysis (USD)': 'Analysis_Cost_USD',
+    'Remote Sensing Possibility': 'Remote_Sensing',
+    'Remote Sensing Method': 'Remote_Sensing_Method',
+    'Time': 'Optimal_Timing',
+    'Time Persistence': 'Time_Persistence',
+    'Relevance_to_conflict': 'Conflict_Relevance',
+    'Data_availability': 'Data_Availability',
+    'Indicator_capacity': 'Indicator_Capacity',
+    'Measurability_and_reliability': 'Reliability',
+    'Sensitivity_to_changes': 'Sensitivity',
+    'Predictive_power': 'Predictive_Power',
+    'Cost_effectiveness': 'Cost_Effectiveness',
+    'Policy_relevance': 'Policy_Relevance',
+    'Broad_impact_scope': 'Impact_Scope',
+    'Community and Ecosystem Health': 'Health_Impact'
+}
+
+# Legacy indicator names that normalize differently from their improved counterpart
+INDICATOR_ALIASES = {
+    'Per- and polyfluoroalkyl substances (PFAS) level': 'PFAS contamination'
+}
+
+# Placeholder units of the legacy tables, read as missing
+MISSING_UNITS = {'-', '\u2013', '\u2014'}
+
+# Words dropped when matching indicator names ('Soil temperature variations' = 'Soil temperature')
+_NAME_FILLERS = {'level', 'variation', 'of', 'the', 'and'}
+
+def indicator_key(name):
+    """Matching key of an indicator name: case, abbreviations in brackets, plurals and fillers ignored"""
+    name = INDICATOR_ALIASES.get(name.strip(), name)
+    name = re.sub(r'\(.*?\)', ' ', name.lower())
+    words = [word[:-1] if word.endswith('s') and len(word) > 3 else word
+             for word in re.findall(r'[a-z0-9]+', name)]
+    return ' '.join(word for word in words if word not in _NAME_FILLERS)
+
+def _units(value):
+    """NFKC-normalized unit, '' for MISSING_UNITS placeholders"""
+    value = unicodedata.normalize('NFKC', value).strip()
+    return '' if value in MISSING_UNITS else value
+
+def _sniff_reader(f):
+    """csv.reader over f with the delimiter of its header line (';', ',' or tab)"""
+    header = f.readline()
+    try:
+        dialect = csv.Sniffer().sniff(header, delimiters=';,\t')
+    except csv.Error:
+        dialect = csv.excel
+    return csv.reader(f, dialect), next(csv.reader([header], dialect))
+
+def normalize_row(row):
+    """A legacy row (improved column -> text) rewritten in the improved database's formats
+
+    Raises ValueError naming the column when a rating or range cannot be read.
+    """
+    out = {}
+    for name, value in row.items():
+        value = ' '.join(value.split())
+        if name in ORDINAL_COLUMNS:
+            value = value.capitalize()
+            if value and value not in ORDINAL_COLUMNS[name]:
+                raise ValueError(f"{name}: unknown level {value!r}")
+        elif name in RANGE_COLUMNS:
+            low, high = parse_range(value)
+            value = '' if low != low else f'{low:g}-{high:g}'
+        elif name == 'Time_Persistence':
+            # 'Weeks to months, can indicate longer-term ...': the phrase before the comment
+            value = value.split(',')[0].rstrip('.')
+            parse_persistence(value)
+        elif name == 'Units':
+            value = _units(value)
+        out[name] = value
+    return out
+
+def read_legacy(path):
+    """Yield (line number, row) of a legacy table in improved column names, one row at a time"""
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        reader, header = _sniff_reader(f)
+        names = [LEGACY_COLUMNS.get(name.strip(), name.strip()) for name in header]
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            # Trailing empty columns (';;;;') have no header and are dropped
+            yield reader.line_num + 1, {name: cell for name, cell in zip(names, row) if name}
+
+class MergeReport:
+    """What ingest() did with each row of a legacy table"""
+
+    def __init__(self, source):
+        self.source = source
+        self.matched = []       # (legacy name, improved name)
+        self.appended = []      # legacy names added to the store
+        self.duplicates = []    # legacy names already appended from an earlier table or row
+        self.conflicts = []     # (indicator, column, improved value, legacy value)
+        self.rejected = []      # (line, indicator, reason)
+        self.skipped = False    # the same contents were merged before
+
+    def summary(self):
+        """Human-readable report"""
+        name = os.path.basename(self.source)
+        if self.skipped:
+            return f"{name}: already merged"
+        lines = [f"{name}: {len(self.matched)} matched, {len(self.appended)} appended, "
+                 f"{len(self.duplicates)} duplicates, {len(self.conflicts)} conflicts, "
+                 f"{len(self.rejected)} rejected"]
+        lines += [f"  conflict  {indicator}: {column} {improved!r} (database) vs {legacy!r} ({name})"
+                  for indicator, column, improved, legacy in self.conflicts]
+        lines += [f"  rejected  line {line} {indicator!r}: {reason}" for line, indicator, reason in self.rejected]
+        return '\n'.join(lines)
+
+def _comparable(table, row_index):
+    """Typed fields of one database row, as text, for conflict checks"""
+    values = {}
+    for name in ORDINAL_COLUMNS:
+        score = int(table[name][row_index])
+        values[name] = next((level for level, s in ORDINAL_COLUMNS[name].items() if s == score), '')
+    for name in RANGE_COLUMNS:
+        low, high = table[f'{name}_min'][row_index], table[f'{name}_max'][row_index]
+        values[name] = '' if low != low else f'{low:g}-{high:g}'
+    values['Units'] = _units(str(table.labels('Units')[row_index]))
+    values['Time_Persistence'] = str(table.labels('Time_Persistence')[row_index])
+    return values
+
+def _conflicts(improved, row):
+    conflicts = []
+    for column, value in improved.items():
+        legacy = row.get(column, '')
+        if not legacy or not value:
+            continue
+        if column == 'Units':
+            same = value.casefold() == legacy.casefold()
+        elif column == 'Time_Persistence':
+            same = parse_persistence(value) == parse_persistence(legacy)
+        else:
+            same = value == legacy
+        if not same:
+            conflicts.append((column, value, legacy))
+    return conflicts
+
+class MergedStore:
+    """Appended rows of the merged database: .npz parts and a JSON manifest in one folder"""
+
+    def __init__(self, cache_dir=None):
+        self.path = os.path.join(cache_dir or indicator_database.CACHE_DIR, 'merged')
+        self.manifest_path = os.path.join(self.path, 'manifest.json')
+
+    def manifest(self, base):
+        """Manifest of the store; empty when it was built against another database version"""
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            manifest = None
+        if not manifest or manifest.get('database') != base.digest \
+                or manifest.get('schema') != indicator_database.SCHEMA_VERSION:
+            manifest = {'schema': indicator_database.SCHEMA_VERSION, 'database': base.digest, 'sources': []}
+        return manifest
+
+    def save_manifest(self, manifest):
+        from scheme_layout import atomic_write
+
+        def write(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=1)
+        atomic_write(self.manifest_path, write)
+
+    def append(self, rows, source, part):
+        """Parse rows into an IndicatorTable and write it as one part; returns the file name"""
+        import numpy as np
+        table = indicator_database.parse_rows(rows)
+        table.columns['Source'] = np.full(len(table), os.path.basename(source))
+        file_name = f'part-{part:05d}.npz'
+        indicator_database.write_table(os.path.join(self.path, file_name), table,
+                                        {'schema': indicator_database.SCHEMA_VERSION, 'source': source})
+        return file_name
+
+    def tables(self, base):
+        """IndicatorTable of every part listed in the manifest"""
+        tables = []
+        for source in self.manifest(base)['sources']:
+            for file_name in source['parts']:
+                cached = indicator_database.read_table(os.path.join(self.path, file_name))
+                if cached is None:
+                    raise ValueError(f"Merged store part {file_name} is missing or unreadable; "
+                                     f"re-run ingest({source['path']!r})")
+                tables.append(cached[1])
+        return tables
+
+def ingest(path, cache_dir=None, chunk_rows=CHUNK_ROWS):
+    """Reconcile a legacy table with the database and append its new indicators to the merged store"""
+    base = indicator_database.load(cache_dir=cache_dir)
+    store = MergedStore(cache_dir)
+    manifest = store.manifest(base)
+    report = MergeReport(path)
+    digest = indicator_database.file_digest(path)
+    if any(source['sha256'] == digest for source in manifest['sources']):
+        report.skipped = True
+        return report
+
+    with open(DATABASE_CSV, encoding='utf-8', newline='') as f:
+        fields = next(csv.reader(f))
+    base_rows = {indicator_key(name): i for i, name in enumerate(base['Indicator'])}
+    seen = {key for source in manifest['sources'] for key in source['keys']}
+    part = sum(len(source['parts']) for source in manifest['sources'])
+    entry = {'path': path, 'sha256': digest, 'parts': [], 'keys': []}
+    chunk = []
+
+    def flush():
+        nonlocal part
+        if chunk:
+            part += 1
+            entry['parts'].append(store.append(chunk, path, part))
+            chunk.clear()
+
+    for line, raw in read_legacy(path):
+        name = ' '.join(raw.get('Indicator', '').split())
+        key = indicator_key(name)
+        if not key:
+            report.rejected.append((line, name, 'no indicator name'))
+            continue
+        try:
+            row = normalize_row(raw)
+        except ValueError as exc:
+            report.rejected.append((line, name, str(exc)))
+            continue
+        if key in base_rows:
+            i = base_rows[key]
+            report.matched.append((name, str(base['Indicator'][i])))
+            report.conflicts += [(name, *conflict) for conflict in _conflicts(_comparable(base, i), row)]
+        elif key in seen:
+            report.duplicates.append(name)
+        else:
+            seen.add(key)
+            entry['keys'].append(key)
+            report.appended.append(name)
+            chunk.append({field: row.get(field, '') for field in fields})
+            if len(chunk) >= chunk_rows:
+                flush()
+    flush()
+    manifest['sources'].append(entry)
+    store.save_manifest(manifest)
+    return report
+
+def merged(cache_dir=None):
+    """The database plus every row appended by ingest(), with a Source column naming the file"""
+    import numpy as np
+    base = indicator_database.load(cache_dir=cache_dir)
+    parts = MergedStore(cache_dir).tables(base)
+    if not parts:
+        return base
+    columns = dict(base.columns)
+    columns['Source'] = np.full(len(base), os.path.basename(base.source))
+    return indicator_database.concat([indicator_database.IndicatorTable(columns, base.categories)] + parts)
+
+def main():
+    """Merge the legacy tables given on the command line and print the reports"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('tables', nargs='*', default=[LEGACY_CSV],
+                        help='legacy CSV tables to merge (default: Soil-Table 1.csv)')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS,
+                        help=f'rows written per part of the merged store (default: {CHUNK_ROWS})')
+    args = parser.parse_args()
+    for path in args.tables:
+        print(ingest(path, chunk_rows=args.chunk_rows).summary())
+    print(f"Merged database: {len(merged())} indicators")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Multi-criteria decision analysis of the soil indicators
+Ranks the indicators of the indicator database on CRITERIA with three methods:
+
+    weighted_sum    min-max normalized criteria, weighted and added
+    topsis          closeness to the ideal and distance from the anti-ideal solution
+                    (vector normalization, Euclidean distances)
+    outranking      PROMETHEE II net flows with a V-shape preference with indifference
+                    (thresholds as shares of each criterion's range)
+
+Every method takes a decision matrix X (indicators x criteria) and a batch of weight vectors
+W (k x criteria) and returns scores (k x indicators). The weight-independent parts (normalized
+matrices, squared distances to the ideals, pairwise preferences) are computed once and the
+weights enter through one matrix product, so a sensitivity sweep over tens of thousands of
+weight vectors takes a fraction of a second and never builds a k x indicators x criteria array.
+
+Missing ratings (-1 in the database, e.g. merged legacy rows) are NaN in X. Every method scores
+an indicator on the criteria it has, with the weights renormalized over those criteria, so an
+unknown rating neither counts as a value nor drops the indicator. rating_mean() applies the same
+policy to plain rating averages.
+
+    from mcda import analyze
+    result = analyze(method='topsis', samples=20000)
+    result['stability']['base_share']     # share of sweeps that keep each indicator's base rank
+"""
+
+import numpy as np
+
+# Criterion -> (database column, True when higher is better); 'Total_Cost_USD' is derived
+CRITERIA = {
+    'Reliability': ('Reliability', True),
+    'Sensitivity': ('Sensitivity', True),
+    'Predictive power': ('Predictive_Power', True),
+    'Cost effectiveness': ('Cost_Effectiveness', True),
+    'Policy relevance': ('Policy_Relevance', True),
+    'Conflict relevance': ('Conflict_Relevance', True),
+    'Data availability': ('Data_Availability', True),
+    'Indicator capacity': ('Indicator_Capacity', True),
+    'Impact scope': ('Impact_Scope', True),
+    'Health impact': ('Health_Impact', True),
+    'Analysis complexity': ('Analysis_Complexity', False),
+    'Total cost': ('Total_Cost_USD', False)
+}
+METHODS = ('weighted_sum', 'topsis', 'outranking')
+
+# PROMETHEE thresholds as shares of a criterion's range: differences up to INDIFFERENCE count
+# for nothing, from PREFERENCE on as full preference, linearly in between
+INDIFFERENCE = 0.1
+PREFERENCE = 0.5
+
+# Weight vectors drawn by analyze() and the seed that keeps figures reproducible
+SWEEP_SAMPLES = 20000
+SWEEP_SEED = 20240917
+
+def rating_mean(values, axis=0):
+    """Mean of ratings over the available (non-NaN) ones; NaN where none is available"""
+    values = np.asarray(values, float)
+    available = ~np.isnan(values)
+    count = available.sum(axis=axis)
+    total = np.where(available, values, 0).sum(axis=axis)
+    return np.divide(total, count, out=np.full(np.shape(total), np.nan), where=count > 0)
+
+def decision_matrix(db, criteria=None, rows=None):
+    """(X, benefit): criteria values (indicators x criteria) and which criteria are maximized
+
+    Missing ratings (scored -1) are NaN.
+    """
+    criteria = list(CRITERIA) if criteria is None else list(criteria)
+    rows = slice(None) if rows is None else rows
+    columns = []
+    for name in criteria:
+        column = CRITERIA[name][0]
+        if column == 'Total_Cost_USD':
+            values = np.nansum([(db[f'{cost}_min'] + db[f'{cost}_max']) / 2
+                                for cost in ('Equipment_Cost_USD', 'Analysis_Cost_USD')], axis=0)
+        else:
+            values = db[column]
+        columns.append(np.asarray(values, float)[rows])
+    X = np.column_stack(columns)
+    X[X < 0] = np.nan
+    return X, np.array([CRITERIA[name][1] for name in criteria])
+
+def _weights(W, m):
+    W = np.atleast_2d(np.asarray(W, float))
+    if W.shape[1] != m:
+        raise ValueError(f"Weight vectors have {W.shape[1]} entries for {m} criteria")
+    return W / W.sum(axis=1, keepdims=True)
+
+def _range(X, available):
+    """(lowest, highest) value of each criterion over its available values; 0 for empty criteria"""
+    low = np.where(available, X, np.inf).min(axis=0, initial=np.inf)
+    high = np.where(available, X, -np.inf).max(axis=0, initial=-np.inf)
+    empty = ~available.any(axis=0)
+    return np.where(empty, 0, low), np.where(empty, 0, high)
+
+def _renormalized(S, W, available):
+    """Weighted criterion sums S (k x indicators) over the weight of each indicator's available criteria
+
+    Complete matrices are returned unchanged; indicators without any rating score 0.
+    """
+    if available.all():
+        return S
+    coverage = W @ available.T
+    return S / np.where(coverage > 0, coverage, 1)
+
+def weighted_sum(X, W, benefit):
+    """Weighted sum of min-max normalized criteria (cost criteria inverted); scores in [0, 1]"""
+    available = ~np.isnan(X)
+    low, high = _range(X, available)
+    span = high - low
+    N = (X - low) / np.where(span > 0, span, 1)
+    N = np.where(available, np.where(benefit, N, 1 - N), 0)
+    W = _weights(W, X.shape[1])
+    return _renormalized(W @ N.T, W, available)
+
+def topsis(X, W, benefit):
+    """TOPSIS relative closeness to the ideal solution; scores in [0, 1]"""
+    available = ~np.isnan(X)
+    X = np.where(available, X, 0)
+    norm = np.sqrt((X ** 2).sum(axis=0))
+    R = X / np.where(norm > 0, norm, 1)
+    # The ideal and anti-ideal of R * w are R's best and worst available value times w (w >= 0)
+    low, high = _range(R, available)
+    best = np.where(benefit, high, low)
+    worst = np.where(benefit, low, high)
+    # |R * w - best * w|^2 = (R - best)^2 . w^2 over the available criteria; renormalizing the
+    # weights scales both distances of an indicator alike, so the closeness needs no correction
+    squared = _weights(W, X.shape[1]) ** 2
+    d_best = np.sqrt(squared @ np.where(available, (R - best) ** 2, 0).T)
+    d_worst = np.sqrt(squared @ np.where(available, (R - worst) ** 2, 0).T)
+    total = d_best + d_worst
+    return d_worst / np.where(total > 0, total, 1)
+
+def preference_flows(X, benefit, indifference=INDIFFERENCE, preference=PREFERENCE):
+    """(leaving, entering) PROMETHEE flows per indicator and criterion
+
+    Builds the indicators x indicators x criteria preference array, which bounds outranking
+    to a few thousand indicators. Pairs where either rating is missing count for nothing.
+    """
+    available = ~np.isnan(X)
+    low, high = _range(X, available)
+    span = high - low
+    q, p = indifference * span, preference * span
+    d = X[:, None, :] - X[None, :, :]
+    d = np.where(benefit, d, -d)
+    P = np.clip((d - q) / np.where(p > q, p - q, 1), 0, 1)
+    P = np.where(available[:, None, :] & available[None, :, :], P, 0)
+    return P.sum(axis=1), P.sum(axis=0)
+
+def outranking(X, W, benefit):
+    """PROMETHEE II net outranking flows; scores in [-1, 1]"""
+    available = ~np.isnan(X)
+    leaving, entering = preference_flows(X, benefit)
+    # Each criterion's flows are averaged over the indicators an indicator is compared with
+    others = np.maximum(available.sum(axis=0) - 1, 1) * available
+    net = (leaving - entering) / np.where(others > 0, others, 1)
+    # Flows are linear in the weights, so every weight vector is one matrix product
+    W = _weights(W, X.shape[1])
+    return _renormalized(W @ net.T, W, available)
+
+def scores(X, W, benefit, method='topsis'):
+    """Scores (k x indicators) of one method for a batch of weight vectors"""
+    if method not in METHODS:
+        raise ValueError(f"Unknown MCDA method {method!r} (expected one of {', '.join(METHODS)})")
+    return globals()[method](X, W, benefit)
+
+def ranks(scores, decimals=12):
+    """Competition ranks (1 = best, ties share the better rank) of each row of scores"""
+    scores = np.round(np.atleast_2d(scores), decimals)
+    k, n = scores.shape
+    order = np.argsort(-scores, axis=1, kind='stable')
+    ordered = np.take_along_axis(scores, order, axis=1)
+    position = np.broadcast_to(np.arange(n), (k, n))
+    changed = np.ones((k, n), bool)
+    changed[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    first = np.maximum.accumulate(np.where(changed, position, 0), axis=1)
+    result = np.empty((k, n), np.int32)
+    np.put_along_axis(result, order, first + 1, axis=1)
+    return result
+
+def sample_weights(count, base, concentration=None, seed=SWEEP_SEED):
+    """Weight vectors from a Dirichlet distribution centred on base
+
+    concentration None draws uniformly over all weight vectors; larger values stay closer to base.
+    """
+    base = np.asarray(base, float) / np.sum(base)
+    rng = np.random.default_rng(seed)
+    alpha = np.ones_like(base) if concentration is None else base * concentration
+    return rng.dirichlet(alpha, size=count)
+
+def rank_stability(sweep_ranks, base_ranks, top=5):
+    """Per-indicator statistics of the ranks of a sweep (k x indicators) against the base ranks"""
+    k, n = sweep_ranks.shape
+    # Rank histogram per indicator: counts[i, r - 1] sweeps put indicator i at rank r
+    counts = np.bincount((np.arange(n) * n + sweep_ranks - 1).ravel(), minlength=n * n).reshape(n, n)
+    return {
+        'mean': sweep_ranks.mean(axis=0),
+        'std': sweep_ranks.std(axis=0),
+        'median': np.median(sweep_ranks, axis=0),
+        'p05': np.percentile(sweep_ranks, 5, axis=0),
+        'p95': np.percentile(sweep_ranks, 95, axis=0),
+        'base_share': (sweep_ranks == base_ranks).mean(axis=0),
+        'top_share': (sweep_ranks <= top).mean(axis=0),
+        'histogram': counts / k
+    }
+
+def analyze(db=None, method='topsis', samples=SWEEP_SAMPLES, base_weights=None, concentration=None,
+            seed=SWEEP_SEED, criteria=None, rows=None):
+    """Base ranking plus a weight sweep of one method over the indicator database
+
+    Returns a dict with names, criteria, X, base_weights, base_scores, base_ranks, weights,
+    ranks (samples x indicators) and stability (see rank_stability).
+    """
+    if db is None:
+        from indicator_database import load
+        db = load()
+    criteria = list(CRITERIA) if criteria is None else list(criteria)
+    X, benefit = decision_matrix(db, criteria, rows)
+    base = np.ones(len(criteria)) if base_weights is None else np.asarray(base_weights, float)
+    base_scores = scores(X, base, benefit, method)[0]
+    base_ranks = ranks(base_scores)[0]
+    weights = sample_weights(samples, base, concentration, seed)
+    sweep_ranks = ranks(scores(X, weights, benefit, method))
+    names = db['Indicator'] if rows is None else db['Indicator'][rows]
+    return {
+        'method': method,
+        'names': names,
+        'criteria': criteria,
+        'X': X,
+        'base_weights': base / base.sum(),
+        'base_scores': base_scores,
+        'base_ranks': base_ranks,
+        'weights': weights,
+        'ranks': sweep_ranks,
+        'stability': rank_stability(sweep_ranks, base_ranks)
+    }
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Render every methodological scheme in parallel
+Finds all create_* functions in the scheme scripts and builds them across a process pool,
+so a full regeneration takes about as long as the slowest figure
+"""
+
+import argparse
+import ast
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Scripts that contain create_* scheme builders
+SCHEME_MODULES = [
+    'generate_schema_images',
+    'General_War_Induced_Soil_Investigation_Scheme',
+    'create_risk_assessment_scheme',
+    'create_publication_schemes',
+    'create_synthesis_schemes',
+    'create_soil_indicators_visualization'
+]
+
+def _figure_area(func_node):
+    """Area of the figsize=(w, h) literal in a builder, used as a cost estimate"""
+    for node in ast.walk(func_node):
+        if isinstance(node, ast.keyword) and node.arg == 'figsize':
+            try:
+                width, height = ast.literal_eval(node.value)
+                return width * height
+            except (ValueError, TypeError):
+                pass
+    return 0
+
+def discover_schemes(modules=SCHEME_MODULES):
+    """Return (module, function, cost) for every top-level create_* function"""
+    schemes = []
+    for module in modules:
+        with open(os.path.join(SOURCE_DIR, module + '.py'), encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+        for node in tree.body:
+            if isinstance(node, ast.FunctionDef) and node.name.startswith('create_'):
+                schemes.append((module, node.name, _figure_area(node)))
+    return schemes
+
+def select_schemes(schemes, names):
+    """Keep schemes whose function or module name is listed (all when names is empty)"""
+    if not names:
+        return schemes
+    return [s for s in schemes if s[0] in names or s[1] in names]
+
+def render_scheme(module_name, func_name, output_dir=None, variants=None, vector_formats=None,
+                  png_options=None, in_memory=False, dpi=None, output_format=None):
+    """Build one scheme in a worker process and report its timing and output files
+
+    With in_memory the files are not written; their bytes come back as result['files'].
+    dpi overrides the resolution in scheme_render.SAVEFIG_DEFAULTS (e.g. for drafts) and
+    output_format writes that format instead of the PNG.
+    """
+    import importlib
+    if SOURCE_DIR not in sys.path:
+        sys.path.insert(0, SOURCE_DIR)
+    import scheme_render
+    from matplotlib.figure import Figure
+
+    if output_dir:
+        scheme_render.OUTPUT_DIR = output_dir
+    if variants:
+        scheme_render.EXPORT_VARIANTS = dict(variants)
+    if vector_formats:
+        scheme_render.VECTOR_FORMATS = list(vector_formats)
+    if png_options:
+        scheme_render.PNG_OPTIONS.update(png_options)
+    if dpi:
+        scheme_render.SAVEFIG_DEFAULTS = dict(scheme_render.SAVEFIG_DEFAULTS, dpi=dpi)
+    if output_format:
+        scheme_render.OUTPUT_FORMAT = output_format
+    if in_memory:
+        from scheme_sinks import MemorySink
+        scheme_render.OUTPUT_SINK = MemorySink()
+    module = importlib.import_module(module_name)
+
+    first_output = len(scheme_render.saved_paths)
+    start = time.perf_counter()
+    result = getattr(module, func_name)()
+    # Some builders return their figure instead of saving it
+    if isinstance(result, Figure):
+        scheme_render.save_scheme(result, module.OUTPUT_FILES[func_name])
+    # Outputs must be on disk before the render cache records them
+    scheme_render.wait_for_exports()
+
+    result = {
+        'module': module_name,
+        'function': func_name,
+        'seconds': time.perf_counter() - start,
+        'outputs': scheme_render.saved_paths[first_output:]
+    }
+    if in_memory:
+        result['files'] = scheme_render.OUTPUT_SINK.files
+        scheme_render.OUTPUT_SINK = None
+    # Hand new text measurements on to workers started later
+    import scheme_text
+    scheme_text.save_snapshot()
+    return result
+
+def init_worker(ignore_interrupt=False):
+    """Pool initializer: load the text-metrics snapshot (optionally leaving Ctrl+C to the parent)"""
+    if ignore_interrupt:
+        import signal
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if SOURCE_DIR not in sys.path:
+        sys.path.insert(0, SOURCE_DIR)
+    import scheme_text
+    scheme_text.load_snapshot()
+
+def fresh_process_context(preload=('matplotlib.pyplot',)):
+    """Process context whose workers fork from a server with preload already imported
+
+    Combined with max_tasks_per_child=1, every render gets a new process that imports the
+    scheme scripts afresh (so edits are picked up) without paying for the matplotlib import;
+    use init_worker as the initializer to start it with the text-metrics snapshot. Falls back to
+    spawn where forkserver is unavailable.
+    """
+    import multiprocessing
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload(list(preload))
+    return context
+
+def render_schemes(schemes, jobs=None, output_dir=None, cache=True, force=False,
+                   variants=None, vector_formats=None, png_options=None, archive=None):
+    """Render schemes across a process pool and return (results, skipped, failures)
+
+    With cache enabled, schemes whose cache key and outputs are unchanged since the
+    last render are skipped (force re-renders them anyway). variants (suffix -> dpi),
+    vector_formats and png_options override scheme_render.EXPORT_VARIANTS, VECTOR_FORMATS
+    and PNG_OPTIONS. archive (a scheme_sinks sink) receives every file as soon as its
+    worker finishes instead of output_dir; the cache is not used then.
+    """
+    # Non-interactive backend for all workers
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    import scheme_render
+    import render_cache
+
+    render_dir = output_dir or scheme_render.OUTPUT_DIR
+    manifest = render_cache.RenderCache(render_dir) if cache and archive is None else None
+    keys = {}
+    if manifest is not None:
+        export = {'variants': variants or scheme_render.EXPORT_VARIANTS,
+                  'vector_formats': vector_formats or scheme_render.VECTOR_FORMATS,
+                  'png': dict(scheme_render.PNG_OPTIONS, **(png_options or {}))}
+        # Background encoding changes when files are written, not their contents
+        export['png'].pop('background')
+        environment = render_cache.environment_fingerprint(scheme_render.SAVEFIG_DEFAULTS, export)
+        keys = {(module, func): render_cache.scheme_key(module, func, environment)
+                for module, func, _ in schemes}
+        evicted = manifest.evict({f"{module}.{func}" for module, func, _ in discover_schemes()})
+        for scheme_id in evicted:
+            print(f"  evicted {scheme_id}")
+
+    results, skipped, failures = [], [], []
+    pending = []
+    for module, func, cost in schemes:
+        if manifest is not None and not force and manifest.is_fresh(f"{module}.{func}", keys[module, func]):
+            skipped.append((module, func))
+        else:
+            pending.append((module, func, cost))
+    if skipped:
+        print(f"  {len(skipped)} scheme(s) unchanged, skipped")
+
+    # Largest figures first so the slowest one never starts last
+    pending.sort(key=lambda s: s[2], reverse=True)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker) as pool:
+        futures = {pool.submit(render_scheme, module, func, output_dir, variants, vector_formats,
+                               png_options, archive is not None):
+                   (module, func)
+                   for module, func, _ in pending}
+        for future in as_completed(futures):
+            module, func = futures[future]
+            try:
+                result = future.result()
+            except Exception as exc:
+                failures.append((module, func, exc))
+                print(f"FAILED: {module}.{func}: {exc!r}")
+                if manifest is not None:
+                    manifest.invalidate(f"{module}.{func}")
+                    manifest.save()
+                continue
+            results.append(result)
+            for name, data in result.pop('files', {}).items():
+                archive.write(name, data)
+            if manifest is not None:
+                manifest.record(f"{module}.{func}", keys[module, func], result['outputs'])
+                manifest.save()
+            print(f"  {func:<40s} {result['seconds']:6.1f} s")
+    if manifest is not None:
+        manifest.save()
+    return results, skipped, failures
+
+def main():
+    """Parse command line options and render the selected schemes"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('names', nargs='*',
+                        help='create_* functions or script modules to render (default: all)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help='number of worker processes (default: CPU count)')
+    parser.add_argument('-o', '--output-dir', help='write schemes below this folder')
+    parser.add_argument('--force', action='store_true',
+                        help='re-render schemes even when the render cache says they are unchanged')
+    parser.add_argument('--no-cache', action='store_true', help='neither read nor update the render cache')
+    parser.add_argument('--variant', action='append', default=[], metavar='SUFFIX=DPI',
+                        help='also write Scheme_SUFFIX.png downsampled to DPI (repeatable)')
+    parser.add_argument('--vector', default='', metavar='FORMATS',
+                        help='comma-separated vector formats written from the same figure, e.g. svg,pdf')
+    parser.add_argument('--png-level', type=int, choices=range(10), metavar='0-9',
+                        help='PNG zlib compression level (default: 6; 1 is much faster, slightly larger)')
+    parser.add_argument('--png-mode', choices=['RGBA', 'RGB', 'P'],
+                        help='PNG pixel mode: RGBA (default), RGB for opaque figures, P for a 256-colour palette')
+    parser.add_argument('--tile-mb', type=float, metavar='MB',
+                        help='render PNGs in strips streamed to the file, holding about MB of pixels at once')
+    parser.add_argument('--poster', choices=['A0', 'A1', 'A2', 'A3', 'A4'],
+                        help='scale PNGs to fill this paper size at 300 dpi (rendered in strips)')
+    parser.add_argument('--background-encode', action='store_true',
+                        help='encode PNGs on a separate thread while the next figure is built')
+    parser.add_argument('--profile', metavar='MODES',
+                        help='per-figure stage timings in every worker: 1, or cprofile and/or tracemalloc '
+                             '(sets SCHEME_PROFILE; dumps go to SCHEME_PROFILE_DIR)')
+    parser.add_argument('--archive', metavar='PATH',
+                        help='stream all files into a .zip, .tar, .tar.gz, .tar.bz2 or .tar.xz archive '
+                             '(- writes a tar.gz to stdout) instead of the output folder')
+    parser.add_argument('--watch', action='store_true',
+                        help='watch the sources and CSV inputs and re-render affected schemes as they change')
+    parser.add_argument('--draft-dpi', type=float, default=60,
+                        help='resolution of the quick render in --watch mode before the full one (default: 60)')
+    parser.add_argument('--list', action='store_true', help='list the discovered schemes and exit')
+    args = parser.parse_args()
+    try:
+        variants = {suffix: float(dpi) for suffix, dpi in (v.split('=', 1) for v in args.variant)}
+    except ValueError:
+        parser.error('--variant expects SUFFIX=DPI, e.g. --variant web=100')
+    vector_formats = [fmt.strip() for fmt in args.vector.split(',') if fmt.strip()]
+    if args.profile:
+        os.environ['SCHEME_PROFILE'] = args.profile
+    png_options = {}
+    if args.png_level is not None:
+        png_options['compress_level'] = args.png_level
+    if args.png_mode:
+        png_options['mode'] = args.png_mode
+    if args.background_encode:
+        png_options['background'] = True
+    if args.tile_mb:
+        png_options['tile_mb'] = args.tile_mb
+    if args.poster:
+        png_options['poster'] = args.poster
+
+    schemes = select_schemes(discover_schemes(), args.names)
+    if args.list:
+        for module, func, _ in schemes:
+            print(f"{module}.{func}")
+        return 0
+    if not schemes:
+        print("No matching schemes found")
+        return 1
+    if args.watch:
+        from scheme_watch import watch
+        watch(args.output_dir, args.names, args.jobs, args.draft_dpi,
+              variants=variants, vector_formats=vector_formats, png_options=png_options)
+        return 0
+
+    archive = None
+    if args.archive:
+        from scheme_sinks import ArchiveSink
+        if args.archive == '-':
+            # Progress goes to stderr so stdout carries only the archive
+            archive = ArchiveSink(sys.stdout.buffer, format='tar:gz')
+            sys.stdout = sys.stderr
+        else:
+            archive = ArchiveSink(args.archive)
+
+    print(f"Rendering {len(schemes)} schemes with {args.jobs} worker(s)...")
+    start = time.perf_counter()
+    try:
+        results, skipped, failures = render_schemes(schemes, jobs=args.jobs, output_dir=args.output_dir,
+                                                    cache=not args.no_cache, force=args.force,
+                                                    variants=variants, vector_formats=vector_formats,
+                                                    png_options=png_options, archive=archive)
+    finally:
+        if archive is not None:
+            archive.close()
+    elapsed = time.perf_counter() - start
+
+    slowest = max((r['seconds'] for r in results), default=0.0)
+    print(f"\nRendered {len(results)} schemes in {elapsed:.1f} s (slowest figure: {slowest:.1f} s), "
+          f"{len(skipped)} unchanged")
+    if failures:
+        print(f"{len(failures)} scheme(s) failed")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Content-hash render cache for the methodological schemes
+A scheme is skipped when its cache key matches the last render and its output files are unchanged.
+The key covers the create_* function source, every function and class of its script that it reaches
+(directly, through other helpers or through the module-level setup), the module-level setup itself,
+local helper modules, declared input data files, the matplotlib/FreeType/font versions and the
+savefig parameters.
+"""
+
+import ast
+import hashlib
+import io
+import json
+import os
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SOURCE_DIR)
+
+# Manifest file kept in the output folder
+MANIFEST_NAME = '.scheme_render_cache.json'
+
+# Bump when the key layout changes so old manifests are discarded
+CACHE_VERSION = 2
+
+# Module-level dict in a scheme script mapping create_* names to the data files they read
+# (paths relative to the repository root), e.g. SCHEME_INPUTS = {'create_x': ['04_Research_Articles/x.csv']}
+INPUTS_VARIABLE = 'SCHEME_INPUTS'
+
+def _sha256(data):
+    """Hex digest of bytes or text"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+def _file_digest(path):
+    """Hex digest of a file's contents ('missing' when it does not exist)"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    except FileNotFoundError:
+        return 'missing'
+    return digest.hexdigest()
+
+def _parse_module(module):
+    """Source text and syntax tree of a script in the source folder"""
+    with open(os.path.join(SOURCE_DIR, module + '.py'), encoding='utf-8') as f:
+        source = f.read()
+    return source, ast.parse(source)
+
+def _source_segments(source, nodes):
+    """ast.get_source_segment() of several nodes, splitting the source into lines only once"""
+    lines = io.StringIO(source, newline='').readlines()
+    segments = []
+    for node in nodes:
+        first, last = node.lineno - 1, node.end_lineno - 1
+        if first == last:
+            segments.append(lines[first].encode()[node.col_offset:node.end_col_offset].decode())
+        else:
+            segments.append(lines[first].encode()[node.col_offset:].decode() + ''.join(lines[first + 1:last])
+                            + lines[last].encode()[:node.end_col_offset].decode())
+    return segments
+
+def _local_imports(tree):
+    """Names of modules imported by a tree that live in the source folder"""
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+    return sorted(n for n in names if os.path.isfile(os.path.join(SOURCE_DIR, n + '.py')))
+
+def dependency_digests(module, seen=None):
+    """Digests of the local helper modules a script imports, followed transitively"""
+    seen = set() if seen is None else seen
+    digests = {}
+    _, tree = _parse_module(module)
+    for name in _local_imports(tree):
+        if name in seen:
+            continue
+        seen.add(name)
+        digests[name] = _file_digest(os.path.join(SOURCE_DIR, name + '.py'))
+        digests.update(dependency_digests(name, seen))
+    return digests
+
+def declared_inputs(tree):
+    """The SCHEME_INPUTS mapping of a script, or an empty dict"""
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+                isinstance(t, ast.Name) and t.id == INPUTS_VARIABLE for t in node.targets):
+            return ast.literal_eval(node.value)
+    return {}
+
+def environment_fingerprint(savefig_params, export=None):
+    """Versions of everything outside the repository that changes the rendered pixels
+
+    export describes extra outputs per scheme (variant sizes, vector formats).
+    """
+    import matplotlib
+    from matplotlib import font_manager, ft2font
+
+    fonts = {}
+    for weight in ('normal', 'bold'):
+        for style in ('normal', 'italic'):
+            prop = font_manager.FontProperties(family=matplotlib.rcParamsDefault['font.family'],
+                                               weight=weight, style=style)
+            path = font_manager.findfont(prop)
+            fonts[f'{weight}/{style}'] = [os.path.basename(path), _file_digest(path)]
+
+    return {
+        'cache_version': CACHE_VERSION,
+        'matplotlib': matplotlib.__version__,
+        'freetype': ft2font.__freetype_version__,
+        'fonts': fonts,
+        'savefig': {k: str(v) for k, v in sorted(savefig_params.items())},
+        'export': export or {}
+    }
+
+_DEFINITION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+def _is_main_guard(node):
+    """True for the if __name__ == "__main__": block of a script"""
+    return (isinstance(node, ast.If) and isinstance(node.test, ast.Compare)
+            and isinstance(node.test.left, ast.Name) and node.test.left.id == '__name__')
+
+def reachable_definitions(tree, func_name):
+    """Names of the module-level functions and classes a function uses, itself included
+
+    References are followed transitively, and everything the module-level setup refers to counts
+    as reached (e.g. helpers listed in a module-level table); the __main__ guard does not.
+    """
+    definitions = {node.name: node for node in tree.body if isinstance(node, _DEFINITION_NODES)}
+    if func_name not in definitions:
+        raise KeyError(func_name)
+    pending = [func_name]
+    for node in tree.body:
+        if not isinstance(node, _DEFINITION_NODES) and not _is_main_guard(node):
+            pending.extend(n.id for n in ast.walk(node) if isinstance(n, ast.Name) and n.id in definitions)
+    reached = set()
+    while pending:
+        name = pending.pop()
+        if name in reached:
+            continue
+        reached.add(name)
+        pending.extend(n.id for n in ast.walk(definitions[name])
+                       if isinstance(n, ast.Name) and n.id in definitions)
+    return reached
+
+def source_key(source, func_name, tree=None):
+    """Digests of a function's source, the same-module definitions it reaches and the module setup"""
+    tree = ast.parse(source) if tree is None else tree
+    try:
+        reached = reachable_definitions(tree, func_name)
+    except KeyError:
+        raise KeyError(f"{func_name} not found") from None
+    prelude, helpers = [], {}
+    for node, segment in zip(tree.body, _source_segments(source, tree.body)):
+        if isinstance(node, _DEFINITION_NODES):
+            if node.name in reached:
+                helpers[node.name] = _sha256(segment)
+        else:
+            prelude.append(segment)
+    return {
+        'function': helpers.pop(func_name),
+        'helpers': helpers,
+        'prelude': _sha256('\n'.join(prelude))
+    }
+
+def scheme_key(module, func_name, environment):
+    """Cache key for one create_* function"""
+    source, tree = _parse_module(module)
+    try:
+        parts = source_key(source, func_name, tree)
+    except KeyError:
+        raise KeyError(f"{module}.{func_name} not found") from None
+
+    inputs = declared_inputs(tree).get(func_name, [])
+    parts.update({
+        'dependencies': dependency_digests(module),
+        'inputs': {path: _file_digest(os.path.join(REPO_DIR, path)) for path in inputs},
+        'environment': environment
+    })
+    return _sha256(json.dumps(parts, sort_keys=True))
+
+class RenderCache:
+    """Manifest of rendered schemes and their outputs, stored in the output folder"""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.entries = {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == CACHE_VERSION:
+                self.entries = manifest.get('schemes', {})
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def _stat(self, relpath):
+        """(size, mtime_ns) of an output file, or None when it is missing"""
+        try:
+            st = os.stat(os.path.join(self.output_dir, relpath))
+        except FileNotFoundError:
+            return None
+        return [st.st_size, st.st_mtime_ns]
+
+    def is_fresh(self, scheme_id, key):
+        """True when the scheme was rendered with this key and its outputs are untouched"""
+        entry = self.entries.get(scheme_id)
+        if not entry or entry['key'] != key or not entry['outputs']:
+            return False
+        return all(self._stat(relpath) == stat for relpath, stat in entry['outputs'].items())
+
+    def record(self, scheme_id, key, output_paths):
+        """Remember a successful render"""
+        outputs = {}
+        for path in output_paths:
+            relpath = os.path.relpath(path, self.output_dir)
+            outputs[relpath] = self._stat(relpath)
+        self.entries[scheme_id] = {'key': key, 'outputs': outputs}
+
+    def invalidate(self, scheme_id):
+        """Forget a scheme (e.g. after a failed render)"""
+        self.entries.pop(scheme_id, None)
+
+    def evict(self, valid_ids):
+        """Drop entries for schemes that no longer exist and return their ids"""
+        stale = [scheme_id for scheme_id in self.entries if scheme_id not in valid_ids]
+        for scheme_id in stale:
+            del self.entries[scheme_id]
+        return stale
+
+    def save(self):
+        """Write the manifest atomically"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'schemes': self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Contamination risk matrix and vectorized risk classification
+The matrix drawn by create_risk_assessment_scheme() is defined here once: contamination level
+(concentration over site background, cut at CONTAMINATION_EDGES) against exposure potential
+(a 0-1 exposure score, cut at EXPOSURE_EDGES) gives one of RISK_CLASSES, and each class one
+decision and monitoring frequency. classify() bins whole arrays with np.searchsorted and a
+lookup into RISK_MATRIX, so ten million samples are classified in about a second.
+
+    from risk_matrix import classify, summarize
+    risk = classify(concentration, background, exposure)
+    risk['risk']                        # int8 class per sample (-1 where it cannot be classified)
+    summarize(risk)['Remediation']      # samples that need active remediation
+"""
+
+import numpy as np
+
+# Concentration / background ratios separating the contamination levels (a ratio on an edge
+# belongs to the level above it)
+CONTAMINATION_EDGES = (2, 5, 10)
+CONTAMINATION_LEVELS = ('Low', 'Moderate', 'High', 'Very High')
+# Exposure scores (0 = none, 1 = highest; land use, population density, sensitivity) separating
+# the exposure levels
+EXPOSURE_EDGES = (0.25, 0.5, 0.75)
+EXPOSURE_LEVELS = ('Low', 'Medium', 'High', 'Critical')
+
+RISK_CLASSES = ('Low', 'Medium', 'High')
+# Risk class per exposure level (rows) and contamination level (columns)
+RISK_MATRIX = np.array([
+    [0, 0, 1, 1],
+    [0, 1, 1, 2],
+    [1, 1, 2, 2],
+    [1, 2, 2, 2]
+], np.int8)
+RISK_MATRIX.flags.writeable = False
+# RISK_MATRIX with a row and column of -1 appended, so level -1 (missing) looks up -1
+_LOOKUP = np.pad(RISK_MATRIX, ((0, 1), (0, 1)), constant_values=-1)
+
+# Action and monitoring frequency per risk class
+DECISIONS = ('Monitoring only', 'Enhanced monitoring + Risk communication',
+             'Active remediation + Access restrictions')
+ACTIONS = ('Monitoring', 'Monitoring', 'Remediation')
+MONITORING = ('Annual', 'Quarterly', 'Monthly')
+
+# Escalation above the matrix: the Critical tier of the decision framework is declared by the
+# on-site assessment (acute hazards such as ordnance or drinking-water exposure), not derived
+# from concentrations, so classify() never assigns it
+CRITICAL_DECISION = 'Immediate intervention + Emergency protocols'
+CRITICAL_MONITORING = 'Continuous'
+
+def contamination_labels():
+    """Axis labels of the contamination levels, e.g. 'Moderate\\n(2-5x background)'"""
+    bounds = [f'<{CONTAMINATION_EDGES[0]}x'] + \
+             [f'{lo}-{hi}x' for lo, hi in zip(CONTAMINATION_EDGES, CONTAMINATION_EDGES[1:])] + \
+             [f'>{CONTAMINATION_EDGES[-1]}x']
+    return [f'{level}\n({bound} background)' for level, bound in zip(CONTAMINATION_LEVELS, bounds)]
+
+def _levels(values, edges):
+    """Level (0 to len(edges)) of each value; -1 for NaN"""
+    values = np.asarray(values, float)
+    levels = np.searchsorted(np.asarray(edges, float), values, side='right').astype(np.int8)
+    return np.where(np.isnan(values), np.int8(-1), levels)
+
+def contamination_level(concentration, background):
+    """Contamination level per sample from concentrations and (broadcastable) backgrounds
+
+    Samples with a missing concentration or a missing or non-positive background get -1.
+    """
+    concentration = np.asarray(concentration, float)
+    background = np.asarray(background, float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(background > 0, concentration / background, np.nan)
+    return _levels(ratio, CONTAMINATION_EDGES)
+
+def exposure_level(exposure):
+    """Exposure level per sample from 0-1 exposure scores; -1 for missing scores"""
+    exposure = np.asarray(exposure, float)
+    if np.any((exposure < 0) | (exposure > 1)):
+        raise ValueError("Exposure scores must lie between 0 and 1")
+    return _levels(exposure, EXPOSURE_EDGES)
+
+def classify(concentration, background, exposure):
+    """Contamination level, exposure level, risk class and remediation flag per sample
+
+    The arguments broadcast against each other (e.g. one background per site or element).
+    Returns a dict of int8 arrays 'contamination', 'exposure' and 'risk' (-1 where an input is
+    missing) and the boolean array 'remediation'.
+    """
+    contamination = contamination_level(concentration, background)
+    exposure = exposure_level(exposure)
+    contamination, exposure = np.broadcast_arrays(contamination, exposure)
+    risk = _LOOKUP[exposure, contamination]
+    remediates = np.array([action == 'Remediation' for action in ACTIONS] + [False])
+    return {
+        'contamination': contamination,
+        'exposure': exposure,
+        'risk': risk,
+        'remediation': remediates[risk]
+    }
+
+def decisions(risk):
+    """Decision text per sample of a risk class array ('' where it is -1)"""
+    return np.asarray(('',) + DECISIONS)[np.asarray(risk) + 1]
+
+def summarize(result):
+    """Sample counts per risk class, per action and unclassified, from classify()"""
+    counts = np.bincount(np.ravel(result['risk']) + 1, minlength=len(RISK_CLASSES) + 1)
+    summary = {name: int(count) for name, count in zip(RISK_CLASSES, counts[1:])}
+    for action in dict.fromkeys(ACTIONS):
+        summary[action] = int(sum(count for count, a in zip(counts[1:], ACTIONS) if a == action))
+    summary['Unclassified'] = int(counts[0])
+    return summary
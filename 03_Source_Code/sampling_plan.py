@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Sampling plans for crater fields
+generate() lays out the sampling design of the sampling strategy scheme around any number of
+craters at once:
+
+    crater          samples on the crater rim at CRATER_ANGLES (the 0-2 m zone)
+    transect        samples on rings at transect_radii along angles (2-40 m)
+    background      samples farther than the exclusion radius (40 m) from every crater
+
+All points come from broadcasting centres against radii and angles. Conflicts between
+neighbouring craters are resolved with KD-trees (scipy.spatial.cKDTree) over the crater
+centres and the points:
+
+    nearest         crater and transect samples are kept only where their own crater is the
+                    closest one, so each sample belongs to a single crater
+    spacing         of two crater or transect samples closer than min_spacing, the later goes
+    exclusion       background candidates within any crater's exclusion radius are dropped, and
+                    the survivors thinned to background_spacing
+
+A 5,000-crater plan takes about a second; to_csv() and to_geojson() export it and draw_plan()
+renders it with one collection per sample kind.
+
+    from sampling_plan import generate, to_geojson
+    plan = generate(centres, crater_radii=1.5)
+    plan['dropped']                    # points removed per rule
+    to_geojson(plan, 'plan.geojson')
+"""
+
+import csv
+import json
+
+import numpy as np
+
+KINDS = ('crater', 'transect', 'background')
+# Sample id prefix and drawing colour per kind (as in the sampling strategy scheme)
+PREFIXES = ('C', 'T', 'B')
+KIND_COLORS = ('yellow', 'orange', '#2ecc71')
+
+# Distances in metres
+CRATER_RADIUS = 1.5
+# Rim samples: four diagonals, then north and south
+CRATER_ANGLES = (45, 135, 225, 315, 90, 270)
+TRANSECT_RADII = (5.0, 10.0, 20.0, 40.0)
+TRANSECT_ANGLES = 8
+# Background samples lie beyond this distance from every crater (>40 m from the pit)
+EXCLUSION_RADIUS = 40.0
+# Background candidates are placed this far beyond a crater's exclusion radius
+BACKGROUND_MARGIN = 10.0
+BACKGROUND_ANGLES = 4
+BACKGROUND_SPACING = 25.0
+MIN_SPACING = 1.0
+
+def _angles(angles):
+    """Angles in radians from a count (evenly spaced from east) or from degrees"""
+    if np.ndim(angles) == 0:
+        return np.radians(np.arange(int(angles)) * 360 / int(angles))
+    return np.radians(np.asarray(angles, float))
+
+def _ring_points(centres, radii, angles):
+    """(x, y, crater, ring, angle) of points at radii (craters x rings) and angles around centres"""
+    n, rings = radii.shape
+    crater, ring, angle = np.meshgrid(np.arange(n), np.arange(rings), np.arange(len(angles)), indexing='ij')
+    crater, ring, angle = crater.ravel(), ring.ravel(), angle.ravel()
+    r, a = radii[crater, ring], angles[angle]
+    return centres[crater, 0] + r * np.cos(a), centres[crater, 1] + r * np.sin(a), crater, ring, a
+
+def _drop_close(x, y, spacing):
+    """Mask keeping the first of every pair of points closer than spacing
+
+    Same result as walking the pairs in order and dropping the later point of each pair whose
+    earlier point is still kept, resolved in rounds over all pairs at once: a point is dropped
+    as soon as an earlier kept point is within spacing, and kept once all its earlier
+    neighbours are dropped. The rounds follow the longest chain of close points, a few per plan.
+    """
+    from scipy.spatial import cKDTree
+    keep = np.ones(len(x), bool)
+    if len(x) < 2 or spacing <= 0:
+        return keep
+    # query_pairs lists each pair once with first < second
+    first, second = cKDTree(np.column_stack([x, y])).query_pairs(spacing, output_type='ndarray').T
+    decided = np.ones(len(x), bool)
+    decided[second] = False
+    while len(second):
+        dropped = second[decided[first] & keep[first]]
+        keep[dropped] = False
+        decided[dropped] = True
+        waiting = np.zeros(len(x), bool)
+        waiting[second[~decided[first]]] = True
+        decided |= ~waiting
+        pending = ~decided[second]
+        first, second = first[pending], second[pending]
+    return keep
+
+def generate(centres, crater_radii=CRATER_RADIUS, transect_radii=TRANSECT_RADII, angles=TRANSECT_ANGLES,
+             exclusion=EXCLUSION_RADIUS, bounds=None, min_spacing=MIN_SPACING,
+             background_angles=BACKGROUND_ANGLES, background_spacing=BACKGROUND_SPACING):
+    """Sampling plan for craters at centres (n x 2)
+
+    crater_radii and exclusion are scalars or one value per crater; transect_radii is shared and
+    rings inside a crater's rim are skipped. angles is a count or a list of degrees. bounds
+    (x0, y0, x1, y1) drops points outside the area. Returns a dict of per-point arrays x, y,
+    kind (index into KINDS), crater (the crater a point samples or was placed from), ring (-1
+    outside transects), angle (degrees) and distance (to that crater), plus 'dropped': points
+    removed per rule.
+    """
+    from scipy.spatial import cKDTree
+    centres = np.atleast_2d(np.asarray(centres, float))
+    n = len(centres)
+    crater_radii = np.broadcast_to(np.asarray(crater_radii, float), (n,))
+    exclusion = np.broadcast_to(np.asarray(exclusion, float), (n,))
+    transect_radii = np.asarray(transect_radii, float)
+    if np.any(exclusion < transect_radii.max(initial=0)):
+        raise ValueError("Transects must end within the background exclusion radius")
+    dropped = dict.fromkeys(('bounds', 'nearest', 'spacing', 'exclusion'), 0)
+
+    parts = [
+        _ring_points(centres, crater_radii[:, None], _angles(CRATER_ANGLES)),
+        _ring_points(centres, np.broadcast_to(transect_radii, (n, len(transect_radii))), _angles(angles)),
+        _ring_points(centres, (exclusion + BACKGROUND_MARGIN)[:, None], _angles(background_angles))
+    ]
+    x, y, crater, ring, angle = (np.concatenate(columns) for columns in zip(*parts))
+    kind = np.repeat(np.arange(len(KINDS)), [len(part[0]) for part in parts])
+    ring = np.where(kind == 1, ring, -1)
+    distance = np.hypot(x - centres[crater, 0], y - centres[crater, 1])
+    keep = (kind != 1) | (distance > crater_radii[crater])
+
+    if bounds is not None:
+        x0, y0, x1, y1 = bounds
+        inside = (x0 <= x) & (x <= x1) & (y0 <= y) & (y <= y1)
+        dropped['bounds'] = int((keep & ~inside).sum())
+        keep &= inside
+
+    centre_tree = cKDTree(centres)
+    sampled = keep & (kind < 2)
+    if n > 1:
+        # Crater and transect samples: the owner has to be the nearest crater (ties keep it)
+        nearest, _ = centre_tree.query(np.column_stack([x[sampled], y[sampled]]))
+        own = nearest >= distance[sampled] - 1e-9
+        dropped['nearest'] = int((~own).sum())
+        sampled[np.flatnonzero(sampled)[~own]] = False
+    close = _drop_close(x[sampled], y[sampled], min_spacing)
+    dropped['spacing'] = int((~close).sum())
+    sampled[np.flatnonzero(sampled)[~close]] = False
+
+    # Background candidates: outside every crater's exclusion radius, then thinned
+    background = keep & (kind == 2)
+    candidates = np.flatnonzero(background)
+    pairs = cKDTree(np.column_stack([x[candidates], y[candidates]])).sparse_distance_matrix(
+        centre_tree, exclusion.max(initial=0), output_type='ndarray')
+    inside = pairs['i'][pairs['v'] <= exclusion[pairs['j']]]
+    excluded = np.zeros(len(candidates), bool)
+    excluded[inside] = True
+    dropped['exclusion'] = int(excluded.sum())
+    candidates = candidates[~excluded]
+    close = _drop_close(x[candidates], y[candidates], background_spacing)
+    dropped['spacing'] += int((~close).sum())
+
+    chosen = np.sort(np.concatenate([np.flatnonzero(sampled), candidates[close]]))
+    return {
+        'x': x[chosen],
+        'y': y[chosen],
+        'kind': kind[chosen].astype(np.int8),
+        'crater': crater[chosen],
+        'ring': ring[chosen].astype(np.int16),
+        'angle': np.round(np.degrees(angle[chosen]) % 360, 6),
+        'distance': distance[chosen],
+        'dropped': dropped
+    }
+
+def sample_ids(plan):
+    """Sample ids such as 'T12-5': kind prefix, crater number and running number per crater and kind"""
+    return _id_column(plan).tolist()
+
+def _id_column(plan):
+    """Sample ids as a string array"""
+    kind, crater = plan['kind'], plan['crater']
+    order = np.lexsort((np.arange(len(kind)), crater, kind))
+    group = kind[order].astype(np.int64) * (crater.max(initial=0) + 1) + crater[order]
+    starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+    number = np.empty(len(kind), np.int64)
+    number[order] = np.arange(len(kind)) - np.repeat(starts, np.diff(np.r_[starts, len(kind)]))
+    return np.asarray(PREFIXES)[kind] + (crater + 1).astype(str) + '-' + (number + 1).astype(str)
+
+def _text(values):
+    """repr() strings of values as a list, each distinct value formatted once"""
+    distinct, index = np.unique(values, return_inverse=True)
+    return np.asarray(list(map(repr, distinct.tolist())), object)[index].tolist()
+
+def _columns(plan):
+    """Export columns as lists: id, kind, crater, ring ('' outside transects), angle and distance text"""
+    ring = plan['ring'].astype(np.int64) + 1
+    return {
+        'id': _id_column(plan).tolist(),
+        'kind': np.asarray(KINDS)[plan['kind']].tolist(),
+        'crater': (plan['crater'] + 1).tolist(),
+        'ring': np.where(ring > 0, np.asarray(_text(ring), object), '').tolist(),
+        'angle': _text(plan['angle']),
+        'distance': _text(np.round(plan['distance'], 3))
+    }
+
+# One text row per sample; ids, kinds and numbers need neither CSV quoting nor JSON escaping,
+# so the rows are formatted by map() over the columns instead of a writer call per sample
+CSV_ROW = '{},{:.3f},{:.3f},{},{},{},{},{}\r\n'
+FEATURE = ('{{"type":"Feature","id":"{0}","geometry":{{"type":"Point","coordinates":[{1!r},{2!r}]}},'
+           '"properties":{{"kind":"{3}","crater":{4},"ring":{5},"angle":{6},"distance":{7},"id":"{0}"}}}}')
+
+def to_csv(plan, path):
+    """Write the plan as CSV: id, x, y, kind, crater, ring, angle, distance"""
+    columns = _columns(plan)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerow(['id', 'x', 'y', 'kind', 'crater', 'ring', 'angle', 'distance'])
+        f.write(''.join(map(CSV_ROW.format, columns['id'], plan['x'].tolist(), plan['y'].tolist(),
+                            columns['kind'], columns['crater'], columns['ring'], columns['angle'],
+                            columns['distance'])))
+
+def to_geojson(plan, path, crs=None):
+    """Write the plan as a GeoJSON FeatureCollection of points (crs: optional name, e.g. 'EPSG:32636')"""
+    columns = _columns(plan)
+    rings = [ring or 'null' for ring in columns['ring']]
+    header = {'type': 'FeatureCollection'}
+    if crs:
+        header['crs'] = {'type': 'name', 'properties': {'name': crs}}
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(header, separators=(',', ':'))[:-1])
+        f.write(',"features":[')
+        f.write(','.join(map(FEATURE.format, columns['id'], np.round(plan['x'], 3).tolist(),
+                             np.round(plan['y'], 3).tolist(), columns['kind'], columns['crater'], rings,
+                             columns['angle'], columns['distance'])))
+        f.write(']}')
+
+def draw_plan(ax, plan, centres, crater_radii=CRATER_RADIUS, exclusion=None, size=None, labels=False, **kwargs):
+    """Draw craters, optional exclusion rings and the samples, one collection per kind
+
+    size is the sample marker radius in data units (default 1 % of the plan's extent);
+    labels=True writes sample ids next to the points, for small plans. Returns the collections.
+    """
+    from scheme_shapes import circles
+    centres = np.atleast_2d(np.asarray(centres, float))
+    if size is None:
+        size = 0.01 * max(np.ptp(plan['x']) if len(plan['x']) else 0, np.ptp(centres[:, 0]), 1.0)
+    drawn = []
+    if exclusion is not None:
+        drawn.append(circles(ax, centres[:, 0], centres[:, 1], exclusion, facecolor='none',
+                             edgecolor='gray', linestyle='--', linewidth=0.5))
+    drawn.append(circles(ax, centres[:, 0], centres[:, 1], crater_radii, facecolor='darkred', edgecolor='black'))
+    for k, color in enumerate(KIND_COLORS):
+        chosen = plan['kind'] == k
+        drawn.append(circles(ax, plan['x'][chosen], plan['y'][chosen], size, facecolor=color,
+                             edgecolor='black', **kwargs))
+    if labels:
+        for sample, x, y in zip(sample_ids(plan), plan['x'], plan['y']):
+            ax.text(x + 1.5 * size, y + 1.5 * size, sample, fontsize=7)
+    return drawn
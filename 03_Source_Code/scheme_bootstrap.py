@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Lightweight start-up shared by the scheme generators
+Selects a non-interactive backend before pyplot loads, applies the common style without
+importing seaborn, and defers heavy modules (matplotlib itself included) until they are
+actually used
+"""
+
+import importlib
+import importlib.util
+import os
+import sys
+
+# seaborn.color_palette("husl"), precomputed so seaborn is not imported just to set the palette
+HUSL_PALETTE = ['#f77189', '#bb9832', '#50b131', '#36ada4', '#3ba3ec', '#e866f4']
+
+# Opt-in stage profiling (see scheme_profile.py)
+if os.environ.get('SCHEME_PROFILE'):
+    import scheme_profile
+    scheme_profile.install_from_env()
+
+class _AfterImport:
+    """Finder that runs callbacks right after one module has been executed
+
+    A plain meta path finder (only find_spec is needed): subclassing importlib.abc.MetaPathFinder
+    would import importlib.abc and importlib.resources at every start.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.callbacks = []
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname != self.name:
+            return None
+        sys.meta_path.remove(self)
+        spec = importlib.util.find_spec(fullname)
+        if spec is None or spec.loader is None:
+            return spec
+        exec_module = spec.loader.exec_module
+
+        def exec_and_notify(module):
+            exec_module(module)
+            for callback in self.callbacks:
+                callback(module)
+        spec.loader.exec_module = exec_and_notify
+        return spec
+
+def after_import(name, callback):
+    """Call callback(module) once the module is imported, or now if it already is"""
+    module = sys.modules.get(name)
+    if module is not None and not isinstance(module, importlib.util._LazyModule):
+        callback(module)
+        return
+    finder = next((finder for finder in sys.meta_path
+                   if isinstance(finder, _AfterImport) and finder.name == name), None)
+    if finder is None:
+        finder = _AfterImport(name)
+        sys.meta_path.insert(0, finder)
+    if callback not in finder.callbacks:
+        finder.callbacks.append(callback)
+
+def _select_backend(matplotlib):
+    # The schemes are only ever saved to files; honour an explicit MPLBACKEND otherwise
+    if 'matplotlib.pyplot' not in sys.modules and not os.environ.get('MPLBACKEND'):
+        matplotlib.use('Agg')
+
+def _install_text_cache(module):
+    import scheme_text
+    scheme_text.install()
+
+# matplotlib itself is only imported by the first figure (or whatever needs it first)
+after_import('matplotlib', _select_backend)
+
+# Shared text-metrics cache (see scheme_text.py), hooked in without importing matplotlib.text now
+after_import('matplotlib.text', _install_text_cache)
+
+class _LazyModule:
+    """Stand-in for a module that is imported when one of its attributes is first used"""
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(importlib.import_module(self._name), attr)
+
+def lazy_import(name):
+    """Return a module that is only imported when one of its attributes is first used
+
+    Unlike importlib.util.LazyLoader this does not import the parent package either, so
+    lazy_import('matplotlib.pyplot') leaves matplotlib itself unloaded.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    return _LazyModule(name)
+
+def apply_style():
+    """Professional default style with the husl colour cycle (same as sns.set_palette("husl"))
+
+    Applied as soon as matplotlib is imported, so calling it does not import matplotlib.
+    """
+    after_import('matplotlib', _apply_style)
+
+def _apply_style(matplotlib):
+    import matplotlib.style
+    from cycler import cycler
+    matplotlib.style.use('default')
+    matplotlib.rcParams['axes.prop_cycle'] = cycler(color=HUSL_PALETTE)
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Warm render daemon for the scheme generators
+Keeps a pool of render workers with matplotlib, NumPy, Pillow and the font cache already loaded,
+and answers render requests on a local Unix socket, so a figure costs its drawing time only.
+Every render runs in a fresh process forked from the preloaded server, so edits to the scripts
+are picked up without restarting the daemon. Results are cached in memory under the scheme's
+render-cache key, dpi and format, so repeated requests for an unchanged figure return at once.
+
+    python scheme_daemon.py serve -j 4
+    python scheme_daemon.py render create_risk_assessment_scheme --dpi 100 -o risk.png
+    python scheme_daemon.py stats
+    python scheme_daemon.py stop
+
+Protocol: the client sends one JSON request per line and gets one JSON header line back,
+followed (for the memory sink) by the bytes of each listed file in order.
+    {"scheme": "create_x", "dpi": 150, "format": "png", "sink": "memory"}
+    {"scheme": "create_x", "sink": "directory", "output_dir": "/tmp/schemes"}
+    {"scheme": "create_x", "sink": "archive", "path": "/tmp/x.zip"}
+    {"command": "list" | "stats" | "shutdown"}
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from render_all_schemes import discover_schemes, fresh_process_context, init_worker, render_scheme
+
+SOCKET_VARIABLE = 'SCHEME_DAEMON_SOCKET'
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), f'scheme_render_{os.getuid()}.sock')
+
+# Modules imported once by the server every render worker is forked from
+PRELOAD = ['matplotlib.pyplot', 'matplotlib.patches', 'matplotlib.collections', 'numpy', 'PIL.Image']
+
+# Memory the result cache may hold before evicting the least recently used renders
+CACHE_MB = 256
+
+FORMATS = ['png', 'svg', 'pdf', 'eps', 'ps']
+
+def socket_path(path=None):
+    """Socket path: the argument, SCHEME_DAEMON_SOCKET or a per-user file in the temp folder"""
+    return path or os.environ.get(SOCKET_VARIABLE) or DEFAULT_SOCKET
+
+class ResultCache:
+    """LRU of rendered files ({name: bytes}) bounded by their total size"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            files = self.entries.get(key)
+            if files is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return files
+
+    def put(self, key, files):
+        size = sum(len(data) for data in files.values())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self.entries:
+                self.size -= sum(len(data) for data in self.entries.pop(key).values())
+            self.entries[key] = files
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= sum(len(data) for data in evicted.values())
+
+class RenderDaemon:
+    """Resolves, caches and renders scheme requests on a worker pool"""
+
+    def __init__(self, jobs=None, cache_mb=CACHE_MB):
+        import scheme_render
+        from render_cache import environment_fingerprint
+        self.environment = environment_fingerprint(scheme_render.SAVEFIG_DEFAULTS)
+        self.default_dpi = scheme_render.SAVEFIG_DEFAULTS['dpi']
+        self.jobs = jobs or os.cpu_count()
+        self.pool = ProcessPoolExecutor(self.jobs, mp_context=fresh_process_context(PRELOAD),
+                                        max_tasks_per_child=1, initializer=init_worker)
+        self.cache = ResultCache(cache_mb << 20)
+        # Requests for a render already in progress wait for the same future
+        self.running = {}
+        self._lock = threading.Lock()
+        self.renders = 0
+        self.started = time.time()
+
+    def resolve(self, name):
+        """(module, function) for a create_* name or 'module.function'"""
+        for module, func, _ in discover_schemes():
+            if name in (func, f'{module}.{func}'):
+                return module, func
+        raise KeyError(f"Unknown scheme {name!r}")
+
+    def render(self, name, dpi=None, fmt='png'):
+        """Files of one scheme as {name: bytes}, and whether they came from the cache"""
+        from render_cache import scheme_key
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format {fmt!r} (one of {', '.join(FORMATS)})")
+        module, func = self.resolve(name)
+        dpi = float(dpi or self.default_dpi)
+        key = (scheme_key(module, func, self.environment), dpi, fmt)
+        files = self.cache.get(key)
+        if files is not None:
+            return files, True
+        with self._lock:
+            future = self.running.get(key)
+            if future is None:
+                future = self.pool.submit(render_scheme, module, func, in_memory=True, dpi=dpi,
+                                          output_format=None if fmt == 'png' else fmt)
+                self.running[key] = future
+                self.renders += 1
+        try:
+            files = future.result()['files']
+        finally:
+            with self._lock:
+                self.running.pop(key, None)
+        self.cache.put(key, files)
+        return files, False
+
+    def stats(self):
+        return {
+            'uptime_seconds': round(time.time() - self.started, 1),
+            'renders': self.renders,
+            'cache_hits': self.cache.hits,
+            'cache_misses': self.cache.misses,
+            'cache_entries': len(self.cache.entries),
+            'cache_mb': round(self.cache.size / (1 << 20), 1),
+            'running': len(self.running)
+        }
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+def _write_to_sink(request, files):
+    """Store rendered files in a directory or archive sink and return their locations"""
+    from scheme_sinks import ArchiveSink, DirectorySink
+    if request['sink'] == 'directory':
+        import scheme_render
+        sink = DirectorySink(request.get('output_dir') or scheme_render.OUTPUT_DIR)
+    else:
+        sink = ArchiveSink(request['path'], request.get('archive_format'))
+    try:
+        return [sink.write(name, data) for name, data in files.items()]
+    finally:
+        sink.close()
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """One JSON request per line; each answered by a JSON header line and optional file bytes"""
+
+    def handle(self):
+        daemon = self.server.renderer
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            start = time.perf_counter()
+            payload = b''
+            try:
+                request = json.loads(line)
+                command = request.get('command', 'render')
+                if command == 'render':
+                    files, cached = daemon.render(request['scheme'], request.get('dpi'),
+                                                  request.get('format', 'png'))
+                    header = {'ok': True, 'cached': cached}
+                    request.setdefault('sink', 'memory')
+                    if request['sink'] == 'memory':
+                        header['files'] = [{'name': name, 'size': len(data)} for name, data in files.items()]
+                        payload = b''.join(files.values())
+                    elif request['sink'] in ('directory', 'archive'):
+                        header['paths'] = _write_to_sink(request, files)
+                    else:
+                        raise ValueError(f"Unknown sink {request['sink']!r}")
+                elif command == 'list':
+                    header = {'ok': True, 'schemes': [f'{m}.{f}' for m, f, _ in discover_schemes()]}
+                elif command == 'stats':
+                    header = {'ok': True, **daemon.stats()}
+                elif command == 'shutdown':
+                    header = {'ok': True}
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                else:
+                    raise ValueError(f"Unknown command {command!r}")
+            except Exception as exc:
+                header = {'ok': False, 'error': f'{type(exc).__name__}: {exc}'}
+            header['seconds'] = round(time.perf_counter() - start, 4)
+            self.wfile.write(json.dumps(header).encode('utf-8') + b'\n' + payload)
+            self.wfile.flush()
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def serve(path=None, jobs=None, cache_mb=CACHE_MB):
+    """Run the daemon until it receives a shutdown request or Ctrl+C"""
+    path = socket_path(path)
+    if os.path.exists(path):
+        try:
+            with socket.socket(socket.AF_UNIX) as probe:
+                probe.connect(path)
+            raise RuntimeError(f"A render daemon is already listening on {path}")
+        except ConnectionRefusedError:
+            # Left behind by a daemon that did not shut down cleanly
+            os.unlink(path)
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    daemon = RenderDaemon(jobs, cache_mb)
+    server = _Server(path, _RequestHandler)
+    server.renderer = daemon
+    print(f"Render daemon listening on {path} with {daemon.jobs} worker(s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        daemon.close()
+        if os.path.exists(path):
+            os.unlink(path)
+        print("Render daemon stopped")
+
+class Client:
+    """Connection to a running daemon; one request at a time"""
+
+    def __init__(self, path=None, timeout=None):
+        self.socket = socket.socket(socket.AF_UNIX)
+        self.socket.settimeout(timeout)
+        self.socket.connect(socket_path(path))
+        self.stream = self.socket.makefile('rwb')
+
+    def request(self, **request):
+        """Send a request and return (header, {name: bytes}); raises RuntimeError on failure"""
+        self.stream.write(json.dumps(request).encode('utf-8') + b'\n')
+        self.stream.flush()
+        line = self.stream.readline()
+        if not line:
+            raise ConnectionError("The render daemon closed the connection")
+        header = json.loads(line)
+        files = {item['name']: self.stream.read(item['size']) for item in header.get('files', [])}
+        if not header['ok']:
+            raise RuntimeError(header['error'])
+        return header, files
+
+    def render(self, scheme, dpi=None, format='png'):
+        """Render a scheme and return its files as {name: bytes}"""
+        return self.request(scheme=scheme, dpi=dpi, format=format)[1]
+
+    def close(self):
+        self.stream.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def main():
+    """Run the daemon or send it a request"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--socket', help=f'socket path (default: ${SOCKET_VARIABLE} or {DEFAULT_SOCKET})')
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_parser = commands.add_parser('serve', help='run the daemon in the foreground')
+    serve_parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                              help='render worker processes (default: CPU count)')
+    serve_parser.add_argument('--cache-mb', type=int, default=CACHE_MB,
+                              help=f'memory for cached renders (default: {CACHE_MB})')
+    render_parser = commands.add_parser('render', help='render one scheme through the daemon')
+    render_parser.add_argument('scheme', help='create_* function or module.function')
+    render_parser.add_argument('--dpi', type=float)
+    render_parser.add_argument('--format', default='png', choices=FORMATS)
+    render_parser.add_argument('-o', '--output',
+                               help='file to write (default: the scheme file name in the current folder)')
+    commands.add_parser('list', help='list the schemes the daemon can render')
+    commands.add_parser('stats', help='show render and cache counters')
+    commands.add_parser('stop', help='shut the daemon down')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args.socket, args.jobs, args.cache_mb)
+        return 0
+    with Client(args.socket) as client:
+        if args.command == 'render':
+            header, files = client.request(scheme=args.scheme, dpi=args.dpi, format=args.format)
+            for name, data in files.items():
+                path = args.output or os.path.basename(name)
+                with open(path, 'wb') as f:
+                    f.write(data)
+                print(f"{path}: {len(data)} bytes in {header['seconds']:.2f} s"
+                      + (' (cached)' if header['cached'] else ''))
+        elif args.command == 'list':
+            print('\n'.join(client.request(command='list')[0]['schemes']))
+        elif args.command == 'stats':
+            header, _ = client.request(command='stats')
+            for key in ('uptime_seconds', 'renders', 'cache_hits', 'cache_misses', 'cache_entries',
+                        'cache_mb', 'running'):
+                print(f"{key:<16s} {header[key]}")
+        else:
+            client.request(command='shutdown')
+            print("Render daemon stopping")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Overlap-free placement of point labels
+Fixed xytext offsets stack labels on top of each other as soon as points cluster. place_labels()
+tries a ring of candidate offsets around each point and keeps the first whose box hits neither
+a marker nor an earlier label. Placed boxes are kept in a uniform grid (a spatial hash), so each
+candidate ring is checked at once against only the boxes in the cells it covers, and hundreds
+of labels are placed in well under a second.
+
+Label sizes are estimated from the character count and font size instead of measured, which
+keeps placement renderer-free; call it once the axes limits and position are final.
+
+    place_labels(ax, costs, reliability, names, fontsize=8)
+"""
+
+import numpy as np
+
+# Directions tried around each point, in order of preference (upper right first)
+_DIRECTIONS = np.array([(1, 1), (1, -1), (-1, 1), (-1, -1), (1, 0), (-1, 0), (0, 1), (0, -1)], float)
+
+# Average glyph width and line height relative to the font size
+CHAR_WIDTH = 0.6
+LINE_HEIGHT = 1.2
+
+class GridIndex:
+    """Axis-aligned boxes (x0, y0, x1, y1) bucketed into square cells for overlap queries"""
+
+    def __init__(self, cell_size, capacity=64):
+        self.cell_size = float(cell_size)
+        self.cells = {}
+        self.boxes = np.empty((capacity, 4))
+        self.count = 0
+
+    def _cells(self, box):
+        i0, j0, i1, j1 = (int(np.floor(v / self.cell_size)) for v in box)
+        return ((i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1))
+
+    def insert(self, box):
+        if self.count == len(self.boxes):
+            self.boxes = np.concatenate([self.boxes, np.empty_like(self.boxes)])
+        self.boxes[self.count] = box
+        for cell in self._cells(box):
+            self.cells.setdefault(cell, []).append(self.count)
+        self.count += 1
+
+    def overlap(self, boxes):
+        """Area of the indexed boxes that each of boxes (N, 4) overlaps (0 where it is free)"""
+        boxes = np.atleast_2d(boxes)
+        extent = (*boxes[:, :2].min(axis=0), *boxes[:, 2:].max(axis=0))
+        hits = [self.cells.get(cell, ()) for cell in self._cells(extent)]
+        if not any(hits):
+            return np.zeros(len(boxes))
+        others = self.boxes[np.unique(np.concatenate([np.asarray(h, int) for h in hits]))]
+        w = np.minimum(boxes[:, None, 2], others[:, 2]) - np.maximum(boxes[:, None, 0], others[:, 0])
+        h = np.minimum(boxes[:, None, 3], others[:, 3]) - np.maximum(boxes[:, None, 1], others[:, 1])
+        return (np.clip(w, 0, None) * np.clip(h, 0, None)).sum(axis=1)
+
+def label_boxes(x, y, dx, dy, widths, heights):
+    """Boxes of labels of the given sizes offset by (dx, dy) from (x, y), aligned away from it"""
+    x0 = x + dx - widths * (dx < 0) - widths / 2 * (dx == 0)
+    y0 = y + dy - heights * (dy < 0) - heights / 2 * (dy == 0)
+    return np.stack([x0, y0, x0 + widths, y0 + heights], axis=-1)
+
+def place_labels(ax, x, y, labels, fontsize=8, marker_size=6, offset=4, rings=3, drop_unplaced=False,
+                 **kwargs):
+    """Annotate the data points (x, y) with labels so that no two labels overlap where possible
+
+    marker_size is the marker diameter in points (markers are obstacles too) and offset the gap
+    between point and label in points; candidates are tried on rings at 1 to rings times it.
+    Labels that fit nowhere go to the candidate with the least overlap, or are left out with
+    drop_unplaced (for dense plots). Remaining keyword arguments are passed to annotate().
+    Returns the annotations.
+    """
+    fig = ax.figure
+    # Resolve pending autoscaling so transData maps to the final limits
+    ax.get_xlim(), ax.get_ylim()
+    points = ax.transData.transform(np.column_stack([np.ravel(x), np.ravel(y)]).astype(float))
+    pt = fig.dpi / 72
+    labels = [str(label) for label in labels]
+    lines = np.array([label.count('\n') + 1 for label in labels], float)
+    chars = np.array([max(map(len, label.split('\n'))) for label in labels], float)
+    widths = chars * CHAR_WIDTH * fontsize * pt
+    heights = lines * LINE_HEIGHT * fontsize * pt
+
+    index = GridIndex(max(np.median(widths) if len(widths) else 1.0, 1.0))
+    half = np.broadcast_to(np.asarray(marker_size, float) * pt / 2, (len(points),))
+    for (px, py), r in zip(points, half):
+        index.insert((px - r, py - r, px + r, py + r))
+    axes_box = ax.get_window_extent().extents
+
+    annotations = []
+    data_points = zip(np.ravel(x), np.ravel(y))
+    for (px, py), xy, r, label, w, h in zip(points, data_points, half, labels, widths, heights):
+        gaps = (r + offset * pt) * np.arange(1, rings + 1)[:, None, None] * _DIRECTIONS
+        dx, dy = gaps.reshape(-1, 2).T
+        boxes = label_boxes(px, py, dx, dy, w, h)
+        inside = (boxes[:, 0] >= axes_box[0]) & (boxes[:, 1] >= axes_box[1]) & \
+                 (boxes[:, 2] <= axes_box[2]) & (boxes[:, 3] <= axes_box[3])
+        cost = index.overlap(boxes)
+        # Candidates inside the axes first, in order of preference
+        cost[~inside] += np.inf if inside.any() else 0
+        best = int(np.argmin(cost))
+        if cost[best] > 0 and drop_unplaced:
+            continue
+        index.insert(boxes[best])
+        ha = 'left' if dx[best] > 0 else 'right' if dx[best] < 0 else 'center'
+        va = 'bottom' if dy[best] > 0 else 'top' if dy[best] < 0 else 'center'
+        annotations.append(ax.annotate(label, xy,
+                                       xytext=(dx[best] / pt, dy[best] / pt), textcoords='offset points',
+                                       ha=ha, va=va, fontsize=fontsize, **kwargs))
+    return annotations
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Static-layer caching for schemes with a few data-driven panels
+The chrome of a figure (titles, boxes, workflow diagrams, legends, footers) is rendered once per
+dpi and cached as a bitmap, together with the axes layout and the tight bounding box. Later
+renders draw only the dynamic axes onto a transparent canvas and composite them over the cached
+bitmap, so a data refresh skips tight_layout, the tight bounding-box pass and the drawing of every
+static text artist.
+
+The cache key is the render_cache key of the function that draws the static layer, the grid
+slot of every axes (grid shape, span and position, as set up before the layout runs), the
+figure size, the dpi and the savefig parameters. The code and data of the dynamic panels are
+not part of it, so a data refresh reuses the layer; panel data therefore belongs in a file the
+builder declares in SCHEME_INPUTS, not in the builder's module. The layout is cached by
+scheme_layout under the same key; a restored layout is frozen: the axes keep the positions
+computed by the render that filled the cache.
+
+    fig = plt.figure(figsize=(20, 16))
+    draw_chrome(fig)
+    ax = fig.add_subplot(2, 1, 2)
+    draw_data(ax)
+    static_layer(fig, [ax], draw_chrome).tight_layout()
+    return fig    # save_scheme() composites the data panel over the cached chrome
+
+Cached layers are kept in SCHEME_LAYER_CACHE (default: .scheme_layers next to the scripts), the
+least recently used ones removed beyond MAX_CACHE_MB, and layouts in SCHEME_LAYOUT_CACHE
+(default: .scheme_layout); delete the latter to re-layout.
+"""
+
+import contextlib
+import hashlib
+import inspect
+import json
+import os
+import zlib
+from collections import OrderedDict
+
+from scheme_layout import FigureLayout, atomic_write, environment
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+LAYER_CACHE_DIR = os.environ.get('SCHEME_LAYER_CACHE') or os.path.join(SOURCE_DIR, '.scheme_layers')
+
+# Bitmaps also kept in memory, for processes that render the same figure repeatedly
+MEMORY_ENTRIES = 4
+
+# Size of the bitmap cache folder beyond which the least recently used layers are removed
+MAX_CACHE_MB = 512
+
+# zlib level of the cached bitmaps, stored as raw RGBA (decompresses twice as fast as PNG)
+BITMAP_COMPRESS_LEVEL = 1
+
+_memory = OrderedDict()
+
+def _sha256(data):
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+def grid_slots(fig):
+    """Grid shape, span and position of every axes: what the layout places them by, not their content"""
+    slots = []
+    for ax in fig.axes:
+        spec = ax.get_subplotspec()
+        if spec is None:
+            slots.append([round(float(value), 6) for value in ax.get_position(original=True).bounds])
+            continue
+        grid = spec.get_gridspec()
+        slots.append([int(grid.nrows), int(grid.ncols), int(spec.num1), int(spec.num2)] +
+                     [round(float(value), 6) for value in spec.get_position(fig).bounds])
+    return slots
+
+def prune(max_mb=MAX_CACHE_MB):
+    """Remove the least recently used layers until the cache folder is below max_mb"""
+    try:
+        names = os.listdir(LAYER_CACHE_DIR)
+    except FileNotFoundError:
+        return
+    layers = []
+    for name in names:
+        if not name.endswith('.json'):
+            continue
+        path = os.path.join(LAYER_CACHE_DIR, name[:-len('.json')])
+        try:
+            size = os.path.getsize(f'{path}.json') + os.path.getsize(f'{path}.rgba.z')
+            layers.append((os.path.getmtime(f'{path}.json'), size, path))
+        except OSError:
+            continue
+    total = sum(size for _, size, _ in layers)
+    for _, size, path in sorted(layers):
+        if total <= max_mb * (1 << 20):
+            break
+        # The metadata goes first, so a concurrent render never sees a layer without its bitmap
+        for suffix in ('.json', '.rgba.z'):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(f'{path}{suffix}')
+        total -= size
+
+class StaticLayer:
+    """Cached static layer of one figure; dynamic_axes are redrawn on every render"""
+
+    def __init__(self, fig, dynamic_axes, builder):
+        from render_cache import scheme_key
+        self.fig = fig
+        self.dynamic = list(dynamic_axes)
+        module = os.path.splitext(os.path.basename(inspect.getsourcefile(builder)))[0]
+        self.key = _sha256(json.dumps({
+            'builder': scheme_key(module, builder.__name__, environment()),
+            'grid': grid_slots(fig),
+            'figsize': [float(size) for size in fig.get_size_inches()],
+            'axes': len(fig.axes),
+            'dynamic': [fig.axes.index(ax) for ax in self.dynamic]
+        }, sort_keys=True))
+        self.layout = FigureLayout(fig, module, builder.__name__, inputs=self.key)
+        self.restored = False
+
+    def tight_layout(self, **kwargs):
+        """Restore the cached axes positions (scheme_layout), or run tight_layout and cache them"""
+        self.layout.tight_layout(**kwargs)
+        self.restored = self.layout.restored
+
+    @contextlib.contextmanager
+    def _hidden(self, artists):
+        """Temporarily hide artists"""
+        visible = [(artist, artist.get_visible()) for artist in artists]
+        for artist, _ in visible:
+            artist.set_visible(False)
+        try:
+            yield
+        finally:
+            for artist, state in visible:
+                artist.set_visible(state)
+
+    def _load(self, layer_key):
+        """(bbox bounds, RGBA bitmap) of a cached static layer, or None"""
+        import numpy as np
+        if layer_key in _memory:
+            _memory.move_to_end(layer_key)
+            return _memory[layer_key]
+        path = os.path.join(LAYER_CACHE_DIR, layer_key)
+        try:
+            with open(f'{path}.json', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(f'{path}.rgba.z', 'rb') as f:
+                bitmap = np.frombuffer(zlib.decompress(f.read()), np.uint8).reshape(meta['shape'])
+        except (FileNotFoundError, ValueError, KeyError, zlib.error):
+            return None
+        # Marks the layer as recently used for prune()
+        with contextlib.suppress(OSError):
+            os.utime(f'{path}.json')
+        self._remember(layer_key, (meta['bbox'], bitmap))
+        return meta['bbox'], bitmap
+
+    def _store(self, layer_key, bounds, bitmap):
+        path = os.path.join(LAYER_CACHE_DIR, layer_key)
+
+        def write_bitmap(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                f.write(zlib.compress(bitmap.tobytes(), BITMAP_COMPRESS_LEVEL))
+
+        def write_meta(tmp_path):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'bbox': bounds, 'shape': list(bitmap.shape)}, f)
+        # The bitmap goes first: a layer is only used once its metadata exists
+        atomic_write(f'{path}.rgba.z', write_bitmap)
+        atomic_write(f'{path}.json', write_meta)
+        self._remember(layer_key, (bounds, bitmap))
+        prune()
+
+    def _remember(self, layer_key, entry):
+        _memory[layer_key] = entry
+        while len(_memory) > MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+
+    def rasterize(self, dpi, params):
+        """Composite RGBA raster at dpi and the bbox it covers, as savefig(**params) would draw it"""
+        import numpy as np
+        from matplotlib.transforms import Bbox
+        from PIL import Image
+        from scheme_render import rasterize
+
+        params = dict(params)
+        pad_inches = params.pop('pad_inches', None)
+        layer_key = _sha256(json.dumps({
+            'layer': self.key,
+            'dpi': float(dpi),
+            'savefig': {k: str(v) for k, v in sorted(params.items())},
+            'pad_inches': pad_inches
+        }, sort_keys=True))
+        # Bitmaps are only trusted with the layout they were drawn with; a freshly computed
+        # layout replaces them
+        cached = self._load(layer_key) if self.restored else None
+        if cached is None:
+            bbox = params.get('bbox_inches')
+            if bbox == 'tight':
+                bbox = self.layout.tight_bbox(dpi, pad_inches)
+            with self._hidden(self.dynamic):
+                bitmap = rasterize(self.fig, dpi, **dict(params, bbox_inches=bbox))
+            bounds = list(bbox.bounds) if bbox is not None else None
+            self._store(layer_key, bounds, bitmap)
+        else:
+            bounds, bitmap = cached
+        bbox = Bbox.from_bounds(*bounds) if bounds is not None else None
+
+        # Everything but the dynamic axes is hidden, on a transparent background
+        static = [artist for artist in self.fig.get_children() if artist not in self.dynamic]
+        with self._hidden(static):
+            overlay = rasterize(self.fig, dpi, **dict(params, bbox_inches=bbox, facecolor='none',
+                                                      edgecolor='none'))
+        composite = bitmap.copy()
+        # Only the rows and columns the dynamic axes drew on need blending
+        rows = np.flatnonzero(overlay[:, :, 3].any(axis=1))
+        if len(rows):
+            cols = np.flatnonzero(overlay[rows[0]:rows[-1] + 1, :, 3].any(axis=0))
+            region = np.s_[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+            composite[region] = Image.alpha_composite(Image.fromarray(bitmap[region], 'RGBA'),
+                                                      Image.fromarray(overlay[region], 'RGBA'))
+        return composite, bbox
+
+def static_layer(fig, dynamic_axes, builder):
+    """Render fig through a cached static layer drawn by builder; returns the StaticLayer"""
+    import scheme_render
+    layer = StaticLayer(fig, dynamic_axes, builder)
+    scheme_render.LAYERED_FIGURES[fig] = layer
+    return layer
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Layout cache for the scheme builders
+plt.tight_layout() measures every axes' text before placing it, and savefig(bbox_inches='tight')
+draws the whole figure once more just to measure its extent before drawing it for real. Both
+results depend only on what the builder draws, so they are cached per builder: the axes
+positions under the builder's render-cache key (its source, module-level setup, helper modules
+and declared CSV inputs), figure size and dpi, and the tight bounding box per output dpi and
+padding. A repeat render restores the positions, passes the cached box to savefig and draws
+the figure once.
+
+    fig, ax = plt.subplots(figsize=(20, 16))
+    ...
+    tight_layout(fig)    # instead of plt.tight_layout()
+    save_scheme(fig, 'Scheme.png')
+
+Layouts are kept in SCHEME_LAYOUT_CACHE (default: .scheme_layout next to the scripts), at most
+MAX_ENTRIES of them: the least recently used are removed beyond that. Editing a builder, anything
+it depends on or one of its declared inputs gives it a new key, so the cache only speeds up
+re-renders of unchanged builders (repeat runs, --force, watch/daemon renders, export variants);
+a data refresh lays the figure out again. Static layers (scheme_layers) key their layout on the
+chrome code and grid instead, through FigureLayout's inputs argument.
+"""
+
+import json
+import os
+import sys
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+LAYOUT_CACHE_DIR = os.environ.get('SCHEME_LAYOUT_CACHE') or os.path.join(SOURCE_DIR, '.scheme_layout')
+
+# Layouts kept on disk; the least recently used ones beyond this are removed
+MAX_ENTRIES = 500
+
+_environment = None
+
+def environment():
+    """render_cache environment fingerprint (matplotlib, FreeType, fonts), computed once per process"""
+    global _environment
+    if _environment is None:
+        from render_cache import environment_fingerprint
+        _environment = environment_fingerprint({})
+    return _environment
+
+def atomic_write(path, write):
+    """Write a cache file via a temporary name so concurrent renders never read a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+class FigureLayout:
+    """Cached tight_layout positions and tight bounding boxes of the figure one builder draws"""
+
+    def __init__(self, fig, module, func_name, inputs=None):
+        """inputs, if given, identify the layout instead of the builder's render-cache key"""
+        import hashlib
+        from render_cache import scheme_key
+        self.fig = fig
+        self.key = hashlib.sha256(json.dumps({
+            'builder': inputs if inputs is not None else scheme_key(module, func_name, environment()),
+            'figsize': [float(size) for size in fig.get_size_inches()],
+            'dpi': float(fig.dpi),
+            'axes': len(fig.axes)
+        }, sort_keys=True).encode('utf-8')).hexdigest()
+        self.path = os.path.join(LAYOUT_CACHE_DIR, f'{self.key}.json')
+        self.restored = False
+        self.bboxes = {}
+
+    def tight_layout(self, **kwargs):
+        """Restore the cached axes positions, or run tight_layout and cache them"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                cached = json.load(f)
+            positions = cached['positions']
+        except (FileNotFoundError, ValueError, KeyError):
+            positions = None
+        if positions is not None and len(positions) == len(self.fig.axes):
+            for ax, position in zip(self.fig.axes, positions):
+                ax.set_position(position)
+            # Marks the layout as recently used for prune()
+            try:
+                os.utime(self.path)
+            except OSError:
+                pass
+            self.restored = True
+            self.bboxes = cached.get('bboxes', {})
+            return
+        self.fig.tight_layout(**kwargs)
+        self._save()
+
+    def tight_bbox(self, dpi, pad_inches=None):
+        """Padded tight bounding box at dpi: cached with a restored layout, else measured and cached"""
+        import matplotlib
+        from matplotlib.transforms import Bbox
+        from scheme_render import tight_bbox
+        if pad_inches is None:
+            pad_inches = matplotlib.rcParams['savefig.pad_inches']
+        name = f'{float(dpi)}/{float(pad_inches)}'
+        if name not in self.bboxes:
+            self.bboxes[name] = list(tight_bbox(self.fig, dpi, pad_inches).bounds)
+            self._save()
+        return Bbox.from_bounds(*self.bboxes[name])
+
+    def _save(self):
+        positions = [list(ax.get_position().bounds) for ax in self.fig.axes]
+
+        def write(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'positions': positions, 'bboxes': self.bboxes}, f)
+        atomic_write(self.path, write)
+        prune()
+
+def prune(max_entries=MAX_ENTRIES):
+    """Remove the least recently used layouts beyond max_entries"""
+    try:
+        names = [name for name in os.listdir(LAYOUT_CACHE_DIR) if name.endswith('.json')]
+    except FileNotFoundError:
+        return
+    if len(names) <= max_entries:
+        return
+    layouts = []
+    for name in names:
+        path = os.path.join(LAYOUT_CACHE_DIR, name)
+        try:
+            layouts.append((os.path.getmtime(path), path))
+        except OSError:
+            continue
+    for _, path in sorted(layouts)[:len(layouts) - max_entries]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def figure_layout(fig, module, func_name):
+    """FigureLayout of fig as drawn by module.func_name, registered for save_scheme"""
+    import scheme_render
+    layout = FigureLayout(fig, module, func_name)
+    scheme_render.LAID_OUT_FIGURES[fig] = layout
+    return layout
+
+def calling_builder():
+    """(module, function) of the nearest create_* function of this folder on the call stack"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        code = frame.f_code
+        if code.co_name.startswith('create_') and \
+                os.path.dirname(os.path.abspath(code.co_filename)) == SOURCE_DIR:
+            return os.path.splitext(os.path.basename(code.co_filename))[0], code.co_name
+        frame = frame.f_back
+    return None
+
+def tight_layout(fig=None, **kwargs):
+    """plt.tight_layout() through the layout cache of the create_* function being run
+
+    Outside a builder (e.g. called from main()) it is plain fig.tight_layout().
+    """
+    import scheme_render
+    fig = fig or scheme_render.plt.gcf()
+    builder = calling_builder()
+    if builder is None:
+        fig.tight_layout(**kwargs)
+        return None
+    layout = figure_layout(fig, *builder)
+    layout.tight_layout(**kwargs)
+    return layout
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Opt-in stage profiling for the scheme generators
+Times the phases every builder shares, per figure: plt.subplots/plt.figure, artist building,
+plt.tight_layout, savefig (split into its draw passes and PNG encoding; bbox_inches='tight'
+adds a layout draw before the real one) and plt.close. Optionally writes a cProfile and a
+tracemalloc dump per figure.
+
+Enable it for any script or the parallel driver with an environment variable:
+    SCHEME_PROFILE=1                       timings only
+    SCHEME_PROFILE=cprofile,tracemalloc    timings plus <figure>.prof and <figure>.tracemalloc
+    SCHEME_PROFILE_DIR=folder              where timings.jsonl and the dumps go (default: scheme_profiles)
+or from Python:
+    with profile_schemes(cprofile=True) as records:
+        create_risk_assessment_scheme()
+"""
+
+import contextlib
+import functools
+import json
+import os
+import time
+import weakref
+
+PROFILE_VARIABLE = 'SCHEME_PROFILE'
+PROFILE_DIR_VARIABLE = 'SCHEME_PROFILE_DIR'
+DEFAULT_PROFILE_DIR = 'scheme_profiles'
+
+# Frames kept per tracemalloc allocation
+TRACEMALLOC_FRAMES = 10
+
+def _text_metric_counts():
+    """(hits, misses) of the shared text-metrics cache so far"""
+    from scheme_text import cache
+    return cache.hits, cache.misses
+
+class FigureProfile:
+    """Stage timings and optional profilers for one figure, from creation to plt.close
+
+    Only one cProfile/tracemalloc session can run at a time, so a figure created while another
+    one is still open (nested=True) gets timings only.
+    """
+
+    def __init__(self, number, options, nested=False):
+        self.name = f'figure{number}'
+        self.options = dict(options)
+        if nested:
+            self.options.update(cprofile=False, tracemalloc=False)
+        self.seconds = {'subplots': 0.0, 'build': 0.0, 'tight_layout': 0.0, 'savefig': 0.0, 'close': 0.0}
+        self.draws = []
+        self.text_metrics = _text_metric_counts()
+        self.peak_traced_mb = None
+        self.created = self.built = None
+        self.profiler = None
+        if self.options['cprofile']:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        if self.options['tracemalloc']:
+            import tracemalloc
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            tracemalloc.reset_peak()
+
+    def end_build(self):
+        """Close the artist-building stage (at the first tight_layout, savefig or close)"""
+        if self.built is None and self.created is not None:
+            self.built = time.perf_counter()
+            self.seconds['build'] = self.built - self.created
+
+    def finish(self):
+        """Stop the profilers, write their dumps and return the timing record"""
+        output_dir = self.options['output_dir']
+        if self.profiler is not None:
+            self.profiler.disable()
+            os.makedirs(output_dir, exist_ok=True)
+            self.profiler.dump_stats(os.path.join(output_dir, f'{self.name}.prof'))
+        if self.options['tracemalloc']:
+            import tracemalloc
+            snapshot = tracemalloc.take_snapshot()
+            self.peak_traced_mb = tracemalloc.get_traced_memory()[1] / (1 << 20)
+            tracemalloc.stop()
+            os.makedirs(output_dir, exist_ok=True)
+            snapshot.dump(os.path.join(output_dir, f'{self.name}.tracemalloc'))
+
+        record = {'figure': self.name, 'seconds': dict(self.seconds), 'draws': list(self.draws)}
+        hits, misses = _text_metric_counts()
+        record['text_metrics'] = {'hits': hits - self.text_metrics[0], 'misses': misses - self.text_metrics[1]}
+        # Whatever savefig did besides drawing is PNG encoding (and file writing)
+        record['seconds']['encode'] = max(0.0, self.seconds['savefig'] - sum(self.draws))
+        record['seconds']['total'] = sum(self.seconds.values())
+        if self.peak_traced_mb is not None:
+            record['peak_traced_mb'] = self.peak_traced_mb
+        return record
+
+class _Profiler:
+    """Installs timing wrappers around pyplot and Figure methods and collects FigureProfiles"""
+
+    def __init__(self, cprofile=False, tracemalloc=False, output_dir=None, write_timings=False):
+        self.options = {'cprofile': cprofile, 'tracemalloc': tracemalloc,
+                        'output_dir': output_dir or DEFAULT_PROFILE_DIR}
+        self.write_timings = write_timings or cprofile or tracemalloc
+        self.figures = weakref.WeakKeyDictionary()
+        self.records = []
+        self.saving = None
+        self.creating = False
+        self.count = 0
+        self.originals = []
+
+    def _patch(self, owner, name, make_wrapper):
+        original = getattr(owner, name)
+        self.originals.append((owner, name, original))
+        setattr(owner, name, functools.wraps(original)(make_wrapper(original)))
+
+    def install(self):
+        import matplotlib.pyplot as plt
+        from matplotlib.figure import Figure
+        profiler = self
+
+        def creating(original):
+            def wrapper(*args, **kwargs):
+                # plt.subplots calls plt.figure; only the outer call starts a profile
+                if profiler.creating:
+                    return original(*args, **kwargs)
+                profiler.creating = True
+                profiler.count += 1
+                profile = FigureProfile(profiler.count, profiler.options, nested=len(profiler.figures) > 0)
+                start = time.perf_counter()
+                try:
+                    result = original(*args, **kwargs)
+                finally:
+                    profiler.creating = False
+                profile.created = time.perf_counter()
+                profile.seconds['subplots'] = profile.created - start
+                fig = result[0] if isinstance(result, tuple) else result
+                profiler.figures[fig] = profile
+                return result
+            return wrapper
+
+        def tight_layout(original):
+            def wrapper(fig, *args, **kwargs):
+                profile = profiler.figures.get(fig)
+                if profile is None:
+                    return original(fig, *args, **kwargs)
+                profile.end_build()
+                start = time.perf_counter()
+                try:
+                    return original(fig, *args, **kwargs)
+                finally:
+                    profile.seconds['tight_layout'] += time.perf_counter() - start
+            return wrapper
+
+        def savefig(original):
+            def wrapper(fig, fname, *args, **kwargs):
+                profile = profiler.figures.get(fig)
+                if profile is None:
+                    return original(fig, fname, *args, **kwargs)
+                profile.end_build()
+                # Output sinks hand savefig a file object named after the scheme
+                name = getattr(fname, 'name', fname)
+                if isinstance(name, (str, os.PathLike)):
+                    profile.name = os.path.splitext(os.path.basename(name))[0]
+                profiler.saving = profile
+                start = time.perf_counter()
+                try:
+                    return original(fig, fname, *args, **kwargs)
+                finally:
+                    profile.seconds['savefig'] += time.perf_counter() - start
+                    profiler.saving = None
+            return wrapper
+
+        def draw(original):
+            def wrapper(fig, renderer, *args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return original(fig, renderer, *args, **kwargs)
+                finally:
+                    if profiler.saving is not None and profiler.figures.get(fig) is profiler.saving:
+                        profiler.saving.draws.append(time.perf_counter() - start)
+            return wrapper
+
+        def close(original):
+            def wrapper(fig=None):
+                target = plt.gcf() if fig is None else fig
+                profile = profiler.figures.pop(target, None) if hasattr(target, 'savefig') else None
+                start = time.perf_counter()
+                try:
+                    return original(fig)
+                finally:
+                    if profile is not None:
+                        profile.end_build()
+                        profile.seconds['close'] = time.perf_counter() - start
+                        profiler.report(profile.finish())
+            return wrapper
+
+        self._patch(plt, 'figure', creating)
+        self._patch(plt, 'subplots', creating)
+        # plt.tight_layout() and scheme_layout both end in Figure.tight_layout (not called at all
+        # when the layout comes from the cache)
+        self._patch(Figure, 'tight_layout', tight_layout)
+        self._patch(plt, 'close', close)
+        self._patch(Figure, 'savefig', savefig)
+        self._patch(Figure, 'draw', draw)
+        return self
+
+    def uninstall(self):
+        for owner, name, original in reversed(self.originals):
+            setattr(owner, name, original)
+        self.originals = []
+
+    def report(self, record):
+        """Print a figure's timings and append them to timings.jsonl when dumps are enabled"""
+        self.records.append(record)
+        s = record['seconds']
+        draws = ', '.join(f'{d:.2f}' for d in record['draws'])
+        line = (f"Profile {record['figure']}: subplots {s['subplots']:.2f} s | build {s['build']:.2f} s | "
+                f"tight_layout {s['tight_layout']:.2f} s | savefig {s['savefig']:.2f} s "
+                f"(draws {draws or '-'} s, encode {s['encode']:.2f} s) | close {s['close']:.2f} s | "
+                f"total {s['total']:.2f} s | text metrics {record['text_metrics']['hits']} hits, "
+                f"{record['text_metrics']['misses']} misses")
+        if 'peak_traced_mb' in record:
+            line += f" | peak traced {record['peak_traced_mb']:.0f} MB"
+        print(line)
+        if self.write_timings:
+            output_dir = self.options['output_dir']
+            os.makedirs(output_dir, exist_ok=True)
+            with open(os.path.join(output_dir, 'timings.jsonl'), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(dict(record, pid=os.getpid())) + '\n')
+
+def parse_options(value):
+    """Profiler options from a SCHEME_PROFILE value such as '1' or 'cprofile,tracemalloc'"""
+    modes = {mode.strip().lower() for mode in value.split(',') if mode.strip()}
+    unknown = modes - {'1', 'true', 'yes', 'on', 'timings', 'cprofile', 'tracemalloc'}
+    if unknown:
+        raise ValueError(f"Unknown {PROFILE_VARIABLE} mode(s): {', '.join(sorted(unknown))}")
+    return {'cprofile': 'cprofile' in modes, 'tracemalloc': 'tracemalloc' in modes}
+
+_env_profiler = None
+
+def install_from_env():
+    """Install the profiler when SCHEME_PROFILE is set (called by scheme_bootstrap)"""
+    global _env_profiler
+    value = os.environ.get(PROFILE_VARIABLE, '')
+    if _env_profiler is not None or value.strip().lower() in ('', '0', 'false', 'no', 'off'):
+        return _env_profiler
+    output_dir = os.environ.get(PROFILE_DIR_VARIABLE)
+    _env_profiler = _Profiler(output_dir=output_dir, write_timings=bool(output_dir),
+                              **parse_options(value)).install()
+    return _env_profiler
+
+@contextlib.contextmanager
+def profile_schemes(cprofile=False, tracemalloc=False, output_dir=None):
+    """Profile every figure created inside the block; yields the list of timing records"""
+    profiler = _Profiler(cprofile=cprofile, tracemalloc=tracemalloc, output_dir=output_dir,
+                         write_timings=output_dir is not None).install()
+    try:
+        yield profiler.records
+    finally:
+        profiler.uninstall()
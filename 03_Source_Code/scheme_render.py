@@ -0,0 +1,267 @@
+import contextlib
+import io
+import os
+import weakref
+from scheme_bootstrap import lazy_import
+
+plt = lazy_import('matplotlib.pyplot')
+
+# Root folder the schemes are written to (the repository root unless SCHEME_OUTPUT_DIR is set)
+OUTPUT_DIR = os.environ.get('SCHEME_OUTPUT_DIR') or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Sink the files are written through (see scheme_sinks); None writes below OUTPUT_DIR
+OUTPUT_SINK = None
+SAVEFIG_DEFAULTS = {'dpi': 300, 'bbox_inches': 'tight', 'facecolor': 'white'}
+
+# Extra PNG sizes derived from the full-resolution raster, suffix -> dpi,
+# e.g. {'web': 100, 'thumb': 30} writes Scheme_web.png and Scheme_thumb.png next to Scheme.png
+EXPORT_VARIANTS = {}
+
+# Vector formats written from the same figure next to the PNG, e.g. ['svg', 'pdf']
+VECTOR_FORMATS = []
+
+# Format written instead of the one in the file name (e.g. 'svg' or 'pdf'); None keeps the PNG
+OUTPUT_FORMAT = None
+
+# PNG encoding: zlib compress_level (0-9), pixel mode ('RGBA' as rendered, 'RGB' drops the alpha
+# channel of opaque figures, 'P' quantizes to an adaptive 256-colour palette), background
+# (encode on a worker thread while the next figure is built; see wait_for_exports), tile_mb
+# (render in horizontal strips streamed to the file, holding about this many MB of pixels at
+# once; see scheme_tiles) and poster (paper size 'A0'-'A4' the PNG is scaled to fill at
+# scheme_tiles.POSTER_PRINT_DPI, rendered in strips)
+PNG_DEFAULTS = {'compress_level': 6, 'mode': 'RGBA', 'background': False, 'tile_mb': None, 'poster': None}
+PNG_OPTIONS = dict(PNG_DEFAULTS)
+
+# Background encodes allowed to queue up before save_scheme waits (each holds a full raster)
+MAX_PENDING_ENCODES = 2
+
+# Figures drawn over a cached static layer (scheme_layers.static_layer), figure -> StaticLayer
+LAYERED_FIGURES = weakref.WeakKeyDictionary()
+
+# Figures laid out through the layout cache (scheme_layout.tight_layout), figure -> FigureLayout
+LAID_OUT_FIGURES = weakref.WeakKeyDictionary()
+
+saved_paths = []
+_encoder = None
+_pending_encodes = []
+
+def tight_bbox(fig, dpi, pad_inches=None):
+    """Padded tight bounding box (inches) of a figure laid out at dpi, as savefig computes it"""
+    import matplotlib
+    if pad_inches is None:
+        pad_inches = matplotlib.rcParams['savefig.pad_inches']
+    from matplotlib.backends.backend_agg import RendererAgg
+    original_dpi = fig.dpi
+    fig.dpi = dpi
+    try:
+        # Text metrics only depend on the dpi, so a 1x1 canvas gives the same box without
+        # allocating a full-size pixel buffer
+        renderer = RendererAgg(1, 1, dpi)
+        with renderer._draw_disabled():
+            fig.draw(renderer)
+        bbox = fig.get_tightbbox(renderer)
+    finally:
+        fig.dpi = original_dpi
+    return bbox.padded(pad_inches)
+
+def layout_bbox(fig, dpi, pad_inches=None):
+    """tight_bbox, taken from the figure's layout cache when it was laid out through scheme_layout"""
+    layout = LAID_OUT_FIGURES.get(fig)
+    if layout is None:
+        return tight_bbox(fig, dpi, pad_inches)
+    return layout.tight_bbox(dpi, pad_inches)
+
+@contextlib.contextmanager
+def single_draw(fig):
+    """Let savefig draw a laid-out figure once
+
+    plt.tight_layout() leaves a placeholder layout engine behind, and any layout engine makes
+    savefig draw the whole figure once more before the real draw. The placeholder does nothing,
+    so it is dropped while saving.
+    """
+    from matplotlib import cbook
+    from matplotlib.layout_engine import PlaceHolderLayoutEngine
+    if not isinstance(fig.get_layout_engine(), PlaceHolderLayoutEngine):
+        yield
+        return
+    with cbook._setattr_cm(fig, _layout_engine=None):
+        yield
+
+class _RasterCapture(io.BytesIO):
+    """File object for savefig(format='rgba') that keeps the canvas buffer with its shape"""
+    pixels = None
+
+    def write(self, data):
+        import numpy as np
+        # Agg hands over its (height, width, 4) buffer; the canvas size is Agg's own rounding
+        # of the bounding box, so it is taken from there instead of recomputed
+        self.pixels = np.array(data, np.uint8, copy=True)
+        return self.pixels.nbytes
+
+def rasterize(fig, dpi, **savefig_kwargs):
+    """Render a figure once and return it as an (height, width, 4) uint8 RGBA array"""
+    capture = _RasterCapture()
+    with single_draw(fig):
+        fig.savefig(capture, format='rgba', dpi=dpi, **savefig_kwargs)
+    if capture.pixels is None or capture.pixels.ndim != 3:
+        raise RuntimeError("savefig did not hand over an RGBA canvas buffer")
+    return capture.pixels
+
+def render_raster(fig, dpi, params):
+    """Raster a figure as savefig(**params) draws it; returns the RGBA array and params with the
+    bounding box resolved (through the figure's cached static layer when it has one)"""
+    params = dict(params)
+    layer = LAYERED_FIGURES.get(fig)
+    if layer is not None:
+        rgba, params['bbox_inches'] = layer.rasterize(dpi, params)
+        params.pop('pad_inches', None)
+        return rgba, params
+    if params.get('bbox_inches') == 'tight':
+        params['bbox_inches'] = layout_bbox(fig, dpi, params.pop('pad_inches', None))
+    return rasterize(fig, dpi, **params), params
+
+def downsample(image, size):
+    """Shrink a PIL image to size: area-averaging by the integer factor, then Lanczos for the rest"""
+    from PIL import Image
+    factor = min(image.width // size[0], image.height // size[1])
+    if factor >= 2:
+        image = image.reduce(factor)
+    if image.size != size:
+        image = image.resize(size, Image.Resampling.LANCZOS)
+    return image
+
+def encode_png(pixels, path, dpi, mode=None, compress_level=None):
+    """Write an RGBA raster (array or PIL image) as PNG using PNG_OPTIONS unless overridden"""
+    import matplotlib
+    from PIL import Image, PngImagePlugin
+    mode = mode or PNG_OPTIONS['mode']
+    compress_level = PNG_OPTIONS['compress_level'] if compress_level is None else compress_level
+    image = pixels if isinstance(pixels, Image.Image) else Image.fromarray(pixels, 'RGBA')
+    # Figures with transparent areas keep their alpha channel
+    if mode in ('RGB', 'P') and image.getextrema()[3][0] == 255:
+        image = image.convert('RGB')
+        if mode == 'P':
+            image = image.quantize(256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    # Same metadata as matplotlib's own PNG writer
+    info = PngImagePlugin.PngInfo()
+    info.add_text('Software', f"Matplotlib version{matplotlib.__version__}, https://matplotlib.org/")
+    image.save(path, format='png', pnginfo=info, dpi=(dpi, dpi), compress_level=compress_level)
+
+def output_sink():
+    """The sink save_scheme writes to: OUTPUT_SINK, or a DirectorySink on OUTPUT_DIR"""
+    if OUTPUT_SINK is not None:
+        return OUTPUT_SINK
+    from scheme_sinks import DirectorySink
+    return DirectorySink(OUTPUT_DIR)
+
+def _write_pngs(rgba, outputs, sink):
+    """Encode a raster and its downsampled sizes; outputs are (name, scale, dpi), largest first"""
+    from PIL import Image
+    pixels = Image.fromarray(rgba, 'RGBA')
+    for name, scale, dpi in outputs:
+        size = (max(1, round(rgba.shape[1] * scale)), max(1, round(rgba.shape[0] * scale)))
+        if pixels.size != size:
+            pixels = downsample(pixels, size)
+        with sink.open(name) as f:
+            encode_png(pixels, f, dpi)
+
+def _submit_encode(function, *args):
+    """Run an encode now, or on the background thread when PNG_OPTIONS['background'] is set"""
+    global _encoder
+    if not PNG_OPTIONS['background']:
+        function(*args)
+        return
+    if _encoder is None:
+        import atexit
+        from concurrent.futures import ThreadPoolExecutor
+        _encoder = ThreadPoolExecutor(max_workers=1, thread_name_prefix='png-encode')
+        atexit.register(wait_for_exports)
+    # Bound the rasters held in memory by the queue
+    while len(_pending_encodes) >= MAX_PENDING_ENCODES:
+        _pending_encodes.pop(0).result()
+    _pending_encodes.append(_encoder.submit(function, *args))
+
+def wait_for_exports():
+    """Block until all background encodes are written, re-raising the first failure"""
+    while _pending_encodes:
+        _pending_encodes.pop(0).result()
+
+def export_scheme(fig, filename, params, sink):
+    """Write the PNG, its EXPORT_VARIANTS and VECTOR_FORMATS from one raster pass; return the names"""
+    params = dict(params)
+    dpi = params.pop('dpi')
+    sizes = {'': dpi}
+    sizes.update((f'_{suffix}', variant_dpi) for suffix, variant_dpi in EXPORT_VARIANTS.items())
+    raster_dpi = max(sizes.values())
+
+    # Resolve the tight bounding box once so every output has the same extent
+    rgba, params = render_raster(fig, raster_dpi, params)
+
+    stem = os.path.splitext(filename)[0]
+    # Largest first, each size derived from the previous one
+    outputs = [(f'{stem}{suffix}.png', size_dpi / raster_dpi, size_dpi)
+               for suffix, size_dpi in sorted(sizes.items(), key=lambda item: item[1], reverse=True)]
+    _submit_encode(_write_pngs, rgba, outputs, sink)
+
+    names = [output[0] for output in outputs]
+    for fmt in VECTOR_FORMATS:
+        names.append(f'{stem}.{fmt}')
+        with sink.open(names[-1]) as f:
+            fig.savefig(f, format=fmt, dpi=dpi, **params)
+    return names
+
+def export_tiled(fig, filename, params, sink):
+    """Write the PNG, its EXPORT_VARIANTS and VECTOR_FORMATS with the PNGs rendered in strips"""
+    from scheme_tiles import DEFAULT_TILE_MB, POSTER_PRINT_DPI, poster_dpi, render_tiled
+    params = dict(params)
+    dpi = params.pop('dpi')
+    print_dpi = None
+    if PNG_OPTIONS['poster']:
+        print_dpi = POSTER_PRINT_DPI
+        bbox = params.get('bbox_inches')
+        if bbox == 'tight':
+            bbox = layout_bbox(fig, dpi, params.get('pad_inches'))
+        dpi = poster_dpi(bbox or fig.bbox_inches, PNG_OPTIONS['poster'])
+    stem = os.path.splitext(filename)[0]
+    sizes = {'': dpi}
+    sizes.update((f'_{suffix}', variant_dpi) for suffix, variant_dpi in EXPORT_VARIANTS.items())
+    names = []
+    # Each size is rendered at its own dpi; none of them is ever held in memory whole
+    for suffix, size_dpi in sizes.items():
+        names.append(f'{stem}{suffix}.png')
+        with sink.open(names[-1]) as f:
+            render_tiled(fig, f, size_dpi, params, PNG_OPTIONS['tile_mb'] or DEFAULT_TILE_MB,
+                         PNG_OPTIONS['mode'], PNG_OPTIONS['compress_level'],
+                         print_dpi if not suffix else None)
+    if params.get('bbox_inches') == 'tight':
+        params['bbox_inches'] = layout_bbox(fig, dpi, params.pop('pad_inches', None))
+    for fmt in VECTOR_FORMATS:
+        names.append(f'{stem}.{fmt}')
+        with sink.open(names[-1]) as f:
+            fig.savefig(f, format=fmt, dpi=dpi, **params)
+    return names
+
+def save_scheme(fig, filename, **savefig_kwargs):
+    """Save a finished scheme figure through the output sink (below OUTPUT_DIR) and close it"""
+    params = dict(SAVEFIG_DEFAULTS, **savefig_kwargs)
+    sink = output_sink()
+    if OUTPUT_FORMAT:
+        filename = f'{os.path.splitext(filename)[0]}.{OUTPUT_FORMAT}'
+    if filename.endswith('.png') and (PNG_OPTIONS['tile_mb'] or PNG_OPTIONS['poster']):
+        names = export_tiled(fig, filename, params, sink)
+    elif filename.endswith('.png') and (EXPORT_VARIANTS or VECTOR_FORMATS or PNG_OPTIONS != PNG_DEFAULTS
+                                        or fig in LAYERED_FIGURES):
+        names = export_scheme(fig, filename, params, sink)
+    else:
+        fmt = os.path.splitext(filename)[1][1:] or None
+        # A cached layout comes with the tight bounding box, so the figure is drawn only once
+        if fig in LAID_OUT_FIGURES and fmt == 'png' and params.get('bbox_inches') == 'tight':
+            params['bbox_inches'] = layout_bbox(fig, params['dpi'], params.pop('pad_inches', None))
+        with sink.open(filename) as f, single_draw(fig):
+            fig.savefig(f, format=fmt, **params)
+        names = [filename]
+    plt.close(fig)
+    paths = [sink.location(name) for name in names]
+    saved_paths.extend(paths)
+    print(f"Created: {os.path.basename(filename)}" + (f" (+{len(paths) - 1} variants)" if len(paths) > 1 else ''))
+    return paths[0]
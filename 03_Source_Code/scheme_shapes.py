@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Batched drawing of repeated scheme shapes
+Same-styled rectangles, circles, arrows and line segments are added as one collection per call
+with their geometry computed in NumPy, so a scheme with thousands of cells, sample points or
+connectors still takes a handful of draw calls instead of one per patch.
+
+Every helper takes array-like positions and sizes (scalars are broadcast) plus collection
+keyword arguments; facecolor, edgecolor, linewidth, linestyle and alpha may be given per shape.
+"""
+
+import numpy as np
+
+# Patch defaults that differ from the collection defaults, so batched shapes look like patches
+_PATCH_DEFAULTS = {'joinstyle': 'miter', 'capstyle': 'butt'}
+
+def _columns(*arrays):
+    """Broadcast scalars and arrays to 1-D float arrays of a common length"""
+    return [np.ravel(a).astype(float) for a in np.broadcast_arrays(*map(np.asarray, arrays))]
+
+def _add(ax, collection):
+    """Add a collection without changing the axes limits (schemes set them explicitly)"""
+    return ax.add_collection(collection, autolim=False)
+
+def rectangle_vertices(x, y, width, height):
+    """Corner vertices (N, 4, 2) of axis-aligned rectangles with lower-left corners (x, y)"""
+    x, y, width, height = _columns(x, y, width, height)
+    xs = np.stack([x, x + width, x + width, x], axis=-1)
+    ys = np.stack([y, y, y + height, y + height], axis=-1)
+    return np.stack([xs, ys], axis=-1)
+
+def arrow_vertices(x, y, dx, dy, width=0.001, head_width=None, head_length=None):
+    """Outline vertices (N, 7, 2) of FancyArrow-shaped arrows from (x, y) along (dx, dy)
+
+    Same geometry as matplotlib.patches.FancyArrow with shape='full', overhang=0 and the head
+    added beyond the (dx, dy) end point (length_includes_head=False).
+    """
+    x, y, dx, dy, width = _columns(x, y, dx, dy, width)
+    head_width = 3 * width if head_width is None else _columns(head_width, x)[0]
+    head_length = 1.5 * head_width if head_length is None else _columns(head_length, x)[0]
+
+    distance = np.hypot(dx, dy)
+    length = distance + head_length
+    zero = np.zeros_like(x)
+    # Arrow pointing along +x with its tip at the origin, the head extending past (dx, dy)
+    along = np.stack([zero, -head_length, -head_length, -length, -length,
+                      -head_length, -head_length], axis=-1) + head_length[:, None]
+    across = np.stack([zero, -head_width / 2, -width / 2, -width / 2, width / 2,
+                       width / 2, head_width / 2], axis=-1)
+
+    # Rotate onto the arrow direction (zero-length arrows point up, as in FancyArrow)
+    safe = np.where(distance == 0, 1.0, distance)
+    cos = np.where(distance == 0, 0.0, dx / safe)[:, None]
+    sin = np.where(distance == 0, 1.0, dy / safe)[:, None]
+    xs = along * cos - across * sin + (x + dx)[:, None]
+    ys = along * sin + across * cos + (y + dy)[:, None]
+    return np.stack([xs, ys], axis=-1)
+
+def rectangles(ax, x, y, width, height, **kwargs):
+    """Draw axis-aligned rectangles as one PolyCollection"""
+    from matplotlib.collections import PolyCollection
+    params = dict(_PATCH_DEFAULTS, **kwargs)
+    return _add(ax, PolyCollection(rectangle_vertices(x, y, width, height), closed=True, **params))
+
+def circles(ax, x, y, radius, **kwargs):
+    """Draw circles with radii in data units as one EllipseCollection"""
+    from matplotlib.collections import EllipseCollection
+    x, y, radius = _columns(x, y, radius)
+    params = dict(_PATCH_DEFAULTS, **kwargs)
+    return _add(ax, EllipseCollection(2 * radius, 2 * radius, np.zeros_like(radius), units='xy',
+                                      offsets=np.column_stack([x, y]),
+                                      offset_transform=ax.transData, **params))
+
+def arrows(ax, x, y, dx, dy, width=0.001, head_width=None, head_length=None, **kwargs):
+    """Draw FancyArrow-shaped arrows as one PolyCollection ("color" sets face and edge)"""
+    from matplotlib.collections import PolyCollection
+    color = kwargs.pop('color', None)
+    if color is not None:
+        kwargs.setdefault('facecolor', color)
+        kwargs.setdefault('edgecolor', color)
+    params = dict(_PATCH_DEFAULTS, **kwargs)
+    verts = arrow_vertices(x, y, dx, dy, width, head_width, head_length)
+    return _add(ax, PolyCollection(verts, closed=True, **params))
+
+def segments(ax, x1, y1, x2, y2, **kwargs):
+    """Draw straight line segments from (x1, y1) to (x2, y2) as one LineCollection"""
+    from matplotlib.collections import LineCollection
+    x1, y1, x2, y2 = _columns(x1, y1, x2, y2)
+    lines = np.stack([np.column_stack([x1, y1]), np.column_stack([x2, y2])], axis=1)
+    return _add(ax, LineCollection(lines, **kwargs))
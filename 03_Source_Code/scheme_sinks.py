@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Output sinks the schemes are written through
+save_scheme() hands every encoded file to a sink under a relative name such as
+'Schema_Site_Layout.png' or '02_Methodological_Schemes/Data_Synthesis_Schemes/x.png'.
+DirectorySink writes below a folder, MemorySink keeps the bytes in memory for services and
+ArchiveSink adds each file to a zip or tar archive as soon as it is written, so a complete
+scheme bundle needs no temporary files.
+
+A sink provides open(name) -> writable binary file (the file is stored when it is closed),
+write(name, data), location(name) -> where the file ends up, and close().
+"""
+
+import io
+import os
+import tarfile
+import threading
+import time
+import zipfile
+
+class _SinkFile(io.BytesIO):
+    """In-memory file that hands its contents to a sink when closed"""
+
+    def __init__(self, sink, name):
+        super().__init__()
+        self._sink = sink
+        self.name = name
+
+    def close(self):
+        if not self.closed:
+            self._sink.write(self.name, self.getvalue())
+        super().close()
+
+class DirectorySink:
+    """Write files below a root folder"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def location(self, name):
+        return os.path.join(self.root, name)
+
+    def open(self, name):
+        path = self.location(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return open(path, 'wb')
+
+    def write(self, name, data):
+        with self.open(name) as f:
+            f.write(data)
+        return self.location(name)
+
+    def close(self):
+        pass
+
+class MemorySink:
+    """Keep files in memory as {name: bytes}"""
+
+    def __init__(self):
+        self.files = {}
+        self._lock = threading.Lock()
+
+    def location(self, name):
+        return name
+
+    def open(self, name):
+        return _SinkFile(self, name)
+
+    def write(self, name, data):
+        with self._lock:
+            self.files[name] = bytes(data)
+        return name
+
+    def getbuffer(self, name):
+        """A written file as a BytesIO positioned at the start"""
+        return io.BytesIO(self.files[name])
+
+    def close(self):
+        pass
+
+class ArchiveSink:
+    """Stream files into a zip or tar archive (a path or a writable binary file, even a pipe)
+
+    The format follows the file extension (.zip, .tar, .tar.gz/.tgz, .tar.bz2, .tar.xz) unless
+    given as 'zip', 'tar', 'tar:gz', 'tar:bz2' or 'tar:xz'. Already-compressed PNGs are stored
+    uncompressed in zip archives; everything else is deflated.
+    """
+
+    _EXTENSIONS = [('.tar.gz', 'tar:gz'), ('.tgz', 'tar:gz'), ('.tar.bz2', 'tar:bz2'),
+                   ('.tar.xz', 'tar:xz'), ('.tar', 'tar'), ('.zip', 'zip')]
+
+    def __init__(self, target, format=None):
+        if format is None:
+            name = target if isinstance(target, (str, os.PathLike)) else getattr(target, 'name', '')
+            name = os.fspath(name).lower() if isinstance(name, (str, os.PathLike)) else ''
+            format = next((fmt for ext, fmt in self._EXTENSIONS if name.endswith(ext)), None)
+            if format is None:
+                raise ValueError(f"Cannot tell the archive format of {target!r}; pass format=")
+        self.format = format
+        self._lock = threading.Lock()
+        if format == 'zip':
+            self._archive = zipfile.ZipFile(target, 'w')
+        elif format == 'tar' or format.startswith('tar:'):
+            # Stream mode ("w|") never seeks, so pipes and sockets work too
+            compression = format.partition(':')[2]
+            mode = f'w|{compression}'
+            if isinstance(target, (str, os.PathLike)):
+                self._archive = tarfile.open(name=target, mode=mode)
+            else:
+                self._archive = tarfile.open(fileobj=target, mode=mode)
+        else:
+            raise ValueError(f"Unknown archive format {format!r}")
+        self.names = []
+
+    def location(self, name):
+        return name
+
+    def open(self, name):
+        return _SinkFile(self, name)
+
+    def write(self, name, data):
+        name = name.replace(os.sep, '/')
+        with self._lock:
+            if self.format == 'zip':
+                info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+                info.compress_type = zipfile.ZIP_STORED if name.endswith('.png') else zipfile.ZIP_DEFLATED
+                self._archive.writestr(info, data)
+            else:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mtime = int(time.time())
+                self._archive.addfile(info, io.BytesIO(data))
+            self.names.append(name)
+        return name
+
+    def close(self):
+        with self._lock:
+            self._archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
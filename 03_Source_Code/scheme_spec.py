@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Declarative scheme specifications and a batched rendering engine
+A spec (JSON or TOML) lists boxes, text, text blocks, arrows and legends with named colours and
+styles. The engine draws all boxes, legend swatches and arrows as grouped PatchCollections and
+resolves text through shared named styles, so a scheme holds a few collections instead of
+hundreds of separate patch artists.
+
+Spec layout (all coordinates in axes data units):
+    figsize, xlim, ylim           figure size in inches and axes limits
+    colors                        name -> colour, usable wherever a colour is expected
+    text_styles, box_styles,      name -> keyword arguments for ax.text, FancyBboxPatch,
+    arrow_styles                  FancyArrow (arrow "color" sets both face and edge)
+    boxes                         {"xy", "size", "style", ...overrides}
+    texts                         {"xy", "text", "style", ...overrides}
+    text_blocks                   {"xy", "lines", "step", "blank_step", "style", "heading"}
+                                  lines ending in ':' get the "heading" overrides; empty lines only
+                                  advance by blank_step (default: step)
+    arrows                        {"xy", "delta", "style", ...overrides}
+    legends                       {"xy", "items": [[label, colour], ...], "step", "swatch",
+                                   "label_offset", "style", "swatch_style"}
+"""
+
+import json
+import os
+
+from scheme_bootstrap import lazy_import
+
+plt = lazy_import('matplotlib.pyplot')
+
+# Folder holding the spec files shipped with the scripts
+SPEC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scheme_specs')
+
+# Element keys that describe geometry or content rather than drawing style
+_LAYOUT_KEYS = {'xy', 'size', 'delta', 'text', 'lines', 'step', 'blank_step', 'heading', 'style',
+                'items', 'swatch', 'label_offset', 'swatch_style'}
+
+# Keyword arguments that take a colour
+_COLOR_KEYS = ('color', 'facecolor', 'edgecolor', 'fc', 'ec')
+
+def spec_path(name):
+    """Absolute path of a spec file (names are looked up in SPEC_DIR)"""
+    return name if os.path.isabs(name) else os.path.join(SPEC_DIR, name)
+
+def load_spec(name):
+    """Read a JSON or TOML scheme specification"""
+    path = spec_path(name)
+    if path.endswith('.toml'):
+        import tomllib
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def _resolve(element, styles, colors):
+    """Merge an element's named style with its inline overrides and map colour names"""
+    style = element.get('style')
+    if style is not None and style not in styles:
+        raise KeyError(f"Unknown style {style!r}")
+    params = dict(styles.get(style, {}))
+    params.update((k, v) for k, v in element.items() if k not in _LAYOUT_KEYS)
+    for key in _COLOR_KEYS:
+        value = params.get(key)
+        if isinstance(value, str) and value in colors:
+            params[key] = colors[value]
+    return params
+
+def _arrow_params(params):
+    """FancyArrow keyword arguments, expanding "color" to face and edge colour"""
+    params = dict(params)
+    color = params.pop('color', None)
+    if color is not None:
+        params.setdefault('fc', color)
+        params.setdefault('ec', color)
+    return params
+
+def render_spec(ax, spec):
+    """Draw a spec onto an axes and return the created artists by kind"""
+    from matplotlib.collections import PatchCollection
+    from matplotlib.patches import FancyArrow, FancyBboxPatch, Rectangle
+    colors = spec.get('colors', {})
+    text_styles = spec.get('text_styles', {})
+    box_styles = spec.get('box_styles', {})
+    arrow_styles = spec.get('arrow_styles', {})
+
+    patches, texts = [], []
+
+    for box in spec.get('boxes', []):
+        (x, y), (width, height) = box['xy'], box['size']
+        patches.append(FancyBboxPatch((x, y), width, height, **_resolve(box, box_styles, colors)))
+
+    for legend in spec.get('legends', []):
+        x, y = legend['xy']
+        dx, dy = legend.get('step', (0, 0))
+        width, height = legend.get('swatch', (0.3, 0.3))
+        label_dx, label_dy = legend.get('label_offset', (width + 0.2, height / 2))
+        swatch_params = _resolve({'style': legend.get('swatch_style')}, box_styles, colors)
+        swatch_params.pop('boxstyle', None)
+        label_params = _resolve(legend, text_styles, colors)
+        for i, (label, color) in enumerate(legend['items']):
+            xi, yi = x + i * dx, y + i * dy
+            patches.append(Rectangle((xi, yi), width, height,
+                                     **dict(swatch_params, facecolor=colors.get(color, color))))
+            texts.append(ax.text(xi + label_dx, yi + label_dy, label, **label_params))
+
+    for text in spec.get('texts', []):
+        x, y = text['xy']
+        texts.append(ax.text(x, y, text['text'], **_resolve(text, text_styles, colors)))
+
+    for block in spec.get('text_blocks', []):
+        x, y = block['xy']
+        params = _resolve(block, text_styles, colors)
+        heading_params = dict(params, **block.get('heading', {}))
+        step = block['step']
+        blank_step = block.get('blank_step', step)
+        for line in block['lines']:
+            if line == '':
+                y -= blank_step
+                continue
+            texts.append(ax.text(x, y, line, **(heading_params if line.endswith(':') else params)))
+            y -= step
+
+    arrows = []
+    for arrow in spec.get('arrows', []):
+        (x, y), (dx, dy) = arrow['xy'], arrow['delta']
+        arrows.append(FancyArrow(x, y, dx, dy, **_arrow_params(_resolve(arrow, arrow_styles, colors))))
+
+    artists = {'texts': texts}
+    # Boxes and swatches first, arrows on top, matching the hand-drawn stacking order
+    if patches:
+        artists['patches'] = ax.add_collection(PatchCollection(patches, match_original=True),
+                                               autolim=False)
+    if arrows:
+        artists['arrows'] = ax.add_collection(PatchCollection(arrows, match_original=True),
+                                              autolim=False)
+    return artists
+
+def build_scheme(spec):
+    """Create a figure for a spec, draw it and return (fig, ax)"""
+    fig, ax = plt.subplots(1, 1, figsize=spec['figsize'])
+    ax.set_xlim(*spec['xlim'])
+    ax.set_ylim(*spec['ylim'])
+    ax.axis('off')
+    render_spec(ax, spec)
+    return fig, ax
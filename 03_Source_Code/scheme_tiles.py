@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Low-memory tiled rendering for poster-size schemes
+The figure is set up once as savefig() would (dpi, colours, bounding box) and then drawn in
+horizontal strips, each with one draw onto an Agg canvas of the strip's size; every strip is
+streamed through zlib into the PNG file before the next one is drawn. Peak memory is bounded by
+the strip size instead of the full width x height RGBA buffer, so figures can be written at any
+dpi, e.g. filling an A0 poster at 300 dpi.
+
+The strips line up with a single full render pixel for pixel (anti-aliased edges that cross a
+strip boundary may differ by 1/255). Every strip draws the whole figure, clipped to the strip,
+so a render takes about one draw per strip. Rows are stored with PNG filter type 0, which
+compresses the flat-colour schematics better than adaptive filtering and encodes faster; the
+files are therefore not byte-identical to savefig's.
+"""
+
+import struct
+import zlib
+
+# Pixel memory budget when tiling is requested without one (e.g. by poster output)
+DEFAULT_TILE_MB = 64
+
+# Working copies of a strip alive at once (Agg canvas, RGBA output, filtered rows, zlib input)
+STRIP_COPIES = 4
+
+# IDAT chunks are cut at this size
+CHUNK_BYTES = 1 << 20
+
+# Paper sizes in inches (portrait)
+PAPER_SIZES = {
+    'A0': (33.11, 46.81),
+    'A1': (23.39, 33.11),
+    'A2': (16.54, 23.39),
+    'A3': (11.69, 16.54),
+    'A4': (8.27, 11.69)
+}
+
+# Print resolution poster output is rendered for
+POSTER_PRINT_DPI = 300
+
+def _chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+class PngStreamWriter:
+    """Write a PNG row block by row block to a binary file"""
+
+    def __init__(self, file, width, height, dpi, mode='RGBA', compress_level=6, text=None):
+        if mode not in ('RGBA', 'RGB'):
+            raise ValueError(f"Streamed PNGs are RGBA or RGB, not {mode!r}")
+        self.file = file
+        self.width, self.height = width, height
+        self.channels = len(mode)
+        self.rows_written = 0
+        self._compressor = zlib.compressobj(compress_level)
+        self._pending = []
+        self._pending_size = 0
+
+        file.write(b'\x89PNG\r\n\x1a\n')
+        color_type = 6 if mode == 'RGBA' else 2
+        file.write(_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0)))
+        for key, value in (text or {}).items():
+            file.write(_chunk(b'tEXt', key.encode('latin-1') + b'\0' + value.encode('latin-1')))
+        pixels_per_metre = int(dpi / 0.0254 + 0.5)
+        file.write(_chunk(b'pHYs', struct.pack('>IIB', pixels_per_metre, pixels_per_metre, 1)))
+
+    def _emit(self, data, final=False):
+        if data:
+            self._pending.append(data)
+            self._pending_size += len(data)
+        if self._pending_size >= CHUNK_BYTES or (final and self._pending):
+            self.file.write(_chunk(b'IDAT', b''.join(self._pending)))
+            self._pending, self._pending_size = [], 0
+
+    def write(self, rows):
+        """Append a (n, width, channels) uint8 block of rows"""
+        import numpy as np
+        if rows.shape[1:] != (self.width, self.channels):
+            raise ValueError(f"Expected rows of shape (n, {self.width}, {self.channels}), got {rows.shape}")
+        # Filter type 0 in front of every row
+        filtered = np.zeros((rows.shape[0], self.width * self.channels + 1), np.uint8)
+        filtered[:, 1:] = rows.reshape(rows.shape[0], -1)
+        self._emit(self._compressor.compress(filtered.data))
+        self.rows_written += rows.shape[0]
+
+    def close(self):
+        if self.rows_written != self.height:
+            raise ValueError(f"PNG declared {self.height} rows but {self.rows_written} were written")
+        self._emit(self._compressor.flush(), final=True)
+        self.file.write(_chunk(b'IEND', b''))
+
+def strip_rows(width, max_mb):
+    """Rows per strip so STRIP_COPIES strips of RGBA pixels fit in max_mb"""
+    return max(1, int(max_mb * (1 << 20) // (width * 4 * STRIP_COPIES)))
+
+def poster_dpi(bbox, paper, print_dpi=POSTER_PRINT_DPI):
+    """Render dpi at which a bounding box (inches) fills a paper size when printed at print_dpi
+
+    The figure keeps its aspect ratio and is matched to the paper in the same orientation.
+    """
+    paper_short, paper_long = sorted(PAPER_SIZES[paper])
+    figure_short, figure_long = sorted((bbox.width, bbox.height))
+    return print_dpi * min(paper_short / figure_short, paper_long / figure_long)
+
+def render_tiled(fig, file, dpi, params, max_mb, mode='RGBA', compress_level=6, print_dpi=None):
+    """Rasterize a figure in horizontal strips streamed into a PNG; returns (width, height)
+
+    params are savefig parameters without dpi (bbox_inches, pad_inches, facecolor, edgecolor,
+    transparent); max_mb bounds the pixel memory in use at once. print_dpi is the resolution
+    recorded in the file (default: dpi).
+    """
+    import contextlib
+    import matplotlib
+    from matplotlib import _tight_bbox, cbook
+    from matplotlib.backend_bases import FigureCanvasBase
+    from matplotlib.backends.backend_agg import RendererAgg
+    from matplotlib.colors import to_rgba
+    from matplotlib.layout_engine import PlaceHolderLayoutEngine
+    from matplotlib.transforms import Bbox
+    from scheme_render import layout_bbox, tight_bbox
+
+    params = dict(params)
+    bbox = params.pop('bbox_inches', None)
+    pad_inches = params.pop('pad_inches', None)
+    transparent = params.pop('transparent', None)
+    if transparent is None:
+        transparent = matplotlib.rcParams['savefig.transparent']
+    colors = {prop: params.pop(prop, matplotlib.rcParams[f'savefig.{prop}']) for prop in ('facecolor', 'edgecolor')}
+    if params:
+        raise ValueError(f"Tiled rendering does not support savefig parameters {', '.join(sorted(params))}")
+    # A real layout engine (not the placeholder plt.tight_layout() leaves) runs once in a
+    # metrics-only draw; the strips are then drawn with the engine off, as savefig does after its
+    # own layout pass
+    if not isinstance(fig.get_layout_engine(), (type(None), PlaceHolderLayoutEngine)):
+        tight_bbox(fig, dpi)
+    if bbox == 'tight':
+        bbox = layout_bbox(fig, dpi, pad_inches)
+    bbox = bbox or fig.bbox_inches
+
+    if transparent:
+        colors = {'facecolor': 'none', 'edgecolor': 'none'}
+    if colors['facecolor'] == 'auto':
+        colors['facecolor'] = fig.get_facecolor()
+    # The alpha channel can only be dropped when the background is known to be opaque
+    if mode != 'RGBA' and (transparent or to_rgba(colors['facecolor'])[3] < 1):
+        mode = 'RGBA'
+    mode = 'RGB' if mode in ('RGB', 'P') else 'RGBA'
+
+    with contextlib.ExitStack() as stack:
+        # The figure state savefig sets up, entered once for all strips
+        stack.enter_context(cbook._setattr_cm(fig, dpi=dpi, _layout_engine=None))
+        stack.enter_context(fig._cm_set(**{prop: color for prop, color in colors.items() if color != 'auto'}))
+        if transparent:
+            for ax in fig.axes:
+                stack.enter_context(ax.patch._cm_set(facecolor='none', edgecolor='none'))
+        stack.callback(_tight_bbox.adjust_bbox(fig, bbox, None))
+        # The canvas size Agg takes for a full savefig, with the canvas's own rounding
+        width, height = FigureCanvasBase.get_width_height(fig.canvas, physical=True)
+        boxout = fig.transFigure._boxout
+        stack.callback(setattr, fig.transFigure, '_boxout', boxout)
+
+        writer = PngStreamWriter(file, width, height, print_dpi or dpi, mode, compress_level,
+                                 text={'Software': f"Matplotlib version{matplotlib.__version__}, https://matplotlib.org/"})
+        rows = strip_rows(width, max_mb)
+        for top in range(0, height, rows):
+            bottom = min(height, top + rows)
+            # One draw per strip on a canvas of the strip's size: the figure is moved down by the
+            # whole rows below the strip, so pixels line up with a single full render
+            fig.transFigure._boxout = Bbox.from_bounds(boxout.x0, boxout.y0 - (height - bottom),
+                                                       boxout.width, boxout.height)
+            fig.transFigure.invalidate()
+            renderer = RendererAgg(width, bottom - top, dpi)
+            fig.draw(renderer)
+            writer.write(np_view(renderer)[:, :, :len(mode)])
+            del renderer
+        writer.close()
+    fig.transFigure.invalidate()
+    return width, height
+
+def np_view(renderer):
+    """(height, width, 4) uint8 array over an Agg renderer's buffer"""
+    import numpy as np
+    return np.asarray(renderer.buffer_rgba())
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Watch mode for the scheme generators
+Polls the scripts, helper modules and specs in 03_Source_Code and the CSV files in
+04_Research_Articles. After every change the render-cache key of each create_* function is
+recomputed and only the schemes whose key changed are rendered again: first as a low-dpi draft
+written straight to the output file, then at full resolution in the background. A newer change
+to the same scheme supersedes its pending full render, so an older result never replaces a
+newer draft.
+
+    python render_all_schemes.py --watch
+"""
+
+import glob
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from render_all_schemes import (SOURCE_DIR, discover_schemes, fresh_process_context, init_worker,
+                                render_scheme, select_schemes)
+from render_cache import REPO_DIR, environment_fingerprint, scheme_key
+
+# Files whose changes can affect a scheme
+WATCH_PATTERNS = [
+    os.path.join(SOURCE_DIR, '*.py'),
+    os.path.join(SOURCE_DIR, 'scheme_specs', '*'),
+    os.path.join(REPO_DIR, '04_Research_Articles', '*.csv')
+]
+
+# Resolution of the first, quick render after a change
+DRAFT_DPI = 60
+
+# Seconds between polls of the watched files
+POLL_INTERVAL = 0.5
+
+def snapshot(patterns=WATCH_PATTERNS):
+    """(mtime_ns, size) of every watched file"""
+    state = {}
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            state[path] = (st.st_mtime_ns, st.st_size)
+    return state
+
+def scheme_keys(environment, names=None):
+    """Render-cache key of every discovered scheme (restricted to names when given)"""
+    return {f'{module}.{func}': scheme_key(module, func, environment)
+            for module, func, _ in select_schemes(discover_schemes(), names)}
+
+class SchemeWatcher:
+    """Re-renders the schemes affected by file changes: draft first, then full resolution
+
+    keys holds the current cache key of every scheme and rendered the key of the file on disk;
+    a scheme is rendered whenever the two differ, unless its last render failed with the same key.
+    """
+
+    def __init__(self, output_dir=None, names=None, jobs=None, draft_dpi=DRAFT_DPI,
+                 variants=None, vector_formats=None, png_options=None):
+        import scheme_render
+        from scheme_sinks import DirectorySink
+        self.sink = DirectorySink(output_dir or scheme_render.OUTPUT_DIR)
+        self.names = names
+        self.draft_dpi = draft_dpi
+        self.export = (variants, vector_formats, png_options)
+        self.environment = environment_fingerprint(scheme_render.SAVEFIG_DEFAULTS)
+        # Ctrl+C stops the watcher, which then shuts the workers down
+        pool = dict(mp_context=fresh_process_context(), max_tasks_per_child=1,
+                    initializer=init_worker, initargs=(True,))
+        self.drafts = ProcessPoolExecutor(jobs, **pool)
+        self.full = ProcessPoolExecutor(jobs, **pool)
+        self.keys = scheme_keys(self.environment, names)
+        # The existing files are taken as up to date when watching starts
+        self.rendered = dict(self.keys)
+        self.failed = {}
+        self.active = {}
+        self.pending = {}
+        self.unparsed = False
+
+    def update_keys(self):
+        """Recompute the cache keys and return the ids of the schemes whose key changed"""
+        keys = scheme_keys(self.environment, self.names)
+        if self.unparsed:
+            # Renders that failed while a file did not parse may have failed because of it
+            self.failed.clear()
+            self.unparsed = False
+        changed = [scheme_id for scheme_id, key in keys.items() if self.keys.get(scheme_id) != key]
+        self.keys = keys
+        return changed
+
+    def reconcile(self):
+        """Start a draft for every scheme whose file is behind its source"""
+        for scheme_id, key in self.keys.items():
+            if self.rendered.get(scheme_id) == key or self.failed.get(scheme_id) == key:
+                continue
+            active = self.active.get(scheme_id)
+            if active is not None:
+                if active[0] == key:
+                    continue
+                # Superseded by a newer change
+                active[1].cancel()
+            self._submit(scheme_id, key, 'draft')
+
+    def _submit(self, scheme_id, key, stage):
+        module, func = scheme_id.rsplit('.', 1)
+        if stage == 'draft':
+            future = self.drafts.submit(render_scheme, module, func, in_memory=True, dpi=self.draft_dpi)
+        else:
+            future = self.full.submit(render_scheme, module, func, None, *self.export, in_memory=True)
+        self.active[scheme_id] = (key, future)
+        self.pending[future] = (scheme_id, key, stage)
+
+    def collect(self, timeout):
+        """Write finished renders that are still current; wait at most timeout seconds"""
+        if not self.pending:
+            time.sleep(timeout)
+            return
+        done, _ = wait(self.pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            scheme_id, key, stage = self.pending.pop(future)
+            if future.cancelled() or self.keys.get(scheme_id) != key:
+                continue
+            try:
+                result = future.result()
+            except Exception as exc:
+                print(f"FAILED {stage}: {scheme_id}: {exc!r}")
+                self.failed[scheme_id] = key
+                self.active.pop(scheme_id, None)
+                continue
+            for name, data in result['files'].items():
+                self.sink.write(name, data)
+            print(f"  {stage:<5s} {scheme_id.rsplit('.', 1)[1]:<40s} {result['seconds']:6.1f} s")
+            if stage == 'draft':
+                self._submit(scheme_id, key, 'full')
+            else:
+                self.rendered[scheme_id] = key
+                self.active.pop(scheme_id, None)
+
+    def run(self, interval=POLL_INTERVAL):
+        """Poll for changes until interrupted"""
+        state = snapshot()
+        print(f"Watching {len(self.keys)} schemes for changes (Ctrl+C to stop)...")
+        try:
+            while True:
+                self.collect(interval)
+                current = snapshot()
+                if current != state:
+                    files = sorted(path for path in state.keys() | current.keys()
+                                   if state.get(path) != current.get(path))
+                    state = current
+                    try:
+                        changed = self.update_keys()
+                    except (SyntaxError, OSError) as exc:
+                        # Saved mid-edit; the next save triggers another check
+                        print(f"Skipping change: {exc}")
+                        self.unparsed = True
+                        continue
+                    affected = ', '.join(scheme_id.rsplit('.', 1)[1] for scheme_id in changed)
+                    print(f"Changed: {', '.join(os.path.relpath(path, REPO_DIR) for path in files)} -> "
+                          f"{affected or 'no schemes affected'}")
+                self.reconcile()
+        except KeyboardInterrupt:
+            print("\nStopped watching")
+        finally:
+            self.drafts.shutdown(cancel_futures=True)
+            self.full.shutdown(cancel_futures=True)
+
+def watch(output_dir=None, names=None, jobs=None, draft_dpi=DRAFT_DPI, **export):
+    """Watch the sources and re-render affected schemes until interrupted"""
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    SchemeWatcher(output_dir, names, jobs, draft_dpi, **export).run()
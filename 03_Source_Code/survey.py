@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Streaming gridding of magnetometer survey readings
+Field surveys with the PKM-1 caesium magnetometer (±0.01 nT) produce long text files of
+(x, y, field) readings. grid_survey() reads them in chunks of CHUNK_READINGS and interpolates
+each chunk onto a regular grid with a KD-tree (scipy.spatial.cKDTree):
+
+    idw         inverse-distance weighting of all readings within radius of a node
+    nearest     the closest reading within radius of a node
+
+Readings are first bucketed into square tiles of the grid (binary spill files next to the
+output, about CHUNK_READINGS readings per tile), so each chunk covers a small part of the site
+and every node is queried about once, whatever order the file lists the readings in (along
+survey lines, or shuffled). Both methods are exact over chunk boundaries: IDW adds each
+chunk's weighted sums into the numerator and denominator grids, and nearest keeps the closest
+reading seen so far per node. The grids live in memory-mapped .npy files, so memory depends
+on the chunk and spill sizes and not on the length of the survey or the size of the grid;
+nodes farther than radius from every reading are NaN.
+
+    from survey import grid_survey, read_grid
+    meta = grid_survey('survey.csv', 'survey_grid.npy', cell=0.25)
+    meta, grid = read_grid('survey_grid.npy')      # grid[row, col], row 0 at the southern edge
+    plot_grid(ax, meta, grid)
+
+    python survey.py survey.csv survey_grid.npy --cell 0.25 --method nearest
+    python survey.py --benchmark --shuffle     # time a synthetic survey in random order
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Header names (lower case) recognised for each survey column
+SURVEY_COLUMNS = {
+    'x': ('x', 'easting', 'east', 'e', 'lon', 'longitude'),
+    'y': ('y', 'northing', 'north', 'n', 'lat', 'latitude'),
+    'value': ('value', 'nt', 't', 'tmi', 'field', 'b')
+}
+METHODS = ('idw', 'nearest')
+
+# Readings per chunk; IDW holds up to about pi * (radius / cell)^2 node-reading pairs per reading
+CHUNK_READINGS = 10_000
+# Grid nodes queried at once
+NODE_BLOCK = 250_000
+# Readings buffered before they are written to their tile spill files
+SPILL_READINGS = 250_000
+# Default search radius in cells, and the IDW distance exponent
+RADIUS_CELLS = 4
+IDW_POWER = 2
+
+# Synthetic benchmark survey: readings, site side in metres and grid cell
+BENCHMARK_READINGS = 1_000_000
+BENCHMARK_SIDE = 316.0
+BENCHMARK_CELL = 0.5
+BENCHMARK_SEED = 20240917
+
+def _header(f):
+    """(delimiter, column names) of the header line; whitespace-separated files give None"""
+    header = f.readline()
+    try:
+        delimiter = csv.Sniffer().sniff(header, delimiters=';,\t').delimiter
+    except csv.Error:
+        delimiter = None
+    names = next(csv.reader([header], delimiter=delimiter)) if delimiter else header.split()
+    return delimiter, [name.strip().lower() for name in names]
+
+def _columns(names, columns=None):
+    """Positions of the x, y and value columns; columns maps 'x'/'y'/'value' to header names"""
+    positions = []
+    for key, aliases in SURVEY_COLUMNS.items():
+        wanted = [columns[key].lower()] if columns and key in columns else aliases
+        found = [names.index(name) for name in wanted if name in names]
+        if not found:
+            raise ValueError(f"No {key} column (tried {', '.join(wanted)}) in header {', '.join(names)}")
+        positions.append(found[0])
+    return positions
+
+def read_survey(path, chunk=CHUNK_READINGS, columns=None):
+    """Yield (x, y, value) float arrays of up to chunk readings; non-finite readings are dropped"""
+    import numpy as np
+    with open(path, encoding='utf-8', newline='') as f:
+        delimiter, names = _header(f)
+        usecols = _columns(names, columns)
+        line = 1
+        while True:
+            lines = list(itertools.islice(f, chunk))
+            if not lines:
+                return
+            try:
+                data = np.loadtxt(lines, delimiter=delimiter, usecols=usecols, ndmin=2, comments='#')
+            except ValueError as exc:
+                raise ValueError(f"{path}, lines {line + 1}-{line + len(lines)}: {exc}") from None
+            line += len(lines)
+            data = data[np.isfinite(data).all(axis=1)]
+            if len(data):
+                yield data[:, 0], data[:, 1], data[:, 2]
+
+def survey_extent(path, chunk=CHUNK_READINGS, columns=None):
+    """(x0, y0, x1, y1, readings) of a survey file, in one streaming pass"""
+    x0 = y0 = math.inf
+    x1 = y1 = -math.inf
+    count = 0
+    for x, y, _ in read_survey(path, chunk, columns):
+        x0, y0 = min(x0, x.min()), min(y0, y.min())
+        x1, y1 = max(x1, x.max()), max(y1, y.max())
+        count += len(x)
+    if not count:
+        raise ValueError(f"{path} has no readings")
+    return float(x0), float(y0), float(x1), float(y1), count
+
+def _node_blocks(meta, x, y, radius):
+    """(row slice, column slice, node coordinates) blocks of the nodes within radius of a chunk"""
+    import numpy as np
+    x0, y0, cell = meta['x0'], meta['y0'], meta['cell']
+    rows, cols = meta['shape']
+    c0 = max(0, math.ceil((x.min() - radius - x0) / cell))
+    c1 = min(cols - 1, math.floor((x.max() + radius - x0) / cell))
+    r0 = max(0, math.ceil((y.min() - radius - y0) / cell))
+    r1 = min(rows - 1, math.floor((y.max() + radius - y0) / cell))
+    if c0 > c1 or r0 > r1:
+        return
+    step = max(1, NODE_BLOCK // (c1 - c0 + 1))
+    gx = x0 + np.arange(c0, c1 + 1) * cell
+    for start in range(r0, r1 + 1, step):
+        stop = min(start + step, r1 + 1)
+        gy = y0 + np.arange(start, stop) * cell
+        nodes = np.column_stack([np.tile(gx, stop - start), np.repeat(gy, len(gx))])
+        yield slice(start, stop), slice(c0, c1 + 1), nodes
+
+def _open_grid(path, shape, fill):
+    import numpy as np
+    grid = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=shape)
+    grid[:] = fill
+    return grid
+
+def _tile_cells(meta, readings, chunk):
+    """Side in cells of the tiles readings are bucketed into, for about chunk readings per tile
+
+    Without a reading count (extent given by the caller) one reading per node is assumed.
+    """
+    rows, cols = meta['shape']
+    per_node = readings / (rows * cols) if readings else 1.0
+    side = math.sqrt(chunk / per_node)
+    return int(min(max(side, 1), math.isqrt(NODE_BLOCK)))
+
+def _bucket(path, meta, tile, directory, chunk, columns):
+    """Spill the readings into one float64 (x, y, value) file per tile; returns the file paths"""
+    import numpy as np
+    rows, cols = meta['shape']
+    tile_cols = -(-cols // tile)
+    files = set()
+    buffered, count = [], 0
+
+    def spill():
+        data = np.concatenate(buffered)
+        column = np.clip((data[:, 0] - meta['x0']) // (tile * meta['cell']), 0, tile_cols - 1)
+        row = np.clip((data[:, 1] - meta['y0']) // (tile * meta['cell']), 0, -(-rows // tile) - 1)
+        ids = (row * tile_cols + column).astype(np.int64)
+        order = np.argsort(ids, kind='stable')
+        ids, data = ids[order], data[order]
+        bounds = np.flatnonzero(np.diff(ids)) + 1
+        for start, stop in zip(np.r_[0, bounds], np.r_[bounds, len(ids)]):
+            name = os.path.join(directory, f'{ids[start]}.bin')
+            with open(name, 'ab') as f:
+                data[start:stop].tofile(f)
+            files.add(name)
+        buffered.clear()
+
+    for x, y, value in read_survey(path, chunk, columns):
+        buffered.append(np.column_stack([x, y, value]))
+        count += len(x)
+        if count >= SPILL_READINGS:
+            spill()
+            count = 0
+    if buffered:
+        spill()
+    return sorted(files)
+
+def _tile_chunks(files, chunk):
+    """Yield (x, y, value) arrays of up to chunk readings, tile by tile"""
+    import numpy as np
+    for name in files:
+        data = np.fromfile(name).reshape(-1, 3)
+        for start in range(0, len(data), chunk):
+            part = data[start:start + chunk]
+            yield part[:, 0], part[:, 1], part[:, 2]
+
+def grid_survey(path, output, cell=0.5, method='idw', radius=None, power=IDW_POWER, extent=None,
+                chunk=CHUNK_READINGS, columns=None):
+    """Interpolate a survey file onto a regular grid saved as a memory-mapped .npy file
+
+    Nodes lie every cell metres from the lower-left corner of extent (x0, y0, x1, y1; default
+    the readings' bounding box, found in an extra pass). radius defaults to RADIUS_CELLS cells.
+    The grid metadata is written next to output as JSON and returned.
+    """
+    import numpy as np
+    from scipy.spatial import cKDTree
+    if method not in METHODS:
+        raise ValueError(f"Unknown gridding method {method!r} (expected one of {', '.join(METHODS)})")
+    if cell <= 0:
+        raise ValueError("The cell size must be positive")
+    radius = RADIUS_CELLS * cell if radius is None else float(radius)
+    if extent is None:
+        *extent, count = survey_extent(path, chunk, columns)
+    else:
+        count = None
+    x0, y0, x1, y1 = extent
+    shape = (int((y1 - y0) // cell) + 1, int((x1 - x0) // cell) + 1)
+    meta = {'source': os.path.abspath(path), 'x0': x0, 'y0': y0, 'cell': cell, 'shape': shape,
+            'method': method, 'radius': radius, 'power': power if method == 'idw' else None}
+
+    grid = _open_grid(output, shape, 0.0 if method == 'idw' else np.nan)
+    # IDW: grid holds the weighted sum and weights the sum of weights; nearest: weights holds the
+    # distance of the reading in grid
+    scratch = f'{os.path.splitext(output)[0]}.weights.npy'
+    weights = _open_grid(scratch, shape, 0.0 if method == 'idw' else np.inf)
+    buckets = tempfile.mkdtemp(prefix=f'{os.path.basename(os.path.splitext(output)[0])}.tiles.',
+                               dir=os.path.dirname(os.path.abspath(output)))
+    readings = 0
+    try:
+        files = _bucket(path, meta, _tile_cells(meta, count, chunk), buckets, chunk, columns)
+        for x, y, value in _tile_chunks(files, chunk):
+            readings += len(x)
+            tree = cKDTree(np.column_stack([x, y]))
+            for rows, cols, nodes in _node_blocks(meta, x, y, radius):
+                block = (rows.stop - rows.start, cols.stop - cols.start)
+                if method == 'idw':
+                    pairs = cKDTree(nodes).sparse_distance_matrix(tree, radius, output_type='ndarray')
+                    # A reading on a node dominates it instead of dividing by zero
+                    w = np.maximum(pairs['v'], cell * 1e-6) ** -power
+                    grid[rows, cols] += np.bincount(pairs['i'], w * value[pairs['j']],
+                                                    len(nodes)).reshape(block)
+                    weights[rows, cols] += np.bincount(pairs['i'], w, len(nodes)).reshape(block)
+                else:
+                    distance, index = tree.query(nodes, distance_upper_bound=radius)
+                    distance, index = distance.reshape(block), index.reshape(block)
+                    closer = distance < weights[rows, cols]
+                    weights[rows, cols] = np.where(closer, distance, weights[rows, cols])
+                    grid[rows, cols] = np.where(closer, value[np.minimum(index, len(x) - 1)], grid[rows, cols])
+        if method == 'idw':
+            # Row by row, so no grid-sized temporary is made
+            for row in range(shape[0]):
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    grid[row] = np.where(weights[row] > 0, grid[row] / weights[row], np.nan)
+        grid.flush()
+    finally:
+        del weights
+        os.remove(scratch)
+        shutil.rmtree(buckets, ignore_errors=True)
+
+    meta['readings'] = readings
+    with open(f'{os.path.splitext(output)[0]}.json', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=1)
+    return meta
+
+def read_grid(output):
+    """(meta, grid) of a grid_survey() output, the grid memory-mapped read-only"""
+    import numpy as np
+    with open(f'{os.path.splitext(output)[0]}.json', encoding='utf-8') as f:
+        meta = json.load(f)
+    return meta, np.load(output, mmap_mode='r')
+
+def plot_grid(ax, meta, grid, cmap='RdBu_r', **kwargs):
+    """Draw a grid in survey coordinates with imshow (NaN nodes left blank) and return the image"""
+    rows, cols = meta['shape']
+    half = meta['cell'] / 2
+    extent = (meta['x0'] - half, meta['x0'] + (cols - 1) * meta['cell'] + half,
+              meta['y0'] - half, meta['y0'] + (rows - 1) * meta['cell'] + half)
+    return ax.imshow(grid, origin='lower', extent=extent, cmap=cmap, interpolation='nearest', **kwargs)
+
+def synthetic_survey(path, readings=BENCHMARK_READINGS, side=BENCHMARK_SIDE, shuffle=False,
+                     seed=BENCHMARK_SEED):
+    """Write a synthetic survey: parallel lines over a square site, a smooth field and anomalies
+
+    Readings follow the lines (as walked) unless shuffle is set.
+    """
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    lines = max(1, int(math.sqrt(readings)))
+    per_line = -(-readings // lines)
+    along = np.linspace(0, side, per_line)
+    x = np.tile(along, lines)[:readings] + rng.normal(0, 0.02, readings)
+    y = np.repeat(np.linspace(0, side, lines), per_line)[:readings] + rng.normal(0, 0.02, readings)
+    centres = rng.uniform(0, side, (20, 2))
+    value = 50_000 + 0.01 * x + sum(30 * np.exp(-((x - cx) ** 2 + (y - cy) ** 2) / 50) for cx, cy in centres)
+    data = np.column_stack([x, y, value + rng.normal(0, 0.01, readings)])
+    if shuffle:
+        data = data[rng.permutation(readings)]
+    np.savetxt(path, data, fmt='%.3f', delimiter=',', header='x,y,field', comments='')
+
+def benchmark(readings=BENCHMARK_READINGS, method='idw', shuffle=False, cell=BENCHMARK_CELL):
+    """Seconds taken by grid_survey() on a synthetic survey (file writing excluded)"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'survey.csv')
+        synthetic_survey(path, readings, shuffle=shuffle)
+        start = time.perf_counter()
+        grid_survey(path, os.path.join(directory, 'grid.npy'), cell, method)
+        return time.perf_counter() - start
+
+def main():
+    """Grid the survey file given on the command line, or time a synthetic survey"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('survey', nargs='?', help='survey readings (x, y and field columns with a header line)')
+    parser.add_argument('output', nargs='?', help='grid to write (.npy, with a .json sidecar)')
+    parser.add_argument('--cell', type=float, default=0.5, help='grid spacing in survey units (default: 0.5)')
+    parser.add_argument('--method', choices=METHODS, default='idw', help='interpolation (default: idw)')
+    parser.add_argument('--radius', type=float, help=f'search radius (default: {RADIUS_CELLS} cells)')
+    parser.add_argument('--power', type=float, default=IDW_POWER, help=f'IDW exponent (default: {IDW_POWER})')
+    parser.add_argument('--chunk', type=int, default=CHUNK_READINGS,
+                        help=f'readings per chunk (default: {CHUNK_READINGS})')
+    parser.add_argument('--benchmark', type=int, nargs='?', const=BENCHMARK_READINGS, metavar='READINGS',
+                        help=f'time a synthetic survey instead (default: {BENCHMARK_READINGS} readings)')
+    parser.add_argument('--shuffle', action='store_true', help='benchmark readings in random order')
+    args = parser.parse_args()
+    if args.benchmark:
+        seconds = benchmark(args.benchmark, args.method, args.shuffle, args.cell)
+        order = 'shuffled' if args.shuffle else 'along lines'
+        print(f"{args.benchmark} readings ({order}), {args.method} at {args.cell} m: {seconds:.1f} s")
+        return 0
+    if not args.output:
+        parser.error('survey and output are required unless --benchmark is given')
+    meta = grid_survey(args.survey, args.output, args.cell, args.method, args.radius, args.power,
+                       chunk=args.chunk)
+    print(f"{meta['readings']} readings -> {meta['shape'][0]} x {meta['shape'][1]} grid ({args.output})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())